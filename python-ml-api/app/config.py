@@ -32,6 +32,49 @@ class Settings(BaseSettings):
     MODEL_PATH: str = "models"
     MODEL_CACHE_TTL: int = 3600  # 1 hour
     MIN_TRAINING_SAMPLES: int = 10
+    MODEL_REGISTRY_KEEP: int = 5  # model versions kept for rollback
+    MODEL_SYNC_INTERVAL_SECONDS: float = 2.0  # how often workers poll the registry (0 disables)
+    MODEL_RESIDENT_VERSIONS: int = 3  # non-served versions kept loaded for pinned requests
+    MODEL_COMPACT_EXPORT: bool = False  # also save a compact forest (float32 thresholds, leaf-only values) and serve it
+    
+    # Shadow Scoring Configuration
+    SHADOW_MODEL_VERSION: str = ""  # registry version scored in shadow (empty disables)
+    SHADOW_SAMPLE_RATE: float = 0.1  # fraction of /predict batches also scored by the shadow model
+    
+    # Prediction Distribution Configuration
+    DISTRIBUTION_SKETCH_K: int = 200  # KLL sketch size; rank error is about 1.7 / k
+    DISTRIBUTION_RETENTION_DAYS: int = 90  # daily sketches kept on disk
+    
+    # Prediction History Configuration
+    HISTORY_ENABLED: bool = False  # append every scored batch to Parquet files under MODEL_PATH/history
+    HISTORY_BUCKETS: int = 16  # employee_id partitions per day
+    HISTORY_FLUSH_SECONDS: float = 60.0  # buffered rows are written at least this often
+    HISTORY_FLUSH_ROWS: int = 100000  # ...or at the next periodic pass once this many are buffered
+    HISTORY_RETENTION_DAYS: int = 365  # days of history kept on disk
+    
+    EVALUATION_FOLDS: int = 5  # cross-validation folds per training run (0 disables)
+    PERMUTATION_IMPORTANCE_REPEATS: int = 5  # shuffles per feature after each training run (0 disables)
+    PERMUTATION_IMPORTANCE_MAX_ROWS: int = 5000  # training rows sampled for permutation importance
+    DRIFT_BINS: int = 10  # quantile bins per feature in the training baseline for /model/drift
+    SIMULATION_MAX_ROWS: int = 200000  # employees x (scenarios + 1) scored per /simulate request
+    
+    # Bulk Training Upload Configuration
+    UPLOAD_MAX_MB: int = 512
+    UPLOAD_BATCH_ROWS: int = 50000  # rows per batch read from uploaded files
+    
+    # Hyperparameter Tuning Configuration
+    TUNING_TIME_BUDGET_SECONDS: float = 300.0  # wall-clock budget per search
+    TUNING_CPU_BUDGET_SECONDS: float = 1200.0  # process CPU time budget per search
+    TUNING_MAX_CANDIDATES: int = 24
+    TUNING_HALVING_FACTOR: int = 3
+    TUNING_MIN_SAMPLES: int = 50  # training rows used by the first rung
+    TUNING_LATENCY_WEIGHT: float = 0.01  # AUC given up per doubling of latency
+    TUNING_SCORE_TOLERANCE: float = 0.01
+    
+    # Resource Governor Configuration
+    WORKER_COUNT: int = Field(default=1, alias="WEB_CONCURRENCY")  # API workers sharing this host
+    INFERENCE_THREADS: int = 0  # 0 = half of this worker's share of the cores
+    TRAINING_THREADS: int = 0   # 0 = the rest of this worker's share
     
     # Logging Configuration
     LOG_LEVEL: str = "INFO"
@@ -13,7 +13,7 @@ Features:
 - Health checks and monitoring
 """
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, UploadFile, File, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
@@ -25,10 +25,28 @@ from .models.schemas import (
     EmployeeData, 
     PredictionRequest, 
     PredictionResponse,
+    AggregateRequest,
+    AggregateResponse,
+    TopRiskRequest,
+    TopRiskResponse,
+    SimulationRequest,
+    SimulationResponse,
     ModelStatsResponse,
+    EvaluationReportResponse,
+    JobStatusResponse,
+    ModelVersionResponse,
+    ShadowStatsResponse,
+    DistributionResponse,
+    FeatureImportanceResponse,
+    DriftResponse,
+    HistoryResponse,
     HealthResponse
 )
 from .services.ml_predictor import MLPredictorService
+from .services.data_ingest import detect_upload_format, save_upload
+from .services.profiling import StageProfiler
+from .services import metrics
+from .services.metrics import MetricsMiddleware
 from .config import settings
 
 # Configure logging
@@ -53,6 +71,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request latency by route, and the scope that stage timers read their route from
+app.add_middleware(MetricsMiddleware)
+
 # Initialize ML service
 ml_service = MLPredictorService()
 
@@ -63,6 +84,12 @@ async def startup_event():
     await ml_service.initialize()
     logger.info("ML Prediction API service started successfully")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background work of the ML service on shutdown"""
+    await ml_service.shutdown()
+    metrics.mark_process_dead()
+
 @app.get("/", response_model=HealthResponse)
 async def root():
     """Root endpoint for health check"""
@@ -84,10 +111,16 @@ async def health_check():
             timestamp=datetime.now(),
             version="1.0.0",
             details={
+                "model_status": model_status["status"],
+                "model_version": model_status["version"],
                 "model_loaded": model_status["loaded"],
                 "model_trained": model_status["trained"],
                 "last_training": model_status.get("last_training"),
-                "total_predictions": model_status.get("total_predictions", 0)
+                "total_predictions": model_status.get("total_predictions", 0),
+                "model_memory": model_status.get("memory"),
+                "registry": ml_service.get_registry_summary(),
+                "resources": ml_service.governor.describe(),
+                "workers": ml_service.get_worker_status()
             }
         )
     except Exception as e:
@@ -95,23 +128,32 @@ async def health_check():
         raise HTTPException(status_code=500, detail=f"Health check failed: {str(e)}")
 
 @app.post("/predict", response_model=PredictionResponse)
-async def predict_employees(request: PredictionRequest):
+async def predict_employees(request: PredictionRequest, explain: bool = False, top_features: int = 5):
     """
     Generate ML predictions for employees
     
     This endpoint receives employee data and returns predictions for:
     - Employee potential classification
     - Resignation risk probability and status
+    - With `explain=true`, the `top_features` features contributing most
+      to each model-scored employee's resignation probability
     """
     try:
+        metrics.observe_request_parsed()
         logger.info(f"Received prediction request for {len(request.employees)} employees")
         
         # Validate request
         if not request.employees:
             raise HTTPException(status_code=400, detail="No employee data provided")
+        if explain and top_features < 1:
+            raise ValueError("top_features must be at least 1")
+        
+        # Pin the requested (or served) model so a concurrent retrain or
+        # reload cannot change it between scoring and building the response
+        snapshot = ml_service.get_snapshot(request.model_version)
         
         # Generate predictions
-        predictions = await ml_service.predict(request.employees)
+        predictions = await ml_service.predict(request.employees, snapshot, explain, top_features)
         
         # Prepare response
         response = PredictionResponse(
@@ -119,11 +161,15 @@ async def predict_employees(request: PredictionRequest):
             data=predictions,
             timestamp=datetime.now(),
             total_employees=len(predictions),
-            model_version=ml_service.get_model_version()
+            model_version=snapshot.version if snapshot else ml_service.get_model_version(),
+            model_status="ready" if snapshot else ml_service.get_model_status()["status"]
         )
         
+        with metrics.stage('serialize'):
+            body = response.model_dump_json()
+        
         logger.info(f"Successfully generated predictions for {len(predictions)} employees")
-        return response
+        return Response(content=body, media_type="application/json")
         
     except ValueError as e:
         logger.error(f"Validation error in prediction request: {str(e)}")
@@ -132,13 +178,128 @@ async def predict_employees(request: PredictionRequest):
         logger.error(f"Prediction error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
 
+@app.post("/predict/aggregate", response_model=AggregateResponse)
+async def predict_aggregate(request: AggregateRequest):
+    """
+    Score employees and return only per-group summaries
+    
+    Groups by the requested keys (default `position_id`) and returns each
+    group's size, at-risk count and share, potential mix, mean scores and
+    resignation probability quantiles instead of per-employee results.
+    """
+    try:
+        logger.info(f"Received aggregate prediction request for {len(request.employees)} employees by {request.group_by}")
+        
+        snapshot = ml_service.get_snapshot(request.model_version)
+        groups = await ml_service.aggregate_predictions(request.employees, request.group_by, request.quantiles, snapshot)
+        
+        return AggregateResponse(
+            success=True,
+            data=groups or [],
+            timestamp=datetime.now(),
+            total_employees=len(request.employees),
+            total_groups=len(groups or []),
+            model_version=snapshot.version if snapshot else ml_service.get_model_version(),
+            model_status="ready" if groups is not None else ml_service.get_model_status()["status"]
+        )
+        
+    except ValueError as e:
+        logger.error(f"Validation error in aggregate prediction request: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Aggregate prediction error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to aggregate predictions: {str(e)}")
+
+@app.post("/predict/top", response_model=TopRiskResponse)
+async def predict_top(request: TopRiskRequest, explain: bool = False, top_features: int = 5):
+    """
+    Score employees and return only the K most likely to resign
+    
+    The whole batch is scored; employees are then optionally filtered by
+    `potential` class and `position_ids` and the `k` highest resignation
+    probabilities returned, highest first. `explain=true` adds risk
+    factors for the returned employees only.
+    """
+    try:
+        logger.info(f"Received top-{request.k} risk request for {len(request.employees)} employees")
+        
+        if explain and top_features < 1:
+            raise ValueError("top_features must be at least 1")
+        
+        snapshot = ml_service.get_snapshot(request.model_version)
+        ranked = await ml_service.top_risk_predictions(
+            request.employees, request.k, request.potential, request.position_ids, snapshot, explain, top_features
+        )
+        predictions, matched = ranked if ranked is not None else ([], 0)
+        
+        return TopRiskResponse(
+            success=True,
+            data=predictions,
+            timestamp=datetime.now(),
+            total_employees=len(request.employees),
+            matched_employees=matched,
+            model_version=snapshot.version if snapshot else ml_service.get_model_version(),
+            model_status="ready" if ranked is not None else ml_service.get_model_status()["status"]
+        )
+        
+    except ValueError as e:
+        logger.error(f"Validation error in top risk request: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Top risk prediction error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to rank predictions: {str(e)}")
+
+@app.post("/simulate", response_model=SimulationResponse)
+async def simulate_employees(request: SimulationRequest):
+    """
+    What-if resignation probabilities for a grid of feature changes
+    
+    Each perturbation varies one evaluation score or attendance field
+    (`add` to or `set` the employee's value); every combination of their
+    values is a scenario. All employees and scenarios are scored in one
+    model call, returned per employee in the order of `scenarios`.
+    """
+    try:
+        logger.info(f"Received simulation request for {len(request.employees)} employees over {len(request.perturbations)} perturbed fields")
+        
+        snapshot = ml_service.get_snapshot(request.model_version)
+        simulation = await ml_service.simulate(
+            request.employees, [p.model_dump() for p in request.perturbations], snapshot
+        )
+        employees = simulation['employees'] if simulation else []
+        scenarios = simulation['scenarios'] if simulation else []
+        
+        return SimulationResponse(
+            success=True,
+            data=employees,
+            scenarios=scenarios,
+            threshold=simulation['threshold'] if simulation else None,
+            timestamp=datetime.now(),
+            total_employees=len(request.employees),
+            total_scenarios=len(employees) * len(scenarios),
+            model_version=snapshot.version if snapshot else ml_service.get_model_version(),
+            model_status="ready" if simulation is not None else ml_service.get_model_status()["status"]
+        )
+        
+    except ValueError as e:
+        logger.error(f"Validation error in simulation request: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Simulation error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to simulate predictions: {str(e)}")
+
 @app.post("/train")
-async def train_model(request: PredictionRequest, background_tasks: BackgroundTasks):
+async def train_model(request: PredictionRequest, tune: bool = False, force: bool = False):
     """
     Train or retrain the ML model with provided data
     
     This endpoint accepts training data and retrains the model.
     Training happens in the background to avoid blocking the API.
+    With `tune=true` a budgeted successive-halving search over the
+    forest hyperparameters runs first and the winner is trained.
+    If the engineered training data and hyperparameters match the
+    current model's fingerprint, the call returns immediately with the
+    existing version unless `force=true`.
     """
     try:
         logger.info(f"Received training request with {len(request.employees)} employee records")
@@ -149,20 +310,92 @@ async def train_model(request: PredictionRequest, background_tasks: BackgroundTa
                 detail="Minimum 10 employee records required for training"
             )
         
+        profiler = StageProfiler()
+        with profiler:
+            X, y = ml_service.prepare_training_data(request.employees, profiler)
+        
+        if not tune and not force and ml_service.is_up_to_date(X, y):
+            logger.info("Training data unchanged; skipping retrain")
+            return {
+                "success": True,
+                "message": "Training data unchanged; model is up to date",
+                "timestamp": datetime.now(),
+                "training_data_size": len(request.employees),
+                "skipped": True,
+                "model_version": ml_service.get_model_version()
+            }
+        
         # Start training in background
-        background_tasks.add_task(ml_service.train_model, request.employees)
+        job = ml_service.start_training_job(X, y, tune=tune, force=force, profiler=profiler)
         
         return {
             "success": True,
-            "message": "Model training started in background",
+            "message": "Hyperparameter tuning started in background" if tune else "Model training started in background",
             "timestamp": datetime.now(),
-            "training_data_size": len(request.employees)
+            "training_data_size": len(request.employees),
+            "skipped": False,
+            "job_id": job["job_id"]
         }
         
+    except HTTPException:
+        raise
+    except ValueError as e:
+        logger.error(f"Invalid training request: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Training initiation error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to start training: {str(e)}")
 
+@app.post("/train/upload")
+async def train_model_upload(file: UploadFile = File(...), tune: bool = False, force: bool = False):
+    """
+    Train or retrain the ML model from an uploaded CSV or Parquet file
+    
+    The file is streamed to disk and read back in column-pruned row
+    batches, so historical datasets far larger than the JSON request
+    limit can be used. Training happens in the background and is skipped
+    when the data matches the current model's fingerprint, unless
+    `force=true`.
+    """
+    try:
+        file_format = detect_upload_format(file.filename)
+        path, size = await save_upload(file, ml_service.uploads_dir, settings.UPLOAD_MAX_MB * 1024 * 1024)
+        logger.info(f"Received {file_format} training upload of {size} bytes")
+        
+        job = ml_service.start_upload_training_job(path, file_format, tune=tune, force=force)
+        
+        return {
+            "success": True,
+            "message": "Model training from uploaded file started in background",
+            "timestamp": datetime.now(),
+            "upload_bytes": size,
+            "job_id": job["job_id"]
+        }
+        
+    except ValueError as e:
+        logger.error(f"Invalid training upload: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Training upload error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to start training: {str(e)}")
+
+@app.get("/train/jobs", response_model=List[JobStatusResponse])
+async def list_training_jobs():
+    """List background training and tuning jobs, newest first"""
+    try:
+        return [JobStatusResponse(**job) for job in ml_service.jobs.list()]
+    except Exception as e:
+        logger.error(f"Error listing training jobs: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to list training jobs: {str(e)}")
+
+@app.get("/train/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_training_job(job_id: str):
+    """Get the status of a background training or tuning job"""
+    job = ml_service.jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Training job {job_id} not found")
+    return JobStatusResponse(**job)
+
 @app.get("/model/stats", response_model=ModelStatsResponse)
 async def get_model_stats():
     """Get ML model statistics and information"""
@@ -173,6 +406,193 @@ async def get_model_stats():
         logger.error(f"Error getting model stats: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to get model stats: {str(e)}")
 
+@app.get("/model/importance", response_model=FeatureImportanceResponse)
+async def get_model_importance(version: Optional[str] = None):
+    """
+    Feature importance of the served (or a given) model version
+    
+    Impurity importance is recorded at training time. Permutation
+    importance is computed once per training run by a background job
+    and returned once it has finished.
+    """
+    try:
+        importance = ml_service.get_feature_importance(version)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error getting feature importance: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to get feature importance: {str(e)}")
+    
+    if importance is None:
+        raise HTTPException(status_code=404, detail="No model available; train a model first")
+    return FeatureImportanceResponse(**importance)
+
+@app.get("/model/drift", response_model=DriftResponse)
+async def get_model_drift():
+    """
+    Drift of prediction inputs from the served model's training data
+    
+    PSI and KS per feature, comparing the histograms of every feature seen
+    by /predict (all workers, since each loaded the served version)
+    with those recorded when the model was trained.
+    """
+    try:
+        report = ml_service.get_drift_report()
+    except Exception as e:
+        logger.error(f"Error getting drift report: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to get drift report: {str(e)}")
+    
+    if report is None:
+        raise HTTPException(status_code=404, detail="No drift baseline for the served model; train a model first")
+    return DriftResponse(**report)
+
+@app.get("/history/{employee_id}", response_model=HistoryResponse, response_model_exclude_unset=True)
+def get_employee_history(employee_id: int, days: int = 90, fields: Optional[str] = None):
+    """
+    Stored predictions of one employee
+    
+    Reads only the employee's employee_id bucket in each of the last
+    `days` day partitions and only the comma-separated score `fields`
+    asked for (default all). Requires HISTORY_ENABLED. A plain `def` so
+    the Parquet read runs in the threadpool, not on the event loop.
+    """
+    try:
+        field_list = [f.strip() for f in fields.split(',') if f.strip()] if fields else None
+        history = ml_service.get_prediction_history(employee_id, days, field_list)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error getting prediction history: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to get prediction history: {str(e)}")
+    
+    if history is None:
+        raise HTTPException(status_code=404, detail="Prediction history is disabled; set HISTORY_ENABLED to record it")
+    return HistoryResponse(**history)
+
+@app.get("/model/distribution", response_model=DistributionResponse)
+def get_model_distribution(
+    days: int = 30,
+    quantiles: Optional[str] = None,
+    score_fields: Optional[str] = Query(None, alias='metrics')
+):
+    """
+    Daily distribution of resignation probability and key features
+    
+    Built from mergeable quantile sketches that every worker updates as it
+    scores and writes to disk periodically, so a worker's latest batches
+    can take one maintenance interval to show up. `quantiles` and `metrics`
+    are comma-separated, e.g.
+    `?quantiles=0.1,0.5,0.9&metrics=resignation_probability`.
+    """
+    try:
+        distribution = ml_service.get_prediction_distribution(
+            days,
+            [float(q) for q in quantiles.split(',')] if quantiles else None,
+            [m.strip() for m in score_fields.split(',')] if score_fields else None
+        )
+        return DistributionResponse(success=True, timestamp=datetime.now(), **distribution)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error getting prediction distribution: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to get prediction distribution: {str(e)}")
+
+@app.get("/model/evaluation", response_model=EvaluationReportResponse)
+async def get_model_evaluation():
+    """Get the cross-validated evaluation report of the current model"""
+    try:
+        report = ml_service.get_evaluation_report()
+    except Exception as e:
+        logger.error(f"Error getting model evaluation: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to get model evaluation: {str(e)}")
+    
+    if report is None:
+        raise HTTPException(status_code=404, detail="No evaluation report available; train a model first")
+    return EvaluationReportResponse(**report)
+
+@app.get("/model/versions", response_model=List[ModelVersionResponse])
+async def list_model_versions():
+    """List the model versions kept in the registry, newest first"""
+    try:
+        return [ModelVersionResponse(**entry) for entry in ml_service.list_model_versions()]
+    except Exception as e:
+        logger.error(f"Error listing model versions: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to list model versions: {str(e)}")
+
+@app.post("/model/rollback")
+async def rollback_model(version: Optional[str] = None):
+    """
+    Make an earlier model version current and serve it.
+    
+    Without `version`, rolls back to the version published before the
+    current one.
+    """
+    try:
+        result = ml_service.rollback(version)
+        return {
+            "success": True,
+            "message": f"Rolled back to model version {result['model_version']}",
+            "timestamp": datetime.now(),
+            **result
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error rolling back model: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to roll back model: {str(e)}")
+
+@app.get("/model/shadow", response_model=ShadowStatsResponse)
+async def get_shadow_stats():
+    """Get agreement and latency statistics of the shadow model in this worker"""
+    stats = ml_service.get_shadow_stats()
+    if stats is None:
+        raise HTTPException(status_code=404, detail="Shadow scoring is not running")
+    return ShadowStatsResponse(**stats)
+
+@app.post("/model/shadow")
+async def start_shadow(version: str, sample_rate: float = settings.SHADOW_SAMPLE_RATE):
+    """
+    Score a candidate model version in shadow on a sample of /predict traffic.
+    
+    Shadow scoring runs after the response is computed, off the request
+    path. Statistics are kept per worker.
+    """
+    try:
+        stats = ml_service.start_shadow(version, sample_rate)
+        return {
+            "success": True,
+            "message": f"Shadow scoring started for model version {version}",
+            "timestamp": datetime.now(),
+            "shadow": stats
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error starting shadow scoring: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to start shadow scoring: {str(e)}")
+
+@app.delete("/model/shadow")
+async def stop_shadow():
+    """Stop shadow scoring and return its final statistics"""
+    stats = ml_service.stop_shadow()
+    return {
+        "success": True,
+        "message": "Shadow scoring stopped" if stats else "Shadow scoring was not running",
+        "timestamp": datetime.now(),
+        "shadow": stats
+    }
+
+@app.get("/metrics")
+async def get_metrics():
+    """
+    Prometheus metrics
+    
+    Request latency per route, latency of each /predict stage, batch
+    sizes, training run and stage durations and model load times.
+    """
+    body, content_type = metrics.render()
+    return Response(content=body, media_type=content_type)
+
 @app.delete("/model/cache")
 async def clear_model_cache():
     """Clear model cache and force reload"""
@@ -45,6 +45,12 @@ class EmployeeData(BaseSchema):
     absent_count: Optional[int] = Field(0, ge=0, description="Number of absences")
     present_count: Optional[int] = Field(0, ge=0, description="Number of present days")
 
+class RiskFactor(BaseSchema):
+    """Schema for one feature's contribution to a resignation probability"""
+    feature: str = Field(..., description="Model feature name")
+    value: float = Field(..., description="The employee's value of the feature")
+    contribution: float = Field(..., description="Change in resignation probability attributed to the feature (positive raises risk)")
+
 class PredictionResult(BaseSchema):
     """Schema for individual employee prediction result"""
     employee_id: int = Field(..., description="Employee identifier")
@@ -59,10 +65,12 @@ class PredictionResult(BaseSchema):
     tenure_months: int = Field(..., ge=0, description="Employee tenure in months")
     overall_score: float = Field(..., description="Overall evaluation score")
     avg_evaluation: float = Field(..., description="Average evaluation score")
+    risk_factors: Optional[List[RiskFactor]] = Field(None, description="Largest contributions to the resignation probability (with explain=true)")
 
 class PredictionRequest(BaseSchema):
     """Schema for prediction request"""
     employees: List[EmployeeData] = Field(..., description="List of employee data for prediction")
+    model_version: Optional[str] = Field(None, description="Registry model version to use instead of the served one")
     
     @validator('employees')
     def validate_employees(cls, v):
@@ -79,8 +87,118 @@ class PredictionResponse(BaseSchema):
     timestamp: datetime = Field(..., description="Response timestamp")
     total_employees: int = Field(..., description="Total number of employees processed")
     model_version: str = Field(..., description="ML model version used")
+    model_status: str = Field("ready", description="Model state: ready, training (baseline predictions returned) or untrained")
     error: Optional[str] = Field(None, description="Error message if any")
 
+class AggregateRequest(PredictionRequest):
+    """Schema for a grouped prediction rollup request"""
+    group_by: List[str] = Field(default_factory=lambda: ['position_id'], description="Keys to group by: position_id, gender, potential, resignation_status, tenure_years, age_band")
+    quantiles: List[float] = Field(default_factory=lambda: [0.25, 0.5, 0.75], description="Resignation probability quantiles to report per group")
+
+class AggregateGroup(BaseSchema):
+    """Schema for one group of a prediction rollup"""
+    keys: Dict[str, Any] = Field(..., description="Group key values")
+    count: int = Field(..., description="Employees in the group")
+    at_risk_count: int = Field(..., description="At-risk employees in the group")
+    at_risk_share: float = Field(..., description="Fraction of the group at risk")
+    potential_mix: Dict[str, int] = Field(..., description="Employees per potential class")
+    avg_performance_score: Optional[float] = Field(None, description="Average performance score")
+    avg_attendance_rate: Optional[float] = Field(None, description="Average attendance rate")
+    avg_resignation_probability: float = Field(..., description="Average resignation probability")
+    probability_quantiles: Dict[str, float] = Field(..., description="Resignation probability quantiles keyed by quantile")
+
+class AggregateResponse(BaseSchema):
+    """Schema for a grouped prediction rollup response"""
+    success: bool = Field(..., description="Request success status")
+    data: List[AggregateGroup] = Field(..., description="Group summaries")
+    timestamp: datetime = Field(..., description="Response timestamp")
+    total_employees: int = Field(..., description="Total number of employees scored")
+    total_groups: int = Field(..., description="Number of groups")
+    model_version: str = Field(..., description="ML model version used")
+    model_status: str = Field("ready", description="Model state: ready, or training/untrained (no groups returned)")
+
+class TopRiskRequest(PredictionRequest):
+    """Schema for a highest-risk employees request"""
+    k: int = Field(10, ge=1, description="Number of highest-risk employees to return")
+    potential: Optional[List[str]] = Field(None, description="Only employees in these potential classes")
+    position_ids: Optional[List[int]] = Field(None, description="Only employees in these positions")
+
+class TopRiskResponse(BaseSchema):
+    """Schema for a highest-risk employees response"""
+    success: bool = Field(..., description="Request success status")
+    data: List[PredictionResult] = Field(..., description="Highest-risk employees, most likely to resign first")
+    timestamp: datetime = Field(..., description="Response timestamp")
+    total_employees: int = Field(..., description="Total number of employees scored")
+    matched_employees: int = Field(..., description="Employees passing the filters")
+    model_version: str = Field(..., description="ML model version used")
+    model_status: str = Field("ready", description="Model state: ready, or training/untrained (no employees returned)")
+
+class Perturbation(BaseSchema):
+    """Schema for one axis of a what-if simulation grid"""
+    field: str = Field(..., description="EmployeeData evaluation score or attendance field to vary")
+    values: List[float] = Field(..., min_length=1, max_length=100, description="Values to try along this axis (at most 100)")
+    mode: str = Field('add', description="'add' each value to the employee's own, or 'set' the field to it")
+    
+    @validator('mode')
+    def validate_mode(cls, v):
+        if v not in ('add', 'set'):
+            raise ValueError("mode must be 'add' or 'set'")
+        return v
+
+class SimulationRequest(PredictionRequest):
+    """Schema for a what-if simulation request"""
+    perturbations: List[Perturbation] = Field(..., max_length=20, description="Grid axes, one per simulated field (at most 20); every combination of their values is one scenario")
+    
+    @validator('perturbations')
+    def validate_perturbations(cls, v):
+        if not v:
+            raise ValueError("At least one perturbation is required")
+        fields = [p.field for p in v]
+        if len(set(fields)) != len(fields):
+            raise ValueError("Each field can only be perturbed once")
+        return v
+
+class EmployeeSimulation(BaseSchema):
+    """Schema for one employee's simulated resignation probabilities"""
+    employee_id: int = Field(..., description="Employee identifier")
+    employee_name: str = Field(..., description="Employee name")
+    base_probability: Optional[float] = Field(None, description="Resignation probability with no changes (None if the employee's data is incomplete)")
+    base_status: str = Field(..., description="Resignation risk status with no changes")
+    probabilities: Optional[List[float]] = Field(None, description="Resignation probability per scenario, in the order of `scenarios`")
+    best_scenario: Optional[int] = Field(None, description="Index of the scenario with the lowest probability")
+    best_probability: Optional[float] = Field(None, description="Lowest scenario probability")
+
+class SimulationResponse(BaseSchema):
+    """Schema for a what-if simulation response"""
+    success: bool = Field(..., description="Request success status")
+    data: List[EmployeeSimulation] = Field(..., description="Simulated probabilities per employee")
+    scenarios: List[Dict[str, float]] = Field(..., description="Perturbation value of each field per scenario")
+    threshold: Optional[float] = Field(None, description="Probability above which an employee is at risk")
+    timestamp: datetime = Field(..., description="Response timestamp")
+    total_employees: int = Field(..., description="Total number of employees simulated")
+    total_scenarios: int = Field(..., description="Scenarios scored over all employees")
+    model_version: str = Field(..., description="ML model version used")
+    model_status: str = Field("ready", description="Model state: ready, or training/untrained (nothing simulated)")
+
+class HistoryPoint(BaseSchema):
+    """Schema for one stored prediction of an employee"""
+    timestamp: datetime = Field(..., description="When the prediction was made")
+    model_version: Optional[str] = Field(None, description="Model version that scored it")
+    resignation_probability: Optional[float] = Field(None, description="Resignation risk probability")
+    resignation_status: Optional[str] = Field(None, description="Resignation risk status")
+    potential: Optional[str] = Field(None, description="Potential classification")
+    performance_score: Optional[float] = Field(None, description="Performance score")
+    attendance_rate: Optional[float] = Field(None, description="Attendance rate percentage")
+    overall_score: Optional[float] = Field(None, description="Overall evaluation score")
+
+class HistoryResponse(BaseSchema):
+    """Schema for an employee's prediction history"""
+    employee_id: int = Field(..., description="Employee identifier")
+    days: int = Field(..., description="Days of history searched")
+    partitions_scanned: int = Field(..., description="Day partitions read (one employee_id bucket each)")
+    files_scanned: int = Field(..., description="Parquet files opened")
+    points: List[HistoryPoint] = Field(..., description="Stored predictions, oldest first")
+
 class ModelStatsResponse(BaseSchema):
     """Schema for model statistics response"""
     total_employees: int = Field(..., description="Total employees analyzed")
@@ -94,8 +212,137 @@ class ModelStatsResponse(BaseSchema):
     avg_attendance_rate: float = Field(..., description="Average attendance rate")
     model_version: str = Field(..., description="Model version")
     last_training: Optional[datetime] = Field(None, description="Last training timestamp")
+    training_profile: Optional[Dict[str, Any]] = Field(None, description="Per-stage timing and peak memory of the last training run")
     last_updated: datetime = Field(..., description="Last update timestamp")
 
+class FoldEvaluation(BaseSchema):
+    """Schema for one cross-validation fold"""
+    fold: int = Field(..., description="Fold index")
+    train_size: int = Field(..., description="Training rows in the fold")
+    test_size: int = Field(..., description="Held-out rows in the fold")
+    auc: float = Field(..., description="ROC AUC on the held-out rows")
+    precision: float = Field(..., description="Precision at the model threshold")
+    recall: float = Field(..., description="Recall at the model threshold")
+    fit_seconds: float = Field(..., description="Time to fit the fold's model")
+
+class EvaluationReportResponse(BaseSchema):
+    """Schema for the cross-validated model evaluation report"""
+    model_version: str = Field(..., description="Model version the report belongs to")
+    created_at: datetime = Field(..., description="Report creation timestamp")
+    n_splits: int = Field(..., description="Number of cross-validation folds")
+    threshold: float = Field(..., description="Resignation threshold used for precision/recall")
+    n_samples: int = Field(..., description="Training rows evaluated")
+    mean: Dict[str, float] = Field(..., description="Mean of each metric across folds")
+    std: Dict[str, float] = Field(..., description="Standard deviation of each metric across folds")
+    folds: List[FoldEvaluation] = Field(..., description="Per-fold results")
+    elapsed_seconds: float = Field(..., description="Wall time to compute the report")
+
+class JobStatusResponse(BaseSchema):
+    """Schema for background job status response"""
+    job_id: str = Field(..., description="Job identifier")
+    kind: str = Field(..., description="Job type (training, tuning)")
+    status: str = Field(..., description="Job status (queued, running, completed, failed)")
+    created_at: datetime = Field(..., description="Job creation timestamp")
+    started_at: Optional[datetime] = Field(None, description="Job start timestamp")
+    finished_at: Optional[datetime] = Field(None, description="Job completion timestamp")
+    result: Optional[Dict[str, Any]] = Field(None, description="Job result when completed")
+    error: Optional[str] = Field(None, description="Error message if the job failed")
+
+class ModelVersionResponse(BaseSchema):
+    """Schema for one model registry version"""
+    version: str = Field(..., description="Model version")
+    current: bool = Field(..., description="Whether this is the registry's current version")
+    loaded: bool = Field(..., description="Whether this worker is serving this version")
+    published_at: datetime = Field(..., description="Publication timestamp")
+    threshold: Optional[float] = Field(None, description="Decision threshold on resignation probability")
+    last_training: Optional[datetime] = Field(None, description="Training timestamp")
+    fingerprint: Optional[str] = Field(None, description="Training data fingerprint")
+    n_estimators: Optional[int] = Field(None, description="Number of trees in the forest")
+    metrics: Optional[Dict[str, float]] = Field(None, description="Mean cross-validation metrics")
+
+class ShadowStatsResponse(BaseSchema):
+    """Schema for shadow scoring statistics"""
+    shadow_version: str = Field(..., description="Model version scored in shadow")
+    sample_rate: float = Field(..., description="Fraction of prediction batches scored in shadow")
+    started_at: datetime = Field(..., description="When shadow scoring started")
+    batches_sampled: int = Field(..., description="Prediction batches scored by the shadow model")
+    batches_skipped: int = Field(..., description="Sampled batches dropped because too many were pending")
+    rows_scored: int = Field(..., description="Employees scored by the shadow model")
+    status_agreements: int = Field(..., description="Employees given the same risk status by both models")
+    errors: int = Field(..., description="Shadow scoring failures")
+    status_agreement_rate: Optional[float] = Field(None, description="Share of employees with the same risk status")
+    mean_abs_probability_diff: Optional[float] = Field(None, description="Mean absolute difference in resignation probability")
+    primary_latency: Dict[str, Optional[float]] = Field(..., description="Served model scoring latency percentiles (ms)")
+    shadow_latency: Dict[str, Optional[float]] = Field(..., description="Shadow model scoring latency percentiles (ms)")
+
+class FeatureImportance(BaseSchema):
+    """Schema for one feature's impurity importance"""
+    feature: str = Field(..., description="Feature name")
+    importance: float = Field(..., description="Mean decrease in impurity, summing to 1 over features")
+
+class PermutationImportanceItem(BaseSchema):
+    """Schema for one feature's permutation importance"""
+    feature: str = Field(..., description="Feature name")
+    mean: float = Field(..., description="Mean ROC AUC drop when the feature is shuffled")
+    std: float = Field(..., description="Standard deviation of the AUC drop across shuffles")
+
+class PermutationImportance(BaseSchema):
+    """Schema for a permutation importance report"""
+    created_at: datetime = Field(..., description="Computation timestamp")
+    baseline_auc: float = Field(..., description="ROC AUC before shuffling")
+    n_samples: int = Field(..., description="Training rows scored")
+    n_repeats: int = Field(..., description="Shuffles per feature")
+    importances: List[PermutationImportanceItem] = Field(..., description="Features, most important first")
+    elapsed_seconds: float = Field(..., description="Computation time")
+
+class FeatureImportanceResponse(BaseSchema):
+    """Schema for model feature importance"""
+    model_version: str = Field(..., description="Model version")
+    impurity: Optional[List[FeatureImportance]] = Field(None, description="Impurity importance, most important first (not recorded for models trained before it was stored)")
+    permutation: Optional[PermutationImportance] = Field(None, description="Permutation importance, once computed")
+    permutation_status: str = Field(..., description="completed, running or not_computed")
+    permutation_job_id: Optional[str] = Field(None, description="Background job computing permutation importance")
+
+class FeatureDrift(BaseSchema):
+    """Schema for one feature's drift from the training baseline"""
+    feature: str = Field(..., description="Feature name")
+    psi: Optional[float] = Field(None, description="Population stability index against the training histogram")
+    ks: Optional[float] = Field(None, description="Kolmogorov-Smirnov distance over the baseline bins")
+    status: str = Field(..., description="stable (PSI < 0.1), moderate (< 0.25), significant or no_data")
+    observed: int = Field(..., description="Non-missing values observed")
+    missing_rate: Optional[float] = Field(None, description="Fraction of observed rows missing the feature")
+    baseline_missing_rate: Optional[float] = Field(None, description="Fraction of training rows missing the feature")
+
+class DriftResponse(BaseSchema):
+    """Schema for input drift of the served model"""
+    model_version: str = Field(..., description="Served model version")
+    since: datetime = Field(..., description="Start of the observation window")
+    observed_rows: int = Field(..., description="Prediction rows observed")
+    baseline_rows: int = Field(..., description="Training rows in the baseline")
+    max_psi: Optional[float] = Field(None, description="Largest feature PSI")
+    status: str = Field(..., description="Status of the most drifted feature")
+    features: List[FeatureDrift] = Field(..., description="Features, most drifted first")
+
+class MetricDistribution(BaseSchema):
+    """Schema for one metric's sketched distribution"""
+    count: int = Field(..., description="Values observed")
+    min: Optional[float] = Field(None, description="Smallest value")
+    max: Optional[float] = Field(None, description="Largest value")
+    quantiles: Dict[str, Optional[float]] = Field(..., description="Approximate values keyed by quantile")
+
+class DailyDistribution(BaseSchema):
+    """Schema for one day's sketched distributions"""
+    date: str = Field(..., description="Day (YYYY-MM-DD)")
+    metrics: Dict[str, MetricDistribution] = Field(..., description="Distribution per metric")
+
+class DistributionResponse(BaseSchema):
+    """Schema for prediction distribution over time"""
+    success: bool = Field(..., description="Request success status")
+    quantiles: List[float] = Field(..., description="Quantiles reported")
+    days: List[DailyDistribution] = Field(..., description="Per-day distributions, oldest first")
+    overall: Dict[str, MetricDistribution] = Field(..., description="Distributions over all returned days")
+    timestamp: datetime = Field(..., description="Response timestamp")
+
 class HealthResponse(BaseSchema):
     """Schema for health check response"""
     status: str = Field(..., description="Service status")
@@ -0,0 +1,339 @@
+"""
+Compact Forest Export
+=====================
+
+A smaller on-disk form of the forest for serving:
+
+* thresholds as float32, each rounded down to the largest float32 not
+  above the float64 split value, so comparisons against float32 inputs
+  take exactly the same branch as the original tree;
+* child indices local to their tree, stored in the narrowest unsigned
+  type that fits the largest tree, and feature indices as int8/int16;
+* class probabilities for leaves only, as float32 (internal nodes need
+  none for prediction).
+
+A leaf is marked by feature -1, and its left-child slot holds the
+leaf's index into the tree's probabilities. Like the full layout the
+arrays are plain .npy files loaded with memory mapping.
+
+Run ``python -m app.services.compact_forest`` to compare file size and
+load time against a joblib pickle of the same forest.
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+
+from .forest_arrays import ForestArrays, PREDICT_CHUNK_ROWS, TREE_APPLY_MIN_ROWS, build_tree
+
+COMPACT_LAYOUT_VERSION = 1
+
+COMPACT_ARRAY_NAMES = [
+    'children_left', 'children_right', 'feature', 'threshold', 'missing_left',
+    'leaf_value', 'node_offsets', 'leaf_offsets',
+]
+
+HEADER_FILE = 'compact.json'
+
+
+def _unsigned_dtype(max_value: int) -> np.dtype:
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if max_value <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.uint64)
+
+
+def _feature_dtype(n_features: int) -> np.dtype:
+    return np.dtype(np.int8) if n_features <= np.iinfo(np.int8).max else np.dtype(np.int16)
+
+
+def float32_floor(values: np.ndarray) -> np.ndarray:
+    """Largest float32 not greater than each float64 value"""
+    rounded = values.astype(np.float32)
+    too_high = rounded.astype(np.float64) > values
+    rounded[too_high] = np.nextafter(rounded[too_high], np.float32(-np.inf))
+    return rounded
+
+
+class CompactForest:
+    """Evaluator over the compact layout, a drop-in for ForestArrays.predict_proba"""
+
+    def __init__(self, arrays: Dict[str, np.ndarray], header: Dict[str, Any]):
+        for name in COMPACT_ARRAY_NAMES:
+            setattr(self, name, arrays[name])
+
+        self.n_features_in_: int = header['n_features']
+        self.classes_ = np.asarray(header['classes'])
+        self.max_depth: int = header['max_depth']
+        self.feature_names_in_ = header.get('feature_names')
+        self.n_jobs = 1
+
+    @property
+    def n_estimators(self) -> int:
+        return len(self.node_offsets)
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.feature)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in COMPACT_ARRAY_NAMES)
+
+    @property
+    def is_mapped(self) -> bool:
+        return isinstance(self.feature, np.memmap)
+
+    @classmethod
+    def from_forest(cls, forest: ForestArrays) -> 'CompactForest':
+        """Convert the full array layout"""
+        n_nodes = forest.n_nodes
+        node_offsets = np.asarray(forest.roots, dtype=np.int64)
+        tree_of_node = np.repeat(
+            np.arange(forest.n_estimators),
+            np.diff(np.append(node_offsets, n_nodes))
+        )
+        node_index = np.arange(n_nodes)
+        is_leaf = np.asarray(forest.children_left) == node_index
+
+        # Leaves numbered within their tree, in node order
+        leaf_nodes = np.flatnonzero(is_leaf)
+        leaf_counts = np.bincount(tree_of_node[leaf_nodes], minlength=forest.n_estimators)
+        leaf_offsets = np.concatenate([[0], np.cumsum(leaf_counts)[:-1]]).astype(np.int64)
+        local_leaf = np.arange(len(leaf_nodes)) - leaf_offsets[tree_of_node[leaf_nodes]]
+
+        local_left = np.asarray(forest.children_left) - node_offsets[tree_of_node]
+        local_right = np.asarray(forest.children_right) - node_offsets[tree_of_node]
+        local_left[leaf_nodes] = local_leaf
+        local_right[leaf_nodes] = 0
+
+        index_dtype = _unsigned_dtype(int(max(local_left.max(initial=0), local_right.max(initial=0))))
+        feature = np.asarray(forest.feature).astype(_feature_dtype(forest.n_features_in_))
+        feature[is_leaf] = -1
+
+        arrays = {
+            'children_left': local_left.astype(index_dtype),
+            'children_right': local_right.astype(index_dtype),
+            'feature': feature,
+            'threshold': float32_floor(np.asarray(forest.threshold, dtype=np.float64)),
+            'missing_left': np.asarray(forest.missing_left, dtype=np.bool_),
+            'leaf_value': np.asarray(forest.value)[leaf_nodes].astype(np.float32),
+            'node_offsets': node_offsets,
+            'leaf_offsets': leaf_offsets,
+        }
+        return cls(arrays, forest.header())
+
+    def header(self) -> Dict[str, Any]:
+        return {
+            'layout_version': COMPACT_LAYOUT_VERSION,
+            'n_features': self.n_features_in_,
+            'classes': [int(c) for c in self.classes_],
+            'max_depth': self.max_depth,
+            'n_estimators': self.n_estimators,
+            'n_nodes': self.n_nodes,
+            'feature_names': self.feature_names_in_,
+        }
+
+    def save(self, directory: str):
+        """Write the arrays and header, each renamed into place (see ForestArrays.save)"""
+        os.makedirs(directory, exist_ok=True)
+
+        for name in COMPACT_ARRAY_NAMES:
+            path = os.path.join(directory, f"{name}.npy")
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                np.save(f, np.ascontiguousarray(getattr(self, name)))
+            os.replace(tmp_path, path)
+
+        header_path = os.path.join(directory, HEADER_FILE)
+        tmp_path = f"{header_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.header(), f)
+        os.replace(tmp_path, header_path)
+
+    @classmethod
+    def exists(cls, directory: str) -> bool:
+        return os.path.exists(os.path.join(directory, HEADER_FILE))
+
+    @classmethod
+    def load(cls, directory: str, mmap_mode: Optional[str] = 'r') -> 'CompactForest':
+        """Open a saved compact forest, memory-mapped read-only by default"""
+        with open(os.path.join(directory, HEADER_FILE), 'r', encoding='utf-8') as f:
+            header = json.load(f)
+
+        if header.get('layout_version') != COMPACT_LAYOUT_VERSION:
+            raise ValueError(f"Unsupported compact forest layout version {header.get('layout_version')}")
+
+        arrays = {
+            name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode)
+            for name in COMPACT_ARRAY_NAMES
+        }
+        return cls(arrays, header)
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """Global leaf index (into leaf_value) reached in every tree, shape (n_samples, n_estimators)"""
+        n_samples, n_features = X.shape
+        n_trees = self.n_estimators
+        flat_X = X.ravel()
+        check_missing = bool(np.isnan(flat_X).any())
+
+        trees = np.tile(np.arange(n_trees), n_samples)
+        row_offsets = np.repeat(np.arange(n_samples, dtype=np.int64) * n_features, n_trees)
+        leaves = np.empty(n_samples * n_trees, dtype=np.int64)
+
+        active = np.arange(n_samples * n_trees)
+        nodes = self.node_offsets[trees]
+        while len(active):
+            feature = self.feature[nodes]
+            at_leaf = feature < 0
+            if at_leaf.any():
+                done = active[at_leaf]
+                leaves[done] = self.leaf_offsets[trees[done]] + self.children_left[nodes[at_leaf]]
+                keep = ~at_leaf
+                active, nodes, feature = active[keep], nodes[keep], feature[keep]
+                if not len(active):
+                    break
+
+            x = flat_X[row_offsets[active] + feature]
+            go_left = x <= self.threshold[nodes]
+            if check_missing:
+                go_left |= np.isnan(x) & self.missing_left[nodes]
+            local = np.where(go_left, self.children_left[nodes], self.children_right[nodes])
+            nodes = self.node_offsets[trees[active]] + local
+
+        return leaves.reshape(n_samples, n_trees)
+
+    def _positive_proba(self, X: np.ndarray) -> np.ndarray:
+        return self.leaf_value[self.apply(X)].astype(np.float64).sum(axis=1) / self.n_estimators
+
+    def _tree_value_sum(self, X: np.ndarray, trees: range) -> np.ndarray:
+        """Sum of leaf probabilities over `trees`, each traversed by scikit-learn (see forest_arrays)"""
+        n_nodes = len(self.feature)
+        total = np.zeros(len(X))
+        for tree in trees:
+            start = int(self.node_offsets[tree])
+            end = int(self.node_offsets[tree + 1]) if tree + 1 < self.n_estimators else n_nodes
+            feature = self.feature[start:end].astype(np.int64)
+            left = self.children_left[start:end].astype(np.int64)
+            is_leaf = feature < 0
+            estimator = build_tree(
+                self.n_features_in_, self.max_depth,
+                np.where(is_leaf, -1, left), self.children_right[start:end].astype(np.int64),
+                feature, self.threshold[start:end].astype(np.float64), self.missing_left[start:end],
+            )
+            total += self.leaf_value[int(self.leaf_offsets[tree]) + left[estimator.apply(X)]]
+        return total
+
+    def _positive_proba_by_tree(self, X: np.ndarray) -> np.ndarray:
+        X = np.ascontiguousarray(X)
+        n_groups = min(max(1, self.n_jobs), self.n_estimators)
+        bounds = np.linspace(0, self.n_estimators, n_groups + 1).astype(int)
+        groups = [range(bounds[i], bounds[i + 1]) for i in range(n_groups)]
+        if n_groups > 1:
+            parts = Parallel(n_jobs=n_groups, prefer='threads')(delayed(self._tree_value_sum)(X, g) for g in groups)
+        else:
+            parts = [self._tree_value_sum(X, groups[0])]
+        return np.sum(parts, axis=0) / self.n_estimators
+
+    def predict_proba(self, X) -> np.ndarray:
+        """Class probabilities, matching ForestArrays.predict_proba up to float32 leaf rounding"""
+        X = np.asarray(X.to_numpy() if isinstance(X, pd.DataFrame) else X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Expected {self.n_features_in_} features, got shape {X.shape}")
+
+        if len(X) >= TREE_APPLY_MIN_ROWS:
+            positive = self._positive_proba_by_tree(X)
+        else:
+            chunk_rows = min(PREDICT_CHUNK_ROWS, max(1, -(-len(X) // max(1, self.n_jobs))))
+            chunks = [X[start:start + chunk_rows] for start in range(0, len(X), chunk_rows)]
+            if len(chunks) > 1 and self.n_jobs > 1:
+                parts = Parallel(n_jobs=self.n_jobs, prefer='threads')(delayed(self._positive_proba)(c) for c in chunks)
+            else:
+                parts = [self._positive_proba(c) for c in chunks]
+            positive = np.concatenate(parts) if parts else np.empty(0, dtype=np.float64)
+
+        if len(self.classes_) < 2:
+            return positive[:, None] if 1 in self.classes_ else (1.0 - positive)[:, None]
+        return np.column_stack([1.0 - positive, positive])
+
+
+def _dir_size(directory: str) -> int:
+    return sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+
+
+def _best_of(func, repeat: int = 3) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def benchmark(model, X: np.ndarray, work_dir: str) -> Dict[str, Any]:
+    """
+    File size, load time and first-prediction time of a fitted forest as
+    a joblib pickle, the full array layout and the compact layout.
+    """
+    import joblib
+
+    pickle_path = os.path.join(work_dir, 'model.pkl')
+    full_dir = os.path.join(work_dir, 'forest')
+    compact_dir = os.path.join(work_dir, 'compact')
+
+    joblib.dump(model, pickle_path)
+    forest = ForestArrays.from_estimator(model)
+    forest.save(full_dir)
+    CompactForest.from_forest(forest).save(compact_dir)
+
+    reference = model.predict_proba(X)[:, 1]
+    results = {}
+    for name, size, load in (
+        ('joblib_pickle', os.path.getsize(pickle_path), lambda: joblib.load(pickle_path)),
+        ('forest_arrays', _dir_size(full_dir), lambda: ForestArrays.load(full_dir)),
+        ('compact', _dir_size(compact_dir), lambda: CompactForest.load(compact_dir)),
+    ):
+        evaluator = load()
+        results[name] = {
+            'size_mb': round(size / (1024 * 1024), 3),
+            'load_ms': round(_best_of(load) * 1000, 3),
+            'predict_ms': round(_best_of(lambda: evaluator.predict_proba(X)) * 1000, 3),
+            'max_abs_diff': float(np.abs(evaluator.predict_proba(X)[:, 1] - reference).max()),
+        }
+    return results
+
+
+def main():
+    from sklearn.ensemble import RandomForestClassifier
+
+    parser = argparse.ArgumentParser(description="Compare forest storage formats")
+    parser.add_argument('--model', help="joblib pickle of a fitted RandomForestClassifier (default: train a synthetic one)")
+    parser.add_argument('--rows', type=int, default=5000, help="rows for the synthetic forest and the prediction batch")
+    parser.add_argument('--trees', type=int, default=300)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    if args.model:
+        import joblib
+        model = joblib.load(args.model)
+    else:
+        X_train = rng.uniform(1, 5, size=(args.rows, 21)).round(1)
+        y_train = (X_train[:, :3].mean(axis=1) + rng.normal(0, 0.5, args.rows) < 2.8).astype(int)
+        model = RandomForestClassifier(
+            n_estimators=args.trees, min_samples_leaf=2, class_weight='balanced', random_state=42, n_jobs=-1
+        ).fit(X_train, y_train)
+
+    X = rng.uniform(1, 5, size=(min(args.rows, 1000), model.n_features_in_)).round(1)
+    with tempfile.TemporaryDirectory() as work_dir:
+        print(json.dumps(benchmark(model, X, work_dir), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""
+Bulk Training Data Ingestion
+============================
+
+Streams uploaded CSV/Parquet training files to disk and reads them back
+in row batches restricted to the columns the feature pipeline uses, so
+large historical datasets are never held in memory as raw records or
+Pydantic models.
+"""
+
+import importlib.util
+import os
+import uuid
+from typing import Iterator, List, Tuple
+
+import pandas as pd
+from fastapi import UploadFile
+
+# Supported upload extensions and the reader used for each
+UPLOAD_FORMATS = {
+    '.csv': 'csv',
+    '.parquet': 'parquet',
+    '.pq': 'parquet',
+}
+
+# Columns read as text in CSV files
+TEXT_COLUMNS = ['employee_name', 'joining_date', 'birthday', 'gender']
+
+# Bytes copied per read while streaming an upload to disk
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+
+def detect_upload_format(filename: str) -> str:
+    """Map an uploaded file name to 'csv' or 'parquet'"""
+    extension = os.path.splitext(filename or '')[1].lower()
+    if extension not in UPLOAD_FORMATS:
+        raise ValueError(f"Unsupported training file type '{extension}'. Upload a .csv or .parquet file")
+    if UPLOAD_FORMATS[extension] == 'parquet' and importlib.util.find_spec('pyarrow') is None:
+        raise ValueError("Parquet uploads require the pyarrow package")
+    return UPLOAD_FORMATS[extension]
+
+
+async def save_upload(upload: UploadFile, dest_dir: str, max_bytes: int) -> Tuple[str, int]:
+    """Stream an uploaded file to `dest_dir` in fixed-size chunks, returning its path and size"""
+    extension = os.path.splitext(upload.filename or '')[1].lower()
+    path = os.path.join(dest_dir, f"{uuid.uuid4().hex}{extension}")
+    size = 0
+
+    try:
+        with open(path, 'wb') as f:
+            while True:
+                chunk = await upload.read(UPLOAD_CHUNK_BYTES)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise ValueError(f"Training file exceeds the {max_bytes // (1024 * 1024)} MB upload limit")
+                f.write(chunk)
+    except Exception:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+    finally:
+        await upload.close()
+
+    return path, size
+
+
+def iter_training_batches(
+    path: str,
+    file_format: str,
+    columns: List[str],
+    batch_size: int
+) -> Iterator[pd.DataFrame]:
+    """Yield DataFrames of at most `batch_size` rows holding only the known `columns`"""
+    if file_format == 'csv':
+        yield from _iter_csv_batches(path, columns, batch_size)
+    elif file_format == 'parquet':
+        yield from _iter_parquet_batches(path, columns, batch_size)
+    else:
+        raise ValueError(f"Unsupported training file format: {file_format}")
+
+
+def _iter_csv_batches(path: str, columns: List[str], batch_size: int) -> Iterator[pd.DataFrame]:
+    header = pd.read_csv(path, nrows=0).columns
+    present = [col for col in columns if col in header]
+    if not present:
+        raise ValueError("Training file has none of the expected employee columns")
+
+    dtypes = {col: str for col in TEXT_COLUMNS if col in present}
+    yield from pd.read_csv(path, usecols=present, dtype=dtypes, chunksize=batch_size)
+
+
+def _iter_parquet_batches(path: str, columns: List[str], batch_size: int) -> Iterator[pd.DataFrame]:
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError("Parquet uploads require the pyarrow package")
+
+    parquet_file = pq.ParquetFile(path)
+    present = [col for col in columns if col in parquet_file.schema_arrow.names]
+    if not present:
+        raise ValueError("Training file has none of the expected employee columns")
+
+    for batch in parquet_file.iter_batches(batch_size=batch_size, columns=present):
+        yield batch.to_pandas()
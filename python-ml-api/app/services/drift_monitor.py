@@ -0,0 +1,172 @@
+"""
+Input Drift Monitoring
+======================
+
+At training time each feature's distribution is summarized as a
+histogram over quantile bin edges of the training rows. Every scored
+batch is then binned against the same edges and added to running
+counters, and the population stability index (PSI) and a binned
+Kolmogorov-Smirnov distance compare the two per feature.
+
+Binning sorts the batch once per feature (one stacked sort call) and
+locates the edges in each sorted row, so a batch costs a sort rather
+than a bin search per value.
+"""
+
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Floor for bin proportions in the PSI, so empty bins stay finite
+PSI_EPSILON = 1e-4
+
+# PSI bands commonly used for population stability
+PSI_MODERATE = 0.1
+PSI_SIGNIFICANT = 0.25
+
+
+def search_keys(edges: List[np.ndarray]) -> np.ndarray:
+    """
+    Bin edges of each feature as one row, right-padded with NaN. NaNs sort
+    last, so a NaN key's position is the feature's count of non-missing
+    values and padding bins come out empty.
+    """
+    keys = np.full((len(edges), max(map(len, edges), default=0) + 1), np.nan)
+    for row, feature_edges in zip(keys, edges):
+        row[:len(feature_edges)] = feature_edges
+    return keys
+
+
+def histogram_counts(columns: np.ndarray, keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Counts per feature row of `columns` (features x values) in the bins
+    (-inf, e0), [e0, e1), ..., [ek, inf) - as np.histogram with outer
+    edges at +-inf - zero-padded like `keys`, and missing counts.
+    """
+    columns = np.sort(columns, axis=1)
+    bounds = np.empty(keys.shape, dtype=np.int64)
+    for row, (values, feature_keys) in enumerate(zip(columns, keys)):
+        bounds[row] = np.searchsorted(values, feature_keys)
+
+    counts = bounds.copy()
+    counts[:, 1:] -= bounds[:, :-1]
+    return counts, columns.shape[1] - bounds[:, -1]
+
+
+def build_baseline(X: pd.DataFrame, feature_names: List[str], bins: int = 10) -> Dict[str, Any]:
+    """Quantile bin edges and counts of the training rows, per feature"""
+    values = X[feature_names].to_numpy(dtype=np.float64)
+    quantiles = np.linspace(0, 1, bins + 1)[1:-1]
+
+    edges = []
+    for j in range(values.shape[1]):
+        column = values[:, j][~np.isnan(values[:, j])]
+        edges.append(np.unique(np.quantile(column, quantiles)) if len(column) else np.empty(0))
+
+    counts, missing = histogram_counts(values.T, search_keys(edges))
+    return {
+        'created_at': datetime.now().isoformat(),
+        'n_rows': int(len(values)),
+        'features': [
+            {'name': name, 'edges': e.tolist(), 'counts': c[:len(e) + 1].tolist(), 'missing': int(m)}
+            for name, e, c, m in zip(feature_names, edges, counts, missing)
+        ],
+    }
+
+
+def _drift_scores(expected: np.ndarray, observed: np.ndarray) -> Tuple[Optional[float], Optional[float]]:
+    if expected.sum() == 0 or observed.sum() == 0:
+        return None, None
+
+    e = np.maximum(expected / expected.sum(), PSI_EPSILON)
+    o = np.maximum(observed / observed.sum(), PSI_EPSILON)
+    psi = float(np.sum((o - e) * np.log(o / e)))
+    ks = float(np.max(np.abs(np.cumsum(observed) / observed.sum() - np.cumsum(expected) / expected.sum())))
+    return psi, ks
+
+
+def _psi_status(psi: Optional[float]) -> str:
+    if psi is None:
+        return 'no_data'
+    if psi >= PSI_SIGNIFICANT:
+        return 'significant'
+    if psi >= PSI_MODERATE:
+        return 'moderate'
+    return 'stable'
+
+
+class DriftMonitor:
+    """Running input histograms of one model version against its training baseline"""
+
+    def __init__(self, baseline: Dict[str, Any], version: str):
+        self.baseline = baseline
+        self.version = version
+        self.started_at = datetime.now()
+        self._columns = [f['name'] for f in baseline['features']]
+        self._bins = [len(f['edges']) + 1 for f in baseline['features']]
+        self._keys = search_keys([f['edges'] for f in baseline['features']])
+
+        self._lock = threading.Lock()
+        self._rows = 0
+        self._counts = np.zeros(self._keys.shape, dtype=np.int64)
+        self._missing = np.zeros(len(self._columns), dtype=np.int64)
+
+    def update(self, df: pd.DataFrame):
+        """Fold a batch holding the baseline's feature columns (NaN for missing) into the counters"""
+        if not len(df):
+            return
+
+        columns = np.empty((len(self._columns), len(df)))
+        for row, name in zip(columns, self._columns):
+            row[:] = df[name].to_numpy()
+        counts, missing = histogram_counts(columns, self._keys)
+        with self._lock:
+            self._rows += len(df)
+            self._counts += counts
+            self._missing += missing
+
+    def totals(self) -> Dict[str, Any]:
+        """Raw counters, JSON-serializable for heartbeats and mergeable in `report`"""
+        with self._lock:
+            return {
+                'version': self.version,
+                'rows': self._rows,
+                'counts': [c[:bins].tolist() for c, bins in zip(self._counts, self._bins)],
+                'missing': self._missing.tolist(),
+                'started_at': self.started_at.timestamp(),
+            }
+
+    def report(self, others: Iterable[Dict[str, Any]] = ()) -> Dict[str, Any]:
+        """PSI and KS per feature over this worker's counters plus other workers' totals for the same version"""
+        parts = [self.totals()] + [part for part in others if part.get('version') == self.version]
+        rows = sum(part['rows'] for part in parts)
+        started_at = min(part['started_at'] for part in parts)
+
+        features = []
+        for j, feature in enumerate(self.baseline['features']):
+            observed = np.sum([np.asarray(part['counts'][j]) for part in parts], axis=0)
+            missing = sum(part['missing'][j] for part in parts)
+            psi, ks = _drift_scores(np.asarray(feature['counts'], dtype=np.float64), observed.astype(np.float64))
+            features.append({
+                'feature': feature['name'],
+                'psi': psi,
+                'ks': ks,
+                'status': _psi_status(psi),
+                'observed': int(observed.sum()),
+                'missing_rate': missing / rows if rows else None,
+                'baseline_missing_rate': feature['missing'] / self.baseline['n_rows'] if self.baseline['n_rows'] else None,
+            })
+
+        scored = [f['psi'] for f in features if f['psi'] is not None]
+        return {
+            'model_version': self.version,
+            'since': datetime.fromtimestamp(started_at),
+            'observed_rows': rows,
+            'baseline_rows': self.baseline['n_rows'],
+            'max_psi': max(scored) if scored else None,
+            'status': _psi_status(max(scored) if scored else None),
+            'features': sorted(features, key=lambda f: -1 if f['psi'] is None else f['psi'], reverse=True),
+        }
@@ -0,0 +1,80 @@
+"""
+Feature Importance
+==================
+
+Permutation importance of a fitted forest: how much ROC AUC drops when
+one feature's column is shuffled, breaking its link to the target. The
+features are scored in parallel through joblib, each task shuffling its
+own copy of the matrix. Impurity importance comes from the estimator at
+training time and is stored with the model metadata.
+"""
+
+import time
+from datetime import datetime
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.metrics import roc_auc_score
+
+
+def _permute_feature(
+    model,
+    X: np.ndarray,
+    y: np.ndarray,
+    column: int,
+    n_repeats: int,
+    baseline: float,
+    seed: int
+) -> np.ndarray:
+    """AUC drop for each of `n_repeats` shuffles of one column"""
+    rng = np.random.default_rng(seed)
+    X_permuted = X.copy()
+    drops = np.empty(n_repeats)
+    for repeat in range(n_repeats):
+        X_permuted[:, column] = rng.permutation(X[:, column])
+        drops[repeat] = baseline - roc_auc_score(y, model.predict_proba(X_permuted)[:, 1])
+    return drops
+
+
+def permutation_importance(
+    model,
+    X: pd.DataFrame,
+    y: pd.Series,
+    feature_names: List[str],
+    n_repeats: int = 5,
+    n_jobs: int = 1,
+    random_state: int = 42
+) -> Dict[str, Any]:
+    """
+    Mean and standard deviation of the AUC drop per feature, most
+    important first. `model` needs only `predict_proba`; features run
+    concurrently on `n_jobs` threads.
+    """
+    X = np.asarray(X, dtype=np.float32)
+    y = np.asarray(y)
+    if len(np.unique(y)) < 2:
+        raise ValueError("Permutation importance needs rows of both classes")
+
+    start = time.perf_counter()
+    baseline = roc_auc_score(y, model.predict_proba(X)[:, 1])
+    seeds = np.random.SeedSequence(random_state).generate_state(X.shape[1])
+
+    drops = Parallel(n_jobs=n_jobs, prefer='threads')(
+        delayed(_permute_feature)(model, X, y, column, n_repeats, baseline, int(seeds[column]))
+        for column in range(X.shape[1])
+    )
+
+    importances = [
+        {'feature': name, 'mean': float(d.mean()), 'std': float(d.std())}
+        for name, d in zip(feature_names, drops)
+    ]
+    return {
+        'created_at': datetime.now().isoformat(),
+        'baseline_auc': float(baseline),
+        'n_samples': int(len(y)),
+        'n_repeats': n_repeats,
+        'importances': sorted(importances, key=lambda item: item['mean'], reverse=True),
+        'elapsed_seconds': round(time.perf_counter() - start, 4),
+    }
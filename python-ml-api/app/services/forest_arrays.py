@@ -0,0 +1,374 @@
+"""
+Memory-Mapped Forest Layout
+===========================
+
+A fitted Random Forest flattened into a handful of plain numpy arrays
+(all trees' nodes concatenated) and saved as uncompressed ``.npy`` files.
+
+scikit-learn's tree objects copy their node arrays into private memory
+when unpickled, so ``joblib.load(..., mmap_mode='r')`` does not share a
+forest between processes. Loading these arrays with ``np.load(mmap_mode=
+'r')`` does: every worker maps the same files and the node data lives
+once in the page cache instead of once per worker heap.
+
+Small batches are scored by walking all trees level by level in numpy,
+which avoids per-tree call overhead and beats the forest's own
+predict_proba below roughly 100 rows. That walk costs several times
+more per row than scikit-learn's compiled traversal, so batches of
+`TREE_APPLY_MIN_ROWS` rows or more rebuild one scikit-learn tree at a
+time from the mapped arrays and let it do the traversal. Each tree is a
+short-lived private copy of one tree's nodes, so the forest as a whole
+stays shared.
+"""
+
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.tree._tree import NODE_DTYPE, Tree
+
+# Bumped whenever the on-disk array set changes incompatibly
+LAYOUT_VERSION = 1
+
+# Node arrays saved for every forest, one .npy file each
+ARRAY_NAMES = ['children_left', 'children_right', 'feature', 'threshold', 'missing_left', 'value', 'roots']
+
+# Rows scored per traversal pass; bounds the (rows x trees) index matrix
+PREDICT_CHUNK_ROWS = 2048
+
+# Batch size from which trees are rebuilt and traversed by scikit-learn.
+# Measured with 300 fully grown trees: the numpy walk takes 3-5 ms at 10
+# rows against 18 ms for the forest, breaks even near 100 rows and is 3-4x
+# slower from 1000 rows; rebuilding the trees costs about 25 ms per batch.
+TREE_APPLY_MIN_ROWS = 128
+
+HEADER_FILE = 'forest.json'
+
+_ONE_CLASS = np.array([1], dtype=np.intp)
+
+
+def build_tree(
+    n_features: int,
+    max_depth: int,
+    children_left: np.ndarray,
+    children_right: np.ndarray,
+    feature: np.ndarray,
+    threshold: np.ndarray,
+    missing_left: np.ndarray,
+) -> Tree:
+    """
+    A scikit-learn tree for traversal only (`Tree.apply`) from one tree's
+    node arrays, with child indices local to the tree and -1 marking
+    leaves. Node values are left empty.
+    """
+    n_nodes = len(children_left)
+    is_leaf = children_left < 0
+
+    nodes = np.zeros(n_nodes, dtype=NODE_DTYPE)
+    nodes['left_child'] = children_left
+    nodes['right_child'] = np.where(is_leaf, -1, children_right)
+    nodes['feature'] = np.where(is_leaf, -2, feature)
+    nodes['threshold'] = np.where(is_leaf, -2.0, threshold)
+    nodes['missing_go_to_left'] = missing_left
+
+    tree = Tree(n_features, _ONE_CLASS, 1)
+    tree.__setstate__({
+        'max_depth': max_depth,
+        'node_count': n_nodes,
+        'nodes': nodes,
+        'values': np.zeros((n_nodes, 1, 1)),
+    })
+    return tree
+
+
+class ForestArrays:
+    """
+    Array form of a fitted binary RandomForestClassifier.
+
+    Leaf nodes point at themselves, which marks them during traversal. `value` holds each node's positive-class
+    probability; predict_proba averages the leaf values over trees exactly
+    as the forest does.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray], header: Dict[str, Any]):
+        self.children_left = arrays['children_left']
+        self.children_right = arrays['children_right']
+        self.feature = arrays['feature']
+        self.threshold = arrays['threshold']
+        self.missing_left = arrays['missing_left']
+        self.value = arrays['value']
+        self.roots = arrays['roots']
+
+        self.n_features_in_: int = header['n_features']
+        self.classes_ = np.asarray(header['classes'])
+        self.max_depth: int = header['max_depth']
+        self.feature_names_in_: Optional[List[str]] = header.get('feature_names')
+        self.n_jobs = 1
+
+    @property
+    def n_estimators(self) -> int:
+        return len(self.roots)
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.value)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes of node data, i.e. what each worker would hold privately without mmap"""
+        return sum(getattr(self, name).nbytes for name in ARRAY_NAMES)
+
+    @property
+    def is_mapped(self) -> bool:
+        return isinstance(self.value, np.memmap)
+
+    @classmethod
+    def from_estimator(cls, model) -> 'ForestArrays':
+        """Flatten a fitted RandomForestClassifier"""
+        classes = list(model.classes_)
+        positive = classes.index(1) if 1 in classes else None
+
+        parts: Dict[str, List[np.ndarray]] = {name: [] for name in ARRAY_NAMES if name != 'roots'}
+        roots, offset, max_depth = [], 0, 0
+
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            n = tree.node_count
+            index = np.arange(offset, offset + n, dtype=np.int32)
+            is_leaf = tree.children_left < 0
+
+            parts['children_left'].append(np.where(is_leaf, index, tree.children_left + offset).astype(np.int32))
+            parts['children_right'].append(np.where(is_leaf, index, tree.children_right + offset).astype(np.int32))
+            parts['feature'].append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+            parts['threshold'].append(tree.threshold.astype(np.float64))
+            parts['missing_left'].append(tree.missing_go_to_left.astype(np.bool_))
+
+            # Per-node class distribution, normalized as DecisionTreeClassifier.predict_proba does
+            counts = tree.value[:, 0, :]
+            totals = counts.sum(axis=1)
+            totals[totals == 0] = 1.0
+            value = counts[:, positive] / totals if positive is not None else np.zeros(n)
+            parts['value'].append(value.astype(np.float64))
+
+            roots.append(offset)
+            offset += n
+            max_depth = max(max_depth, tree.max_depth)
+
+        arrays = {name: np.concatenate(values) for name, values in parts.items()}
+        arrays['roots'] = np.asarray(roots, dtype=np.int64)
+
+        header = {
+            'layout_version': LAYOUT_VERSION,
+            'n_features': int(model.n_features_in_),
+            'classes': [int(c) for c in classes],
+            'max_depth': int(max_depth),
+            'n_estimators': len(roots),
+            'n_nodes': int(offset),
+            'feature_names': [str(f) for f in getattr(model, 'feature_names_in_', [])] or None,
+        }
+        return cls(arrays, header)
+
+    def save(self, directory: str):
+        """
+        Write the arrays as uncompressed .npy files plus a JSON header.
+
+        Each file is written under a temporary name and renamed into place:
+        truncating a file another process has mapped would crash it, while
+        a rename leaves the old inode alive until its readers unmap it.
+        """
+        os.makedirs(directory, exist_ok=True)
+
+        for name in ARRAY_NAMES:
+            path = os.path.join(directory, f"{name}.npy")
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                np.save(f, np.ascontiguousarray(getattr(self, name)))
+            os.replace(tmp_path, path)
+
+        header_path = os.path.join(directory, HEADER_FILE)
+        tmp_path = f"{header_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.header(), f)
+        os.replace(tmp_path, header_path)
+
+    def header(self) -> Dict[str, Any]:
+        return {
+            'layout_version': LAYOUT_VERSION,
+            'n_features': self.n_features_in_,
+            'classes': [int(c) for c in self.classes_],
+            'max_depth': self.max_depth,
+            'n_estimators': self.n_estimators,
+            'n_nodes': self.n_nodes,
+            'feature_names': self.feature_names_in_,
+        }
+
+    @classmethod
+    def exists(cls, directory: str) -> bool:
+        return os.path.exists(os.path.join(directory, HEADER_FILE))
+
+    @classmethod
+    def read_header(cls, directory: str) -> Optional[Dict[str, Any]]:
+        """The saved header without opening the arrays, or None if any file is missing"""
+        if not all(os.path.exists(os.path.join(directory, f"{name}.npy")) for name in ARRAY_NAMES):
+            return None
+        try:
+            with open(os.path.join(directory, HEADER_FILE), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    @classmethod
+    def load(cls, directory: str, mmap_mode: Optional[str] = 'r') -> 'ForestArrays':
+        """Open a saved forest, memory-mapped read-only by default"""
+        with open(os.path.join(directory, HEADER_FILE), 'r', encoding='utf-8') as f:
+            header = json.load(f)
+
+        if header.get('layout_version') != LAYOUT_VERSION:
+            raise ValueError(f"Unsupported forest layout version {header.get('layout_version')}")
+
+        arrays = {
+            name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode)
+            for name in ARRAY_NAMES
+        }
+        return cls(arrays, header)
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """Leaf node index reached in every tree, shape (n_samples, n_estimators)"""
+        n_samples, n_features = X.shape
+        leaves = np.tile(self.roots.astype(np.int32), n_samples)
+        flat_X = X.ravel()
+        row_offsets = np.repeat(np.arange(n_samples, dtype=np.int64) * n_features, self.n_estimators)
+        check_missing = bool(np.isnan(flat_X).any())
+
+        # Walk every (sample, tree) pair one level per step, retiring pairs
+        # as they reach a leaf so shallow trees stop costing work
+        active = np.flatnonzero(self.children_left[leaves] != leaves)
+        current = leaves[active]
+        while len(active):
+            x = flat_X[row_offsets[active] + self.feature[current]]
+            go_left = x <= self.threshold[current]
+            if check_missing:
+                go_left |= np.isnan(x) & self.missing_left[current]
+            current = np.where(go_left, self.children_left[current], self.children_right[current])
+
+            at_leaf = self.children_left[current] == current
+            leaves[active[at_leaf]] = current[at_leaf]
+            active, current = active[~at_leaf], current[~at_leaf]
+
+        return leaves.reshape(n_samples, self.n_estimators)
+
+    def _contributions(self, X: np.ndarray) -> np.ndarray:
+        """
+        Per-feature contributions to the positive-class probability,
+        shape (n_samples, n_features): each split credits its feature with
+        the change in node value from parent to child, summed along every
+        tree's decision path (all trees walked together, as in `apply`)
+        and averaged over trees.
+        """
+        n_samples, n_features = X.shape
+        flat_X = X.ravel()
+        rows = np.repeat(np.arange(n_samples, dtype=np.int64), self.n_estimators)
+        check_missing = bool(np.isnan(flat_X).any())
+        totals = np.zeros(n_samples * n_features)
+
+        current = np.tile(self.roots.astype(np.int32), n_samples)
+        active = np.flatnonzero(self.children_left[current] != current)
+        current = current[active]
+        while len(active):
+            feature = self.feature[current]
+            cell = rows[active] * n_features + feature
+            x = flat_X[cell]
+            go_left = x <= self.threshold[current]
+            if check_missing:
+                go_left |= np.isnan(x) & self.missing_left[current]
+            child = np.where(go_left, self.children_left[current], self.children_right[current])
+
+            totals += np.bincount(cell, weights=self.value[child] - self.value[current], minlength=len(totals))
+
+            at_leaf = self.children_left[child] == child
+            active, current = active[~at_leaf], child[~at_leaf]
+
+        return totals.reshape(n_samples, n_features) / self.n_estimators
+
+    def explain(self, X) -> Tuple[float, np.ndarray]:
+        """
+        Tree-path decomposition of the positive-class probability: a bias
+        (the mean root value, i.e. the training base rate) and per-feature
+        contributions such that bias + contributions.sum(axis=1) equals
+        predict_proba(X)[:, 1].
+        """
+        X = np.asarray(X.to_numpy() if isinstance(X, pd.DataFrame) else X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Expected {self.n_features_in_} features, got shape {X.shape}")
+
+        chunk_rows = min(PREDICT_CHUNK_ROWS, max(1, -(-len(X) // max(1, self.n_jobs))))
+        chunks = [X[start:start + chunk_rows] for start in range(0, len(X), chunk_rows)]
+        if len(chunks) > 1 and self.n_jobs > 1:
+            parts = Parallel(n_jobs=self.n_jobs, prefer='threads')(delayed(self._contributions)(c) for c in chunks)
+        else:
+            parts = [self._contributions(c) for c in chunks]
+
+        bias = float(np.asarray(self.value)[np.asarray(self.roots)].mean())
+        return bias, np.concatenate(parts) if parts else np.empty((0, self.n_features_in_))
+
+    def _positive_proba(self, X: np.ndarray) -> np.ndarray:
+        return self.value[self.apply(X)].sum(axis=1) / self.n_estimators
+
+    def _tree_bounds(self, tree: int) -> Tuple[int, int]:
+        start = int(self.roots[tree])
+        end = int(self.roots[tree + 1]) if tree + 1 < self.n_estimators else self.n_nodes
+        return start, end
+
+    def _tree_value_sum(self, X: np.ndarray, trees: range) -> np.ndarray:
+        """Sum of positive-class leaf values over `trees`, each traversed by scikit-learn"""
+        total = np.zeros(len(X))
+        for tree in trees:
+            start, end = self._tree_bounds(tree)
+            left = np.asarray(self.children_left[start:end])
+            local = np.arange(end - start, dtype=np.int32)
+            is_leaf = left == local + start
+            estimator = build_tree(
+                self.n_features_in_, self.max_depth,
+                np.where(is_leaf, -1, left - start), np.asarray(self.children_right[start:end]) - start,
+                self.feature[start:end], self.threshold[start:end], self.missing_left[start:end],
+            )
+            total += self.value[start + estimator.apply(X)]
+        return total
+
+    def _positive_proba_by_tree(self, X: np.ndarray) -> np.ndarray:
+        """Large-batch path: tree groups scored on up to n_jobs threads (apply releases the GIL)"""
+        X = np.ascontiguousarray(X)
+        n_groups = min(max(1, self.n_jobs), self.n_estimators)
+        bounds = np.linspace(0, self.n_estimators, n_groups + 1).astype(int)
+        groups = [range(bounds[i], bounds[i + 1]) for i in range(n_groups)]
+        if n_groups > 1:
+            parts = Parallel(n_jobs=n_groups, prefer='threads')(delayed(self._tree_value_sum)(X, g) for g in groups)
+        else:
+            parts = [self._tree_value_sum(X, groups[0])]
+        return np.sum(parts, axis=0) / self.n_estimators
+
+    def predict_proba(self, X) -> np.ndarray:
+        """Class probabilities, matching RandomForestClassifier.predict_proba"""
+        # Trees compare float32 inputs against float64 thresholds
+        X = np.asarray(X.to_numpy() if isinstance(X, pd.DataFrame) else X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Expected {self.n_features_in_} features, got shape {X.shape}")
+
+        if len(X) >= TREE_APPLY_MIN_ROWS:
+            positive = self._positive_proba_by_tree(X)
+        else:
+            # Row chunks are scored on up to n_jobs threads, as the forest does with trees
+            chunk_rows = min(PREDICT_CHUNK_ROWS, max(1, -(-len(X) // max(1, self.n_jobs))))
+            chunks = [X[start:start + chunk_rows] for start in range(0, len(X), chunk_rows)]
+            if len(chunks) > 1 and self.n_jobs > 1:
+                parts = Parallel(n_jobs=self.n_jobs, prefer='threads')(delayed(self._positive_proba)(c) for c in chunks)
+            else:
+                parts = [self._positive_proba(c) for c in chunks]
+            positive = np.concatenate(parts) if parts else np.empty(0, dtype=np.float64)
+
+        if len(self.classes_) < 2:
+            return positive[:, None] if 1 in self.classes_ else (1.0 - positive)[:, None]
+        return np.column_stack([1.0 - positive, positive])
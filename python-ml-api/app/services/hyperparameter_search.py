@@ -0,0 +1,214 @@
+"""
+Budgeted Hyperparameter Search
+==============================
+
+Successive-halving search over the Random Forest settings used by the
+resignation model. Every candidate is trained on a growing subsample of
+the training data and scored on out-of-bag AUC and on inference latency;
+only the best third (by default) of each rung moves on to the next one.
+The search stops early once its wall-clock or CPU budget is spent.
+"""
+
+import math
+import time
+import logging
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import ParameterGrid
+
+# Estimator settings explored by the search
+SEARCH_SPACE: Dict[str, List[Any]] = {
+    'n_estimators': [50, 100, 200, 300],
+    'min_samples_leaf': [1, 2, 4, 8],
+    'max_depth': [None, 8, 16],
+    'max_features': ['sqrt', 0.5],
+}
+
+# Rows scored when measuring inference latency
+LATENCY_PROBE_ROWS = 1000
+
+
+class SuccessiveHalvingSearch:
+    """
+    Successive-halving search that trades AUC against inference latency.
+
+    A candidate's objective is its OOB AUC minus ``latency_weight`` for
+    every doubling of its latency over the fastest candidate in the same
+    rung. The final pick is the fastest candidate whose objective is
+    within ``tolerance`` of the best one.
+    """
+
+    def __init__(
+        self,
+        base_params: Optional[Dict[str, Any]] = None,
+        search_space: Optional[Dict[str, List[Any]]] = None,
+        halving_factor: int = 3,
+        max_candidates: int = 24,
+        min_resources: int = 10,
+        time_budget: float = 300.0,
+        cpu_budget: float = 1200.0,
+        latency_weight: float = 0.01,
+        tolerance: float = 0.01,
+        n_jobs: int = -1,
+        inference_jobs: int = -1,
+        random_state: int = 42,
+    ):
+        self.base_params = base_params or {}
+        self.search_space = search_space or SEARCH_SPACE
+        self.halving_factor = max(2, halving_factor)
+        self.max_candidates = max(1, max_candidates)
+        self.min_resources = max(1, min_resources)
+        self.time_budget = time_budget
+        self.cpu_budget = cpu_budget
+        self.latency_weight = latency_weight
+        self.tolerance = tolerance
+        self.n_jobs = n_jobs
+        self.inference_jobs = inference_jobs
+        self.random_state = random_state
+        self.logger = logging.getLogger(__name__)
+
+        self._wall_start = 0.0
+        self._cpu_start = 0.0
+
+    def run(self, X: np.ndarray, y: np.ndarray) -> Dict[str, Any]:
+        """Run the search and return the selected parameters with a rung log"""
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.process_time()
+
+        rng = np.random.RandomState(self.random_state)
+        candidates = self._sample_candidates(rng)
+        n_samples = len(y)
+
+        # Number of rungs is limited both by how many times the candidate
+        # pool can be cut and by how small the first subsample may be
+        rungs_for_candidates = math.ceil(math.log(len(candidates), self.halving_factor)) + 1
+        rungs_for_samples = int(math.log(max(n_samples / self.min_resources, 1), self.halving_factor)) + 1
+        n_rungs = max(1, min(rungs_for_candidates, rungs_for_samples))
+
+        probe = X[:LATENCY_PROBE_ROWS]
+        rungs: List[Dict[str, Any]] = []
+        budget_exhausted = False
+
+        for rung in range(n_rungs):
+            n_resources = int(n_samples * self.halving_factor ** (rung - n_rungs + 1))
+            sample_idx = self._stratified_subsample(rng, y, n_resources)
+
+            results = []
+            for params in candidates:
+                # Always finish at least one candidate so there is a result
+                if (rungs or results) and self._budget_exhausted():
+                    budget_exhausted = True
+                    break
+                results.append(self._evaluate(params, X[sample_idx], y[sample_idx], probe))
+
+            if results:
+                self._score(results)
+                rungs.append({
+                    'rung': rung,
+                    'n_samples': len(sample_idx),
+                    'results': results,
+                })
+
+            if budget_exhausted:
+                self.logger.info(f"Tuning budget exhausted during rung {rung}")
+                break
+
+            # Keep the top 1/halving_factor candidates for the next rung
+            keep = max(1, math.ceil(len(results) / self.halving_factor))
+            ranked = sorted(results, key=lambda r: r['objective'], reverse=True)
+            candidates = [r['params'] for r in ranked[:keep]]
+
+        selected = self._select(rungs[-1]['results'])
+
+        return {
+            'best_params': selected['params'],
+            'selected': selected,
+            'rungs': rungs,
+            'candidates_evaluated': sum(len(r['results']) for r in rungs),
+            'budget_exhausted': budget_exhausted,
+            'elapsed_seconds': round(time.perf_counter() - self._wall_start, 3),
+            'cpu_seconds': round(time.process_time() - self._cpu_start, 3),
+        }
+
+    def _sample_candidates(self, rng: np.random.RandomState) -> List[Dict[str, Any]]:
+        """Draw up to max_candidates parameter sets from the search space"""
+        grid = list(ParameterGrid(self.search_space))
+        if len(grid) <= self.max_candidates:
+            return grid
+
+        picks = rng.choice(len(grid), size=self.max_candidates, replace=False)
+        return [grid[i] for i in sorted(picks)]
+
+    def _stratified_subsample(self, rng: np.random.RandomState, y: np.ndarray, size: int) -> np.ndarray:
+        """Pick `size` row indices while keeping every class represented"""
+        if size >= len(y):
+            return np.arange(len(y))
+
+        indices = []
+        for cls in np.unique(y):
+            cls_idx = np.flatnonzero(y == cls)
+            take = max(1, int(round(size * len(cls_idx) / len(y))))
+            indices.append(rng.choice(cls_idx, size=min(take, len(cls_idx)), replace=False))
+
+        return np.sort(np.concatenate(indices))
+
+    def _evaluate(
+        self,
+        params: Dict[str, Any],
+        X: np.ndarray,
+        y: np.ndarray,
+        probe: np.ndarray
+    ) -> Dict[str, Any]:
+        """Fit one candidate and measure its OOB AUC and inference latency"""
+        model = RandomForestClassifier(
+            **self.base_params,
+            **params,
+            oob_score=True,
+            n_jobs=self.n_jobs
+        )
+
+        fit_start = time.perf_counter()
+        model.fit(X, y)
+        fit_seconds = time.perf_counter() - fit_start
+
+        oob_decision = model.oob_decision_function_
+        has_oob = oob_decision.sum(axis=1) > 0
+        if len(model.classes_) > 1 and len(np.unique(y[has_oob])) > 1:
+            oob_auc = float(roc_auc_score(y[has_oob], oob_decision[has_oob, 1]))
+        else:
+            oob_auc = 0.5
+
+        # Latency is measured with the thread budget used when serving
+        model.set_params(n_jobs=self.inference_jobs)
+        predict_start = time.perf_counter()
+        model.predict_proba(probe)
+        latency_ms = (time.perf_counter() - predict_start) * 1000 * LATENCY_PROBE_ROWS / len(probe)
+
+        return {
+            'params': params,
+            'oob_auc': round(oob_auc, 6),
+            'latency_ms_per_1k': round(latency_ms, 3),
+            'fit_seconds': round(fit_seconds, 3),
+        }
+
+    def _score(self, results: List[Dict[str, Any]]):
+        """Attach the latency-penalized objective to each result in a rung"""
+        fastest = min(r['latency_ms_per_1k'] for r in results) or 1e-6
+        for result in results:
+            slowdown = max(result['latency_ms_per_1k'], fastest) / fastest
+            result['objective'] = round(result['oob_auc'] - self.latency_weight * math.log2(slowdown), 6)
+
+    def _select(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Pick the fastest candidate within tolerance of the best objective"""
+        best = max(r['objective'] for r in results)
+        eligible = [r for r in results if r['objective'] >= best - self.tolerance]
+        return min(eligible, key=lambda r: r['latency_ms_per_1k'])
+
+    def _budget_exhausted(self) -> bool:
+        """Check the wall-clock and CPU-time budgets"""
+        wall = time.perf_counter() - self._wall_start
+        cpu = time.process_time() - self._cpu_start
+        return wall >= self.time_budget or cpu >= self.cpu_budget
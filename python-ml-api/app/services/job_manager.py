@@ -0,0 +1,258 @@
+"""
+Background Job Manager
+======================
+
+Runs long-lived work such as model training and hyperparameter tuning
+outside the request path and records each job's progress so clients can
+poll for it. Job records are JSON files in the models directory, so any
+worker process can answer a status query for a job started by another.
+"""
+
+import asyncio
+import json
+import os
+import time
+import uuid
+import logging
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+# A lock file still empty after this long was left by a crashed writer
+LOCK_STALE_SECONDS = 30.0
+
+
+class JobManager:
+    """Schedules coroutine jobs on the event loop and tracks their status"""
+
+    def __init__(self, jobs_dir: str, max_jobs: int = 50):
+        self.jobs_dir = jobs_dir
+        self.max_jobs = max_jobs
+        self.logger = logging.getLogger(__name__)
+
+        # Keep strong references so running tasks are not garbage collected
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._kinds: Dict[str, str] = {}
+
+        os.makedirs(self.jobs_dir, exist_ok=True)
+
+    def submit(
+        self,
+        kind: str,
+        func: Callable[..., Awaitable[Any]],
+        *args: Any,
+        **kwargs: Any
+    ) -> Dict[str, Any]:
+        """Start `func(*args, **kwargs)` as a background job and return its record"""
+        job = {
+            'job_id': uuid.uuid4().hex,
+            'kind': kind,
+            'status': 'queued',
+            'created_at': datetime.now().isoformat(),
+            'started_at': None,
+            'finished_at': None,
+            'result': None,
+            'error': None,
+            'pid': os.getpid(),
+        }
+        self._write(job)
+
+        task = asyncio.get_running_loop().create_task(self._run(job, func, args, kwargs))
+        self._tasks[job['job_id']] = task
+        self._kinds[job['job_id']] = kind
+        task.add_done_callback(lambda _: self._forget(job['job_id']))
+
+        self._prune()
+        return job
+
+    def submit_single_flight(
+        self,
+        name: str,
+        kind: str,
+        func: Callable[..., Awaitable[Any]],
+        *args: Any,
+        **kwargs: Any
+    ) -> Dict[str, Any]:
+        """
+        Start a job unless one started under `name` is still running in any
+        worker sharing the jobs directory; return the job's record either way.
+        
+        The `<name>.lock` file is created exclusively, holds the owner's pid
+        and job id, and is removed when the job ends. A lock whose owner
+        process is gone is taken over.
+        """
+        path = os.path.join(self.jobs_dir, f"{name}.lock")
+        while True:
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                try:
+                    inode = os.stat(path).st_ino
+                except FileNotFoundError:
+                    continue
+                holder = self._lock_holder(path)
+                if holder is not None:
+                    return holder
+                self._break_lock(path, inode)
+                continue
+            break
+
+        try:
+            job = self.submit(kind, func, *args, **kwargs)
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'pid': os.getpid(), 'job_id': job['job_id']}, f)
+        except BaseException:
+            self._release_lock(path)
+            raise
+
+        self._tasks[job['job_id']].add_done_callback(lambda _: self._release_lock(path))
+        return job
+
+    def _lock_holder(self, path: str) -> Optional[Dict[str, Any]]:
+        """Record of the job holding a lock, or None if the lock is stale"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                owner = json.load(f)
+            pid, job_id = int(owner['pid']), str(owner['job_id'])
+        except FileNotFoundError:
+            # Released meanwhile; the caller retries the create
+            return None
+        except (OSError, ValueError, KeyError, TypeError):
+            # The owner may be between creating the file and writing it
+            try:
+                if time.time() - os.stat(path).st_mtime > LOCK_STALE_SECONDS:
+                    return None
+            except FileNotFoundError:
+                return None
+            return {'job_id': None, 'kind': None, 'status': 'queued', 'pid': None}
+
+        if not _process_alive(pid):
+            return None
+        return self.get(job_id) or {'job_id': job_id, 'kind': None, 'status': 'queued', 'pid': pid}
+
+    def _break_lock(self, path: str, inode: int):
+        """
+        Remove the stale lock file `inode`. Racing workers may all judge it
+        stale; the rename lets only one claim it, and a worker that claimed
+        a newer lock instead (created by the winner) puts it back.
+        """
+        claimed = f"{path}.{os.getpid()}.{uuid.uuid4().hex}.stale"
+        try:
+            os.rename(path, claimed)
+        except FileNotFoundError:
+            return
+        try:
+            if os.stat(claimed).st_ino != inode:
+                try:
+                    os.link(claimed, path)
+                except FileExistsError:
+                    pass
+            else:
+                self.logger.warning(f"Took over stale job lock {os.path.basename(path)}")
+        finally:
+            self._release_lock(claimed)
+
+    def _release_lock(self, path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    async def _run(
+        self,
+        job: Dict[str, Any],
+        func: Callable[..., Awaitable[Any]],
+        args: tuple,
+        kwargs: Dict[str, Any]
+    ):
+        """Execute a job and record its outcome"""
+        job['status'] = 'running'
+        job['started_at'] = datetime.now().isoformat()
+        self._write(job)
+
+        try:
+            job['result'] = await func(*args, **kwargs)
+            job['status'] = 'completed'
+        except Exception as e:
+            self.logger.error(f"Job {job['job_id']} ({job['kind']}) failed: {e}")
+            job['error'] = str(e)
+            job['status'] = 'failed'
+        finally:
+            job['finished_at'] = datetime.now().isoformat()
+            self._write(job)
+
+    def _forget(self, job_id: str):
+        self._tasks.pop(job_id, None)
+        self._kinds.pop(job_id, None)
+
+    def is_active(self, job_id: Optional[str] = None, kinds: Optional[Iterable[str]] = None) -> bool:
+        """Whether a given job (or any job, optionally of the given kinds) started by this process is still running"""
+        if job_id is not None:
+            return job_id in self._tasks
+        if kinds is None:
+            return bool(self._tasks)
+        kinds = set(kinds)
+        return any(kind in kinds for kind in self._kinds.values())
+
+    def active(self, kinds: Optional[Iterable[str]] = None) -> Optional[Dict[str, Any]]:
+        """Record of a job (optionally of the given kinds) still running in this process, if any"""
+        kinds = set(kinds) if kinds is not None else None
+        for job_id, kind in list(self._kinds.items()):
+            if kinds is None or kind in kinds:
+                return self.get(job_id) or {'job_id': job_id, 'kind': kind, 'status': 'running', 'pid': os.getpid()}
+        return None
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return a job record by id, or None if it is unknown"""
+        if not job_id.isalnum():
+            return None
+
+        try:
+            with open(self._job_path(job_id), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Return all known job records, newest first"""
+        jobs = []
+        for name in os.listdir(self.jobs_dir):
+            if name.endswith('.json'):
+                job = self.get(name[:-len('.json')])
+                if job is not None:
+                    jobs.append(job)
+
+        return sorted(jobs, key=lambda j: j['created_at'], reverse=True)
+
+    def _job_path(self, job_id: str) -> str:
+        return os.path.join(self.jobs_dir, f"{job_id}.json")
+
+    def _write(self, job: Dict[str, Any]):
+        """Persist a job record atomically so readers never see a partial file"""
+        path = self._job_path(job['job_id'])
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(job, f, default=str)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            self.logger.error(f"Error writing job record {job['job_id']}: {e}")
+
+    def _prune(self):
+        """Drop the oldest finished job records beyond max_jobs"""
+        finished = [j for j in self.list() if j['status'] in ('completed', 'failed')]
+        for job in finished[self.max_jobs:]:
+            try:
+                os.remove(self._job_path(job['job_id']))
+            except OSError:
+                pass
+
+
+def _process_alive(pid: int) -> bool:
+    """Whether a process with this pid exists on this host"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
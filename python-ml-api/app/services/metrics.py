@@ -0,0 +1,160 @@
+"""
+Prometheus Metrics
+==================
+
+Latency histograms for every HTTP request and for each stage of a
+scoring request (request parsing, employee processing, feature
+engineering, predict_proba, response building and serialization), batch
+sizes, training durations and model load times, served at /metrics.
+
+`MetricsMiddleware` keeps the request's ASGI scope in a context variable
+for the duration of the request, so `stage` timers anywhere in the
+request's task are labelled with the matched route template. Stages run
+outside a request (background jobs, executor threads) are labelled
+``background``.
+
+With several worker processes, set PROMETHEUS_MULTIPROC_DIR to an empty
+directory in the environment of all of them; /metrics then aggregates
+every worker's values.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# Seconds, from sub-millisecond stages to slow batches
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+BATCH_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 10000, 100000)
+TRAINING_BUCKETS = (0.1, 0.5, 1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600)
+
+REQUEST_SECONDS = Histogram(
+    'ml_api_request_seconds', 'HTTP request latency',
+    ['method', 'route', 'status'], buckets=LATENCY_BUCKETS,
+)
+STAGE_SECONDS = Histogram(
+    'ml_api_stage_seconds', 'Latency of one stage of a request',
+    ['route', 'stage'], buckets=LATENCY_BUCKETS,
+)
+BATCH_EMPLOYEES = Histogram(
+    'ml_api_batch_employees', 'Employees per scoring request',
+    ['route'], buckets=BATCH_BUCKETS,
+)
+SCORED_EMPLOYEES = Counter(
+    'ml_api_scored_employees', 'Employees scored by the model',
+    ['route'],
+)
+TRAINING_SECONDS = Histogram(
+    'ml_api_training_seconds', 'Wall time of completed training runs',
+    buckets=TRAINING_BUCKETS,
+)
+TRAINING_STAGE_SECONDS = Histogram(
+    'ml_api_training_stage_seconds', 'Wall time of each stage of a training run',
+    ['stage'], buckets=TRAINING_BUCKETS,
+)
+MODEL_LOAD_SECONDS = Histogram(
+    'ml_api_model_load_seconds', 'Time to validate, map and read a model version',
+    buckets=LATENCY_BUCKETS,
+)
+
+_request: ContextVar[Optional[Dict[str, Any]]] = ContextVar('metrics_request', default=None)
+
+
+def _route() -> str:
+    request = _request.get()
+    if request is None:
+        return 'background'
+    return getattr(request['scope'].get('route'), 'path', 'unmatched')
+
+
+def observe_stage(name: str, seconds: float):
+    STAGE_SECONDS.labels(_route(), name).observe(seconds)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time a named stage of the current request"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(name, time.perf_counter() - start)
+
+
+def observe_request_parsed():
+    """Record the time from the request's arrival until its endpoint runs (body read and validation)"""
+    request = _request.get()
+    if request is not None:
+        observe_stage('parse_request', time.perf_counter() - request['start'])
+
+
+def observe_batch(employees: int):
+    """Count a scored batch of the current request"""
+    route = _route()
+    BATCH_EMPLOYEES.labels(route).observe(employees)
+    SCORED_EMPLOYEES.labels(route).inc(employees)
+
+
+def observe_training(profile: Optional[Dict[str, Any]]):
+    """Record a completed training run from its StageProfiler summary"""
+    if not profile:
+        return
+    if profile.get('total_seconds') is not None:
+        TRAINING_SECONDS.observe(profile['total_seconds'])
+    for entry in profile.get('stages', []):
+        TRAINING_STAGE_SECONDS.labels(entry['stage']).observe(entry['seconds'])
+
+
+def render() -> Tuple[bytes, str]:
+    """Exposition body and content type; all workers' values in multiprocess mode"""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead():
+    """Drop this worker's live values from a multiprocess collection"""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        multiprocess.mark_process_dead(os.getpid())
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing each HTTP request by method, route template and status"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        token = _request.set({'scope': scope, 'start': start})
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUEST_SECONDS.labels(scope['method'], _route(), str(status)).observe(time.perf_counter() - start)
+            _request.reset(token)
@@ -10,21 +10,143 @@ works as a standalone service.
 import pandas as pd
 import numpy as np
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.preprocessing import LabelEncoder
 from sklearn.metrics import roc_curve, auc
 import joblib
 import warnings
 import os
+import shutil
+import json
+import math
+import hashlib
+import importlib.util
 import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import replace
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Union
 import logging
 
 from ..models.schemas import EmployeeData, PredictionResult
 from ..config import settings
+from .hyperparameter_search import SuccessiveHalvingSearch
+from .job_manager import JobManager
+from .resource_governor import ResourceGovernor
+from .data_ingest import iter_training_batches
+from .model_evaluation import evaluate_model
+from .feature_importance import permutation_importance
+from .drift_monitor import DriftMonitor, build_baseline
+from .profiling import StageProfiler, current_rss_bytes
+from .forest_arrays import ForestArrays
+from .compact_forest import CompactForest
+from .model_metadata import SIDECAR_FILE, read_sidecar, validate_sidecar, write_sidecar
+from .model_registry import ModelRegistry
+from .model_snapshot import ModelSnapshot
+from .worker_heartbeats import WorkerHeartbeats
+from .shadow_scoring import ShadowScorer
+from .prediction_stats import PredictionStats
+from .prediction_distribution import PredictionDistribution
+from .prediction_history import PredictionHistory
+from . import metrics
 
 warnings.filterwarnings('ignore')
 
+# Features used by the resignation model, in training column order
+FEATURE_COLUMNS = [
+    'attendance', 'dedication', 'performance', 'cooperation',
+    'initiative', 'communication', 'teamwork', 'character',
+    'responsiveness', 'personality', 'appearance', 'work_habits',
+    'overall_score', 'avg_evaluation', 'low_score_count',
+    'age', 'gender_encoded', 'tenure', 'late_count', 'absent_count',
+    'attendance_rate'
+]
+
+# EmployeeData evaluation score fields and the frame columns they map to
+SCORE_FIELDS = {
+    'attendance_score': 'attendance',
+    'dedication_score': 'dedication',
+    'performance_job_knowledge': 'performance_job_knowledge',
+    'performance_work_efficiency': 'performance_work_efficiency',
+    'cooperation_task_acceptance': 'cooperation_task_acceptance',
+    'cooperation_adaptability': 'cooperation_adaptability',
+    'initiative_autonomy': 'initiative_autonomy',
+    'initiative_under_pressure': 'initiative_under_pressure',
+    'communication': 'communication',
+    'teamwork': 'teamwork',
+    'character': 'character',
+    'responsiveness': 'responsiveness',
+    'personality': 'personality',
+    'appearance': 'appearance',
+    'work_habits': 'work_habits',
+    'overall_score': 'overall_score',
+}
+
+# EmployeeData attendance statistics (last 30 days)
+ATTENDANCE_FIELDS = ['total_days', 'late_count', 'absent_count', 'present_count']
+
+# Columns read from bulk training uploads: EmployeeData fields plus an
+# optional real `resigned` label
+UPLOAD_COLUMNS = (
+    ['employee_id', 'employee_name', 'position_id', 'joining_date', 'birthday', 'gender']
+    + list(SCORE_FIELDS) + ATTENDANCE_FIELDS + ['resigned']
+)
+
+# Fixed gender encoding (alphabetical, as LabelEncoder assigns); other values share the next code
+GENDER_CODES = {'Female': 0, 'Male': 1}
+
+# Categorical encodings a model was trained with, recorded in its sidecar;
+# models from before the fixed gender codes have none and are not served
+FEATURE_ENCODINGS = {'gender': GENDER_CODES}
+
+# EmployeeData fields /simulate can perturb and the frame columns they map to
+SIMULATION_FIELDS = {**SCORE_FIELDS, **{field: field for field in ATTENDANCE_FIELDS}}
+
+# Keys /predict/aggregate can group by, computed from the scored frame
+AGGREGATE_KEYS = {
+    'position_id': lambda df: df['position_id'],
+    'gender': lambda df: df['gender'],
+    'potential': lambda df: df['potential'],
+    'resignation_status': lambda df: df['resignation_status'],
+    'tenure_years': lambda df: df['tenure'] // 12,
+    'age_band': lambda df: (df['age'] // 10) * 10,
+}
+
+# Files inside each registry version directory
+FOREST_DIR = 'forest'
+COMPACT_FOREST_DIR = 'compact'
+METADATA_FILE = 'model_metadata.pkl'
+EVALUATION_FILE = 'evaluation_report.json'
+DRIFT_BASELINE_FILE = 'drift_baseline.json'
+
+# Seconds between periodic writes of buffered stats when registry polling is off
+MAINTENANCE_INTERVAL_SECONDS = 2.0
+
+# Job kinds that mean a new model is being trained
+TRAINING_JOB_KINDS = ('training', 'tuning')
+
+# Forest settings used until a tuning run picks better ones
+DEFAULT_HYPERPARAMETERS = {
+    'n_estimators': 300,
+    'min_samples_leaf': 2,
+    'max_depth': None,
+    'max_features': 'sqrt',
+}
+
+def select_top_k(values: np.ndarray, k: int) -> np.ndarray:
+    """
+    Positions of the `k` largest values, largest first and ties in input
+    order, by partial selection: everything above the k-th largest value
+    plus the earliest rows equal to it, then only those k are sorted.
+    """
+    if k >= len(values):
+        selected = np.arange(len(values))
+    else:
+        kth = -np.partition(-values, k - 1)[k - 1]
+        above = np.flatnonzero(values > kth)
+        selected = np.concatenate([above, np.flatnonzero(values == kth)[:k - len(above)]])
+    return selected[np.lexsort((selected, -values[selected]))]
+
+
 class MLPredictorService:
     """
     Refactored ML prediction service that works with JSON data
@@ -33,161 +155,616 @@ class MLPredictorService:
     
     def __init__(self):
         """Initialize the ML predictor service"""
-        self.model: Optional[RandomForestClassifier] = None
-        self.threshold: float = 0.5
-        self.model_version: str = "1.0.0"
-        self.last_training: Optional[datetime] = None
+        # Served model state, replaced as a whole and never mutated
+        self._snapshot: Optional[ModelSnapshot] = None
+        
+        # Other versions loaded for requests that pin one, least recently used first
+        self._resident: 'OrderedDict[str, ModelSnapshot]' = OrderedDict()
+        self.shadow: Optional[ShadowScorer] = None
+        self._evaluation_cache: Optional[Tuple[str, Dict[str, Any]]] = None
+        self._sidecar_cache: Optional[Tuple[str, Optional[Dict[str, Any]]]] = None
+        self._registry_pointer: Optional[Tuple[str, int]] = None
+        self._watch_task: Optional[asyncio.Task] = None
         self.total_predictions: int = 0
+        self.prediction_stats = PredictionStats()
+        self._importance_jobs: Dict[str, str] = {}
+        self._drift: Optional[DriftMonitor] = None
         self.logger = logging.getLogger(__name__)
         
         # Ensure models directory exists
         self.models_dir = settings.MODEL_PATH
         os.makedirs(self.models_dir, exist_ok=True)
         
+        self.registry = ModelRegistry(os.path.join(self.models_dir, 'registry'), keep=settings.MODEL_REGISTRY_KEEP)
+        self.distribution = PredictionDistribution(
+            os.path.join(self.models_dir, 'distribution'),
+            k=settings.DISTRIBUTION_SKETCH_K,
+            retention_days=settings.DISTRIBUTION_RETENTION_DAYS,
+        )
+        self.history: Optional[PredictionHistory] = None
+        if settings.HISTORY_ENABLED:
+            if importlib.util.find_spec('pyarrow') is None:
+                self.logger.warning("HISTORY_ENABLED is set but pyarrow is not installed; prediction history disabled")
+            else:
+                self.history = PredictionHistory(
+                    os.path.join(self.models_dir, 'history'),
+                    buckets=settings.HISTORY_BUCKETS,
+                    flush_seconds=settings.HISTORY_FLUSH_SECONDS,
+                    flush_rows=settings.HISTORY_FLUSH_ROWS,
+                    retention_days=settings.HISTORY_RETENTION_DAYS,
+                )
+        self.heartbeats = WorkerHeartbeats(
+            os.path.join(self.models_dir, 'workers'),
+            ttl=max(10.0, 5 * settings.MODEL_SYNC_INTERVAL_SECONDS),
+        )
+        
+        # Files written before the registry existed; imported on first load
+        self.legacy_forest_dir = os.path.join(self.models_dir, FOREST_DIR)
         self.model_path = os.path.join(self.models_dir, 'employee_resignation_model.pkl')
-        self.metadata_path = os.path.join(self.models_dir, 'model_metadata.pkl')
+        self.metadata_path = os.path.join(self.models_dir, METADATA_FILE)
+        self.evaluation_path = os.path.join(self.models_dir, EVALUATION_FILE)
+        
+        self.uploads_dir = os.path.join(self.models_dir, 'uploads')
+        os.makedirs(self.uploads_dir, exist_ok=True)
+        
+        self.jobs = JobManager(os.path.join(self.models_dir, 'jobs'))
+        self.governor = ResourceGovernor(
+            worker_count=settings.WORKER_COUNT,
+            inference_threads=settings.INFERENCE_THREADS,
+            training_threads=settings.TRAINING_THREADS,
+        )
         
+    @property
+    def snapshot(self) -> Optional[ModelSnapshot]:
+        """
+        The model currently served. Read it once per request and use that
+        object throughout, so a concurrent swap cannot tear the request.
+        """
+        return self._snapshot
+    
+    @property
+    def model(self) -> Optional[ForestArrays]:
+        snapshot = self._snapshot
+        return snapshot.model if snapshot is not None else None
+    
+    @property
+    def model_version(self) -> str:
+        snapshot = self._snapshot
+        return snapshot.version if snapshot is not None else "1.0.0"
+    
+    @property
+    def fingerprint(self) -> Optional[str]:
+        snapshot = self._snapshot
+        return snapshot.fingerprint if snapshot is not None else None
+    
+    @property
+    def hyperparameters(self) -> Dict[str, Any]:
+        """Forest settings of the served model, used as the base for retraining"""
+        snapshot = self._snapshot
+        return {**DEFAULT_HYPERPARAMETERS, **(snapshot.hyperparameters if snapshot is not None else {})}
+    
     async def initialize(self):
         """Initialize the service and load existing model if available"""
+        self.governor.apply()
+        self.logger.info(f"Thread budgets: {self.governor.inference_threads} inference, {self.governor.training_threads} training")
+        
         try:
             self.load_model()
             self.logger.info("ML Predictor Service initialized successfully")
         except Exception as e:
             self.logger.warning(f"Could not load existing model: {e}")
             self.logger.info("Service initialized without pre-trained model")
+        
+        if settings.SHADOW_MODEL_VERSION:
+            try:
+                self.start_shadow(settings.SHADOW_MODEL_VERSION, settings.SHADOW_SAMPLE_RATE)
+            except Exception as e:
+                self.logger.warning(f"Could not start shadow scoring: {e}")
+        
+        self.heartbeats.beat(self._worker_state())
+        self._watch_task = asyncio.get_running_loop().create_task(self._watch_registry())
+    
+    async def shutdown(self):
+        """Stop following the registry and drop this worker's heartbeat"""
+        if self._watch_task is not None:
+            self._watch_task.cancel()
+            self._watch_task = None
+        self.heartbeats.remove()
+        self.distribution.flush()
+        if self.history is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self.history.flush)
+    
+    async def _watch_registry(self):
+        """
+        Poll the registry's CURRENT pointer and load whatever version it
+        names, so every worker follows a publish, rollback or reload made
+        by any other worker within one interval. The same loop writes the
+        worker's buffered sketches and prediction history, so requests
+        never wait on that disk I/O. With polling disabled it only does
+        the writes, every MAINTENANCE_INTERVAL_SECONDS.
+        """
+        polling = settings.MODEL_SYNC_INTERVAL_SECONDS > 0
+        interval = settings.MODEL_SYNC_INTERVAL_SECONDS if polling else MAINTENANCE_INTERVAL_SECONDS
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if polling:
+                    self.sync_with_registry()
+                self.heartbeats.beat(self._worker_state())
+                self.distribution.flush()
+                if self.history is not None:
+                    await asyncio.get_running_loop().run_in_executor(None, self.history.flush, False)
+            except Exception as e:
+                self.logger.error(f"Error syncing with model registry: {e}")
     
-    def load_model(self) -> bool:
-        """Load the trained model from disk"""
+    def sync_with_registry(self) -> bool:
+        """Load the registry's current version if it changed since this worker last loaded; True if reloaded"""
+        pointer = self.registry.pointer()
+        if pointer is None or pointer == self._registry_pointer:
+            return False
+        
+        self.logger.info(f"Registry now points at model version {pointer[0]}; reloading")
+        return self.load_model()
+    
+    def _worker_state(self) -> Dict[str, Any]:
+        snapshot = self._snapshot
+        return {
+            'model_version': snapshot.version if snapshot else None,
+            'resident_versions': self.resident_versions(),
+            'shadow_version': self.shadow.version if self.shadow else None,
+            'registry_version': self._registry_pointer[0] if self._registry_pointer else None,
+            'training': self.jobs.is_active(kinds=TRAINING_JOB_KINDS),
+            'prediction_stats': self.prediction_stats.totals(),
+            'drift': self._drift.totals() if self._drift is not None else None,
+        }
+    
+    def get_worker_status(self) -> List[Dict[str, Any]]:
+        """Model version served by every live worker, from their heartbeats"""
+        return self.heartbeats.list()
+    
+    def load_model(self, version: Optional[str] = None) -> bool:
+        """Load the current (or a given) registry version from disk"""
         try:
-            if os.path.exists(self.model_path):
-                self.model = joblib.load(self.model_path)
-                
-                # Load metadata if available
-                if os.path.exists(self.metadata_path):
-                    metadata = joblib.load(self.metadata_path)
-                    self.threshold = metadata.get('threshold', 0.5)
-                    self.model_version = metadata.get('version', '1.0.0')
-                    self.last_training = metadata.get('last_training')
-                    
-                self.logger.info("Model loaded successfully")
-                return True
+            if self.registry.current() is None:
+                self._import_legacy_model()
+            
+            # Read the pointer before loading, so a publish racing with this
+            # load is still noticed by the next registry poll
+            pointer = self.registry.pointer()
+            version = version or (pointer[0] if pointer else None)
+            if version is None or not self.registry.exists(version):
+                return False
+            
+            snapshot = self._read_snapshot(version)
+            
+            # Swap only once the whole model is loaded
+            self._snapshot = snapshot
+            self._registry_pointer = pointer
+            
+            self.logger.info(f"Model version {snapshot.version} loaded successfully")
+            return True
         except Exception as e:
             self.logger.error(f"Error loading model: {e}")
         
         return False
     
-    def save_model(self):
-        """Save the trained model and metadata to disk"""
+    def _read_snapshot(self, version: str) -> ModelSnapshot:
+        """Check a registry version against its sidecar, then map its forest and read its metadata"""
+        with metrics.MODEL_LOAD_SECONDS.time():
+            model_dir = self.registry.version_dir(version)
+            sidecar = read_sidecar(model_dir)
+            if sidecar is None:
+                raise ValueError(f"Model version {version} cannot be served: it has no metadata sidecar recording its feature encodings; retrain it")
+            problems = validate_sidecar(
+                sidecar, FEATURE_COLUMNS, ForestArrays.read_header(os.path.join(model_dir, FOREST_DIR)), FEATURE_ENCODINGS
+            )
+            if problems:
+                raise ValueError(f"Model version {version} cannot be served: {'; '.join(problems)}")
+            
+            metadata_path = os.path.join(model_dir, METADATA_FILE)
+            metadata = joblib.load(metadata_path) if os.path.exists(metadata_path) else {}
+            
+            drift_baseline = None
+            baseline_path = os.path.join(model_dir, DRIFT_BASELINE_FILE)
+            if os.path.exists(baseline_path):
+                with open(baseline_path, 'r', encoding='utf-8') as f:
+                    drift_baseline = json.load(f)
+            
+            forest, memory = self.map_forest(model_dir)
+            return ModelSnapshot.from_metadata(forest, metadata, version, model_dir, memory, drift_baseline)
+    
+    def get_snapshot(self, version: Optional[str] = None) -> Optional[ModelSnapshot]:
+        """
+        The served snapshot, or a specific registry version. Other versions
+        stay resident in a small LRU (MODEL_RESIDENT_VERSIONS) so requests
+        pinning one do not reload it each time; their forests are memory
+        mapped, so residency costs little private memory.
+        """
+        current = self._snapshot
+        if version is None or (current is not None and version == current.version):
+            return current
+        
+        snapshot = self._resident.get(version)
+        if snapshot is not None:
+            self._resident.move_to_end(version)
+            return snapshot
+        
+        if not self.registry.exists(version):
+            raise ValueError(f"Unknown model version: {version}")
+        
+        snapshot = self._read_snapshot(version)
+        self._resident[version] = snapshot
+        while len(self._resident) > settings.MODEL_RESIDENT_VERSIONS:
+            evicted, _ = self._resident.popitem(last=False)
+            self.logger.info(f"Evicted resident model version {evicted}")
+        
+        return snapshot
+    
+    def resident_versions(self) -> List[str]:
+        """Versions currently loaded in this worker, served one first"""
+        current = self._snapshot
+        return ([current.version] if current is not None else []) + [
+            v for v in reversed(self._resident) if current is None or v != current.version
+        ]
+    
+    def start_shadow(self, version: str, sample_rate: float) -> Dict[str, Any]:
+        """Begin shadow scoring `version` on a sample of /predict traffic"""
+        if not 0.0 < sample_rate <= 1.0:
+            raise ValueError("sample_rate must be in (0, 1]")
+        
+        snapshot = self.get_snapshot(version)
+        self.shadow = ShadowScorer(snapshot, sample_rate)
+        self.logger.info(f"Shadow scoring model {version} on {sample_rate:.0%} of prediction batches")
+        return self.shadow.stats()
+    
+    def stop_shadow(self) -> Optional[Dict[str, Any]]:
+        """Stop shadow scoring, returning its final statistics"""
+        shadow, self.shadow = self.shadow, None
+        return shadow.stats() if shadow is not None else None
+    
+    def get_shadow_stats(self) -> Optional[Dict[str, Any]]:
+        shadow = self.shadow
+        return shadow.stats() if shadow is not None else None
+    
+    def _import_legacy_model(self):
+        """Publish a model saved before the registry existed as its first version"""
+        if not ForestArrays.exists(self.legacy_forest_dir) and not os.path.exists(self.model_path):
+            return
+        
+        staging_dir = self.registry.stage()
         try:
-            if self.model is not None:
-                joblib.dump(self.model, self.model_path)
-                
-                # Save metadata
-                metadata = {
-                    'threshold': self.threshold,
-                    'version': self.model_version,
-                    'last_training': datetime.now(),
-                    'total_predictions': self.total_predictions
-                }
-                joblib.dump(metadata, self.metadata_path)
-                
-                self.last_training = metadata['last_training']
-                self.logger.info("Model saved successfully")
+            if ForestArrays.exists(self.legacy_forest_dir):
+                shutil.copytree(self.legacy_forest_dir, os.path.join(staging_dir, FOREST_DIR))
+            else:
+                # Pickled RandomForestClassifier: convert to the array layout
+                ForestArrays.from_estimator(joblib.load(self.model_path)).save(os.path.join(staging_dir, FOREST_DIR))
+            
+            metadata = {}
+            if os.path.exists(self.metadata_path):
+                metadata = joblib.load(self.metadata_path)
+                shutil.copy2(self.metadata_path, os.path.join(staging_dir, METADATA_FILE))
+            if os.path.exists(self.evaluation_path):
+                shutil.copy2(self.evaluation_path, os.path.join(staging_dir, EVALUATION_FILE))
+            metadata.setdefault('version', '1.0.0')
+            write_sidecar(staging_dir, self._sidecar_metadata(metadata, staging_dir))
+            
+            self.logger.info("Importing existing model files into the model registry")
+            self.registry.publish(staging_dir, metadata['version'])
+        except Exception:
+            self.registry.discard(staging_dir)
+            raise
+    
+    def save_model(
+        self,
+        snapshot: ModelSnapshot,
+        evaluation_report: Optional[Dict[str, Any]] = None,
+        profiler: Optional[StageProfiler] = None
+    ) -> ModelSnapshot:
+        """
+        Publish a trained model, its metadata and evaluation report as a new
+        registry version. Returns the snapshot to serve: backed by the
+        published, memory-mapped files, or the unsaved one if saving failed.
+        """
+        profiler = profiler or StageProfiler(enabled=False)
+        evaluation_report = evaluation_report or {}
+        
+        staging_dir = self.registry.stage()
+        try:
+            with profiler.stage('save_model'):
+                snapshot.model.save(os.path.join(staging_dir, FOREST_DIR))
+                if settings.MODEL_COMPACT_EXPORT:
+                    CompactForest.from_forest(snapshot.model).save(os.path.join(staging_dir, COMPACT_FOREST_DIR))
+            
+            # The profile is taken after the model write so it covers it
+            training_profile = profiler.summary() if profiler.enabled else snapshot.training_profile
+            
+            # Save metadata
+            metadata = {
+                'threshold': snapshot.threshold,
+                'threshold_selection': snapshot.threshold_stats,
+                'version': snapshot.version,
+                'hyperparameters': snapshot.hyperparameters,
+                'tuning': snapshot.tuning,
+                'fingerprint': snapshot.fingerprint,
+                'encodings': FEATURE_ENCODINGS,
+                'training_profile': training_profile,
+                'feature_importance': snapshot.feature_importance,
+                'evaluation': {k: evaluation_report.get(k) for k in ('n_splits', 'mean', 'std')},
+                'last_training': datetime.now(),
+                'total_predictions': self.total_predictions
+            }
+            joblib.dump(metadata, os.path.join(staging_dir, METADATA_FILE))
+            write_sidecar(staging_dir, self._sidecar_metadata(metadata, staging_dir))
+            
+            if snapshot.drift_baseline:
+                with open(os.path.join(staging_dir, DRIFT_BASELINE_FILE), 'w', encoding='utf-8') as f:
+                    json.dump(snapshot.drift_baseline, f)
+            
+            # Full evaluation report lives next to the model as JSON
+            if evaluation_report:
+                with open(os.path.join(staging_dir, EVALUATION_FILE), 'w', encoding='utf-8') as f:
+                    json.dump(evaluation_report, f)
+            
+            model_dir = self.registry.publish(staging_dir, snapshot.version)
+            self._registry_pointer = self.registry.pointer()
+            forest, memory = self.map_forest(model_dir)
+            
+            self.logger.info("Model saved successfully")
+            return replace(
+                snapshot,
+                model=forest,
+                training_profile=training_profile,
+                last_training=metadata['last_training'],
+                model_dir=model_dir,
+                memory=memory,
+            )
         except Exception as e:
+            self.registry.discard(staging_dir)
             self.logger.error(f"Error saving model: {e}")
+            return snapshot
+    
+    def _sidecar_metadata(self, metadata: Dict[str, Any], model_dir: str) -> Dict[str, Any]:
+        """The JSON sidecar's content for a version being saved to `model_dir`"""
+        header = ForestArrays.read_header(os.path.join(model_dir, FOREST_DIR)) or {}
+        return {
+            'version': metadata.get('version'),
+            'threshold': metadata.get('threshold', 0.5),
+            'last_training': metadata.get('last_training'),
+            'fingerprint': metadata.get('fingerprint'),
+            'hyperparameters': metadata.get('hyperparameters', {}),
+            'feature_schema': {'columns': FEATURE_COLUMNS, 'dtype': 'float32', 'encodings': metadata.get('encodings', {})},
+            'forest': {
+                **{k: header.get(k) for k in ('layout_version', 'n_features', 'n_estimators', 'n_nodes', 'classes')},
+                'formats': [
+                    name for name, present in (
+                        ('full', bool(header)),
+                        ('compact', CompactForest.exists(os.path.join(model_dir, COMPACT_FOREST_DIR))),
+                    ) if present
+                ],
+            },
+            'evaluation': metadata.get('evaluation', {}),
+            'training_profile': metadata.get('training_profile', {}),
+            'feature_importance': metadata.get('feature_importance', {}),
+        }
+    
+    def read_version_metadata(self, version: str) -> Optional[Dict[str, Any]]:
+        """
+        A registry version's JSON sidecar, without loading the model.
+        Version directories never change, so the last one read is cached.
+        """
+        path = os.path.join(self.registry.version_dir(version), SIDECAR_FILE)
+        if self._sidecar_cache is None or self._sidecar_cache[0] != path:
+            self._sidecar_cache = (path, read_sidecar(self.registry.version_dir(version)))
+        return self._sidecar_cache[1]
+    
+    def get_registry_summary(self) -> Optional[Dict[str, Any]]:
+        """The registry's current version as its sidecar describes it, even before this worker loads it"""
+        version = self.registry.current()
+        if version is None:
+            return None
+        
+        metadata = self.read_version_metadata(version) or {}
+        return {
+            'version': version,
+            'last_training': metadata.get('last_training'),
+            'fingerprint': metadata.get('fingerprint'),
+            'threshold': metadata.get('threshold'),
+            'metrics': (metadata.get('evaluation') or {}).get('mean'),
+        }
     
-    def calculate_age(self, birthday: Optional[str]) -> int:
-        """Calculate age from birthday string"""
-        if not birthday:
-            return 30  # Default age
+    def _new_version(self) -> str:
+        """Timestamp version name not yet used in the registry"""
+        timestamp = int(datetime.now().timestamp())
+        while self.registry.exists(f"1.0.{timestamp}"):
+            timestamp += 1
+        return f"1.0.{timestamp}"
+    
+    def rollback(self, version: Optional[str] = None) -> Dict[str, Any]:
+        """Make an earlier registry version current (default: the one before the current) and serve it"""
+        current = self.registry.current()
+        target = version or self.registry.previous(current)
+        
+        if target is None:
+            raise ValueError("No earlier model version to roll back to")
+        if not self.registry.exists(target):
+            raise ValueError(f"Unknown model version: {target}")
+        
+        self.registry.set_current(target)
+        if not self.load_model(target):
+            # Leave the registry pointing at a version the workers can serve
+            if current is not None:
+                self.registry.set_current(current)
+            raise RuntimeError(f"Model version {target} could not be loaded")
+        
+        self.logger.info(f"Rolled back model from {current} to {target}")
+        return {'model_version': self.model_version, 'previous_version': current}
+    
+    def list_model_versions(self) -> List[Dict[str, Any]]:
+        """Registry versions, newest first, flagging the current and the loaded one"""
+        versions = []
+        for entry in self.registry.describe():
+            metadata = read_sidecar(self.registry.version_dir(entry['version'])) or {}
+            versions.append({
+                **entry,
+                'published_at': datetime.fromtimestamp(entry['published_at']),
+                'loaded': entry['version'] == self.model_version,
+                'threshold': metadata.get('threshold'),
+                'last_training': metadata.get('last_training'),
+                'fingerprint': metadata.get('fingerprint'),
+                'n_estimators': metadata.get('forest', {}).get('n_estimators'),
+                'metrics': (metadata.get('evaluation') or {}).get('mean'),
+            })
+        return versions
+    
+    def map_forest(self, model_dir: str) -> Tuple[Union[ForestArrays, CompactForest], Dict[str, Any]]:
+        """
+        Serve a registry version's saved forest through read-only memory maps.
+        
+        Every worker maps the same files, so the node arrays are held once
+        in the page cache rather than copied into each worker's heap; the
+        bytes each worker no longer holds privately are reported in the
+        returned memory summary. With MODEL_COMPACT_EXPORT the compact copy
+        is served when the version has one.
+        """
+        compact_dir = os.path.join(model_dir, COMPACT_FOREST_DIR)
+        use_compact = settings.MODEL_COMPACT_EXPORT and CompactForest.exists(compact_dir)
+        
+        rss_before = current_rss_bytes()
+        if use_compact:
+            forest = CompactForest.load(compact_dir, mmap_mode='r')
+        else:
+            forest = ForestArrays.load(os.path.join(model_dir, FOREST_DIR), mmap_mode='r')
+        forest.n_jobs = self.governor.inference_threads
+        rss_after = current_rss_bytes()
         
+        memory = {
+            'layout': 'mmap' if forest.is_mapped else 'heap',
+            'format': 'compact' if use_compact else 'full',
+            'n_estimators': forest.n_estimators,
+            'n_nodes': forest.n_nodes,
+            'mapped_mb': round(forest.nbytes / (1024 * 1024), 2),
+            'private_rss_saved_mb': round(forest.nbytes / (1024 * 1024), 2) if forest.is_mapped else 0.0,
+            'load_rss_delta_mb': (
+                round((rss_after - rss_before) / (1024 * 1024), 2)
+                if rss_before is not None and rss_after is not None else None
+            ),
+        }
+        return forest, memory
+    
+    def _parse_dates(self, values: pd.Series) -> pd.Series:
+        """Parse a column of date strings, leaving missing or invalid entries as NaT"""
         try:
-            birthday_date = pd.to_datetime(birthday)
-            today = datetime.now()
-            age = today.year - birthday_date.year - ((today.month, today.day) < (birthday_date.month, birthday_date.day))
-            return max(18, age)  # Minimum age of 18
-        except:
-            return 30  # Default age if parsing fails
-    
-    def calculate_tenure(self, joining_date: Optional[str]) -> int:
+            parsed = pd.to_datetime(values, errors='coerce', format='ISO8601')
+        except (TypeError, ValueError):
+            # Mixed UTC offsets; parse each value on its own below
+            parsed = pd.Series(pd.NaT, index=values.index)
+        
+        # Fall back to flexible parsing for non-ISO strings
+        retry = parsed.isna() & values.notna() & (values.astype(str) != '')
+        if retry.any():
+            parsed = parsed.astype(object)
+            parsed[retry] = [pd.to_datetime(v, errors='coerce') for v in values[retry]]
+            parsed = pd.to_datetime(parsed, errors='coerce')
+        
+        return parsed
+    
+    def calculate_age(self, birthdays: pd.Series) -> pd.Series:
+        """Calculate age from birthday strings"""
+        birthday_dates = self._parse_dates(birthdays)
+        today = datetime.now()
+        
+        before_birthday = (
+            (birthday_dates.dt.month > today.month) |
+            ((birthday_dates.dt.month == today.month) & (birthday_dates.dt.day > today.day))
+        )
+        age = today.year - birthday_dates.dt.year - before_birthday.astype(int)
+        
+        # Minimum age of 18; default age if missing or parsing fails
+        return age.clip(lower=18).fillna(30).astype(int)
+    
+    def calculate_tenure(self, joining_dates: pd.Series) -> pd.Series:
         """Calculate tenure in months"""
-        if not joining_date:
-            return 12  # Default tenure
+        joining_dates_dt = self._parse_dates(joining_dates)
+        today = datetime.now()
         
-        try:
-            joining_date_dt = pd.to_datetime(joining_date)
-            today = datetime.now()
-            months = (today.year - joining_date_dt.year) * 12 + (today.month - joining_date_dt.month)
-            return max(0, months)
-        except:
-            return 12  # Default tenure if parsing fails
-    
-    def process_employee_data(self, employees: List[EmployeeData]) -> pd.DataFrame:
+        months = (today.year - joining_dates_dt.dt.year) * 12 + (today.month - joining_dates_dt.dt.month)
+        
+        # Default tenure if missing or parsing fails
+        return months.clip(lower=0).fillna(12).astype(int)
+    
+    def process_employee_data(
+        self,
+        employees: List[EmployeeData],
+        profiler: Optional[StageProfiler] = None
+    ) -> pd.DataFrame:
         """Convert employee data to DataFrame and engineer features"""
+        profiler = profiler or StageProfiler(enabled=False)
         
         # Convert to DataFrame
-        data = []
-        for emp in employees:
-            row = {
-                'id': emp.employee_id,
-                'name': emp.employee_name,
-                'position_id': emp.position_id,
-                'joining_date': emp.joining_date,
-                'birthday': emp.birthday,
-                'gender': emp.gender or 'Male',
-                
-                # Performance scores
-                'attendance': emp.attendance_score or 3.0,
-                'dedication': emp.dedication_score or 3.0,
-                'performance_job_knowledge': emp.performance_job_knowledge or 3.0,
-                'performance_work_efficiency': emp.performance_work_efficiency or 3.0,
-                'cooperation_task_acceptance': emp.cooperation_task_acceptance or 3.0,
-                'cooperation_adaptability': emp.cooperation_adaptability or 3.0,
-                'initiative_autonomy': emp.initiative_autonomy or 3.0,
-                'initiative_under_pressure': emp.initiative_under_pressure or 3.0,
-                'communication': emp.communication or 3.0,
-                'teamwork': emp.teamwork or 3.0,
-                'character': emp.character or 3.0,
-                'responsiveness': emp.responsiveness or 3.0,
-                'personality': emp.personality or 3.0,
-                'appearance': emp.appearance or 3.0,
-                'work_habits': emp.work_habits or 3.0,
-                'overall_score': emp.overall_score or 3.0,
-                
-                # Attendance statistics
-                'total_days': emp.total_days or 0,
-                'late_count': emp.late_count or 0,
-                'absent_count': emp.absent_count or 0,
-                'present_count': emp.present_count or 0,
-            }
-            data.append(row)
-        
-        df = pd.DataFrame(data)
+        with profiler.stage('build_frame'):
+            raw = pd.DataFrame([emp.model_dump() for emp in employees])
+            df = self.normalize_raw_frame(raw)
         
         # Engineer features
-        return self.engineer_features(df)
+        return self.engineer_features(df, profiler)
+    
+    def normalize_raw_frame(self, raw: pd.DataFrame) -> pd.DataFrame:
+        """
+        Map a frame with EmployeeData columns onto the model's input columns,
+        applying the same defaults as the JSON API. Columns missing from
+        `raw` are treated as missing values.
+        """
+        
+        def column(name: str) -> pd.Series:
+            if name in raw.columns:
+                return raw[name]
+            return pd.Series(None, index=raw.index, dtype=object)
+        
+        df = pd.DataFrame({
+            'id': column('employee_id'),
+            'name': column('employee_name'),
+            'position_id': column('position_id'),
+            'joining_date': column('joining_date'),
+            'birthday': column('birthday'),
+            'gender': column('gender'),
+        }, index=raw.index)
+        df['gender'] = df['gender'].where(df['gender'].notna() & (df['gender'] != ''), 'Male')
+        
+        # Performance scores: missing and zero scores default to the middle score
+        for field, col in SCORE_FIELDS.items():
+            values = pd.to_numeric(column(field), errors='coerce')
+            df[col] = values.where(values.notna() & (values != 0), 3.0)
+        
+        # Attendance statistics
+        for field in ATTENDANCE_FIELDS:
+            df[field] = pd.to_numeric(column(field), errors='coerce').fillna(0).clip(lower=0).astype(int)
+        
+        return df
     
-    def engineer_features(self, df: pd.DataFrame) -> pd.DataFrame:
+    def engineer_features(self, df: pd.DataFrame, profiler: Optional[StageProfiler] = None) -> pd.DataFrame:
         """Engineer features from the employee data"""
+        profiler = profiler or StageProfiler(enabled=False)
         
-        # Calculate age and tenure
-        df['age'] = df['birthday'].apply(self.calculate_age)
-        df['tenure'] = df['joining_date'].apply(self.calculate_tenure)
+        with metrics.stage('engineer_features'):
+            # Calculate age and tenure
+            with profiler.stage('parse_dates'):
+                df['age'] = self.calculate_age(df['birthday'])
+                df['tenure'] = self.calculate_tenure(df['joining_date'])
+            
+            with profiler.stage('engineer_features'):
+                return self._derive_features(df)
+    
+    def _derive_features(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Encoded and aggregate features computed from the normalized columns"""
         
-        # Encode gender
-        gender_encoder = LabelEncoder()
-        df['gender_encoded'] = gender_encoder.fit_transform(df['gender'].fillna('Male'))
+        # Encode gender with a fixed code table so a batch's encoding does
+        # not depend on which genders happen to appear in it
+        df['gender_encoded'] = (
+            df['gender'].fillna('Male').map(GENDER_CODES).fillna(len(GENDER_CODES)).astype(int)
+        )
         
         # Ensure all evaluation scores are within valid range
-        eval_cols = [
-            'attendance', 'dedication', 'performance_job_knowledge',
-            'performance_work_efficiency', 'cooperation_task_acceptance',
-            'cooperation_adaptability', 'initiative_autonomy', 'initiative_under_pressure',
-            'communication', 'teamwork', 'character', 'responsiveness',
-            'personality', 'appearance', 'work_habits', 'overall_score'
-        ]
-        
-        for col in eval_cols:
+        for col in SCORE_FIELDS.values():
             if col in df.columns:
                 df[col] = df[col].fillna(3.0)  # Default to middle score
                 df[col] = df[col].clip(1, 5)   # Ensure 1-5 range
@@ -205,91 +782,488 @@ class MLPredictorService:
         ]].mean(axis=1)
         
         # Count low scores (indicators of poor performance)
-        df['low_score_count'] = df[['attendance', 'performance', 'initiative']].apply(
-            lambda x: sum(x <= 2), axis=1
-        )
+        df['low_score_count'] = (df[['attendance', 'performance', 'initiative']] <= 2).sum(axis=1)
         
         # Calculate attendance rate
-        df['attendance_rate'] = df.apply(
-            lambda row: (row['present_count'] / row['total_days'] * 100) if row['total_days'] > 0 else 100,
-            axis=1
-        )
+        total_days = df['total_days'].where(df['total_days'] > 0)
+        df['attendance_rate'] = (df['present_count'] / total_days * 100).fillna(100.0)
         
         return df
     
+    def prepare_training_data(
+        self,
+        employees: List[EmployeeData],
+        profiler: Optional[StageProfiler] = None
+    ) -> Tuple[pd.DataFrame, pd.Series]:
+        """Build the training feature matrix and target from employee data"""
+        
+        if len(employees) < settings.MIN_TRAINING_SAMPLES:
+            raise ValueError(f"Minimum {settings.MIN_TRAINING_SAMPLES} employees required for training")
+        
+        # Process employee data
+        df = self.process_employee_data(employees, profiler)
+        
+        # Filter rows with complete feature data
+        df_train = df.dropna(subset=FEATURE_COLUMNS)
+        
+        if len(df_train) < settings.MIN_TRAINING_SAMPLES:
+            raise ValueError(f"Not enough complete records for training. Got {len(df_train)}, need {settings.MIN_TRAINING_SAMPLES}")
+        
+        df_train['resigned'] = self.synthetic_target(df_train)
+        
+        return df_train[FEATURE_COLUMNS], df_train['resigned']
+    
+    def synthetic_target(self, df: pd.DataFrame) -> pd.Series:
+        """
+        Create synthetic resignation target based on performance indicators.
+        In production, replace this with actual resignation data.
+        """
+        return (
+            (df['performance'] < 2.5) |
+            (df['attendance_rate'] < 70) |
+            (df['low_score_count'] >= 2)
+        ).astype(int)
+    
+    def load_training_file(
+        self,
+        path: str,
+        file_format: str,
+        profiler: Optional[StageProfiler] = None
+    ) -> Tuple[pd.DataFrame, pd.Series]:
+        """
+        Build the training matrix from an uploaded CSV/Parquet file.
+        
+        The file is read in row batches limited to known columns, and each
+        batch is reduced to the float32 feature matrix straight away, so
+        peak memory is one raw batch plus the compact matrix. A `resigned`
+        column, when present, is used as the real target instead of the
+        synthetic one.
+        """
+        profiler = profiler or StageProfiler(enabled=False)
+        X_parts, y_parts = [], []
+        
+        for raw in iter_training_batches(path, file_format, UPLOAD_COLUMNS, settings.UPLOAD_BATCH_ROWS):
+            with profiler.stage('build_frame'):
+                df = self.normalize_raw_frame(raw)
+            df = self.engineer_features(df, profiler)
+            df = df.dropna(subset=FEATURE_COLUMNS)
+            
+            if 'resigned' in raw.columns:
+                labels = pd.to_numeric(raw.loc[df.index, 'resigned'], errors='coerce')
+                df, labels = df[labels.notna()], labels[labels.notna()]
+            else:
+                labels = self.synthetic_target(df)
+            
+            X_parts.append(df[FEATURE_COLUMNS].to_numpy(dtype=np.float32))
+            y_parts.append(labels.to_numpy(dtype=np.int8))
+        
+        n_rows = sum(len(part) for part in y_parts)
+        if n_rows < settings.MIN_TRAINING_SAMPLES:
+            raise ValueError(f"Not enough complete records for training. Got {n_rows}, need {settings.MIN_TRAINING_SAMPLES}")
+        
+        X = pd.DataFrame(np.concatenate(X_parts), columns=FEATURE_COLUMNS)
+        y = pd.Series(np.concatenate(y_parts), name='resigned')
+        return X, y
+    
+    def build_model(self, hyperparameters: Optional[Dict[str, Any]] = None) -> RandomForestClassifier:
+        """Create an unfitted Random Forest with the given (or current) hyperparameters"""
+        params = dict(self.hyperparameters)
+        params.update(hyperparameters or {})
+        
+        return RandomForestClassifier(
+            **params,
+            class_weight='balanced',
+            oob_score=True,
+            random_state=42,
+            n_jobs=self.governor.training_threads
+        )
+    
     async def train_model(self, employees: List[EmployeeData]) -> bool:
         """Train the ML model with provided employee data"""
         try:
-            self.logger.info(f"Starting model training with {len(employees)} employee records")
-            
-            if len(employees) < settings.MIN_TRAINING_SAMPLES:
-                raise ValueError(f"Minimum {settings.MIN_TRAINING_SAMPLES} employees required for training")
-            
-            # Process employee data
-            df = self.process_employee_data(employees)
+            await self.run_training(employees)
+            return True
             
-            # Define features for the model
-            feature_cols = [
-                'attendance', 'dedication', 'performance', 'cooperation',
-                'initiative', 'communication', 'teamwork', 'character',
-                'responsiveness', 'personality', 'appearance', 'work_habits',
-                'overall_score', 'avg_evaluation', 'low_score_count',
-                'age', 'gender_encoded', 'tenure', 'late_count', 'absent_count',
-                'attendance_rate'
-            ]
+        except Exception as e:
+            self.logger.error(f"Model training failed: {e}")
+            return False
+    
+    async def run_training(
+        self,
+        employees: List[EmployeeData],
+        hyperparameters: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Train the ML model, raising on failure and returning a training summary"""
+        self.logger.info(f"Starting model training with {len(employees)} employee records")
+        
+        profiler = StageProfiler()
+        with profiler:
+            X, y = self.prepare_training_data(employees, profiler)
+        return await self.fit_and_save(X, y, hyperparameters, profiler=profiler)
+    
+    def training_fingerprint(
+        self,
+        X: pd.DataFrame,
+        y: pd.Series,
+        hyperparameters: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        Stable hash of the engineered training matrix, target and effective
+        hyperparameters. Rows are hashed individually and sorted, so the
+        same employees sent in a different order give the same fingerprint.
+        Features are hashed as float32, the precision the forest splits on,
+        so the float32 matrix of /train/upload and the float64 one of /train
+        hash alike for the same employees.
+        """
+        params = {**self.hyperparameters, **(hyperparameters or {})}
+        
+        rows = X[FEATURE_COLUMNS].astype(np.float32).assign(resigned=np.asarray(y, dtype=np.int64))
+        row_hashes = np.sort(pd.util.hash_pandas_object(rows, index=False).to_numpy())
+        
+        digest = hashlib.sha256()
+        digest.update(json.dumps(FEATURE_COLUMNS).encode())
+        digest.update(json.dumps(params, sort_keys=True, default=str).encode())
+        digest.update(row_hashes.tobytes())
+        return digest.hexdigest()
+    
+    def is_up_to_date(
+        self,
+        X: pd.DataFrame,
+        y: pd.Series,
+        hyperparameters: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        """Whether the loaded model was trained on exactly this data and configuration"""
+        snapshot = self._snapshot
+        return (
+            snapshot is not None
+            and snapshot.fingerprint is not None
+            and self.training_fingerprint(X, y, hyperparameters) == snapshot.fingerprint
+        )
+    
+    async def fit_and_save(
+        self,
+        X: pd.DataFrame,
+        y: pd.Series,
+        hyperparameters: Optional[Dict[str, Any]] = None,
+        force: bool = False,
+        profiler: Optional[StageProfiler] = None,
+        tuning: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Fit the Random Forest on a prepared feature matrix and persist it.
+        
+        Each step runs as a named stage of `profiler` (a new one unless the
+        caller already profiled feature processing), and the finished
+        profile is stored with the model metadata. The served model is
+        untouched until the new one is fitted, saved and mapped; it is then
+        replaced in one assignment.
+        """
+        profiler = profiler or StageProfiler()
+        current = self._snapshot
+        
+        with profiler:
+            # A retrain on identical data and settings would reproduce the current model
+            with profiler.stage('fingerprint'):
+                fingerprint = self.training_fingerprint(X, y, hyperparameters)
+            if not force and current is not None and fingerprint == current.fingerprint:
+                self.logger.info(f"Training data unchanged; keeping model version {current.version}")
+                return {
+                    'model_version': current.version,
+                    'training_samples': len(X),
+                    'skipped': True,
+                    'profile': profiler.summary(),
+                }
             
-            # Filter rows with complete feature data
-            df_train = df.dropna(subset=feature_cols)
-            
-            if len(df_train) < settings.MIN_TRAINING_SAMPLES:
-                raise ValueError(f"Not enough complete records for training. Got {len(df_train)}, need {settings.MIN_TRAINING_SAMPLES}")
-            
-            # Create synthetic resignation target based on performance indicators
-            # In production, replace this with actual resignation data
-            df_train['resigned'] = (
-                (df_train['performance'] < 2.5) |
-                (df_train['attendance_rate'] < 70) |
-                (df_train['low_score_count'] >= 2)
-            ).astype(int)
-            
-            X = df_train[feature_cols]
-            y = df_train['resigned']
-            
-            # Train Random Forest model
-            self.model = RandomForestClassifier(
-                n_estimators=300,
-                min_samples_leaf=2,
-                class_weight='balanced',
-                random_state=42,
-                n_jobs=-1
-            )
+            # Train Random Forest model; it replaces the served model only once fitted
+            params = {**self.hyperparameters, **(hyperparameters or {})}
+            model = self.build_model(params)
             
             # Run training in executor to avoid blocking
             loop = asyncio.get_event_loop()
-            await loop.run_in_executor(None, self.model.fit, X, y)
+            with profiler.stage('fit'):
+                await loop.run_in_executor(None, model.fit, X, y)
             
-            # Calculate optimal threshold using ROC curve
-            y_prob = self.model.predict_proba(X)[:, 1]
+            # Pick the decision threshold from out-of-bag probabilities: each
+            # sample is scored only by trees that did not see it during fit, so
+            # no second predict pass over the training set is needed.
+            with profiler.stage('threshold_selection'):
+                threshold, threshold_stats = self._select_oob_threshold(model, y)
             
-            if len(set(y)) > 1:  # Only calculate ROC if we have both classes
-                fpr, tpr, thresholds = roc_curve(y, y_prob)
-                optimal_idx = np.argmax(tpr - fpr)
-                self.threshold = thresholds[optimal_idx]
-            else:
-                self.threshold = 0.5
+            # Training distribution of every feature, for input drift monitoring
+            with profiler.stage('drift_baseline'):
+                drift_baseline = build_baseline(X, FEATURE_COLUMNS, settings.DRIFT_BINS)
             
-            # Update model version
-            self.model_version = f"1.0.{int(datetime.now().timestamp())}"
+            version = self._new_version()
             
-            # Save the model
-            self.save_model()
+            # Cross-validated quality report for this configuration, folds in parallel
+            evaluation_report = {}
+            if settings.EVALUATION_FOLDS >= 2:
+                with profiler.stage('evaluation'):
+                    evaluation_report = await loop.run_in_executor(
+                        None, evaluate_model,
+                        model, X, y, threshold, settings.EVALUATION_FOLDS, self.governor.training_threads
+                    )
+                if evaluation_report:
+                    evaluation_report['model_version'] = version
             
-            self.logger.info(f"Model training completed successfully. Version: {self.model_version}")
-            return True
+            # Save the model, then serve it
+            snapshot = self.save_model(
+                ModelSnapshot(
+                    model=ForestArrays.from_estimator(model),
+                    version=version,
+                    threshold=threshold,
+                    threshold_stats=threshold_stats,
+                    hyperparameters=params,
+                    tuning=tuning if tuning is not None else (current.tuning if current is not None else {}),
+                    fingerprint=fingerprint,
+                    feature_importance=dict(zip(FEATURE_COLUMNS, model.feature_importances_.tolist())),
+                    drift_baseline=drift_baseline,
+                ),
+                evaluation_report,
+                profiler
+            )
+            self._snapshot = snapshot
+        
+        if settings.PERMUTATION_IMPORTANCE_REPEATS > 0 and snapshot.model_dir is not None:
+            self.start_importance_job(snapshot, X, y)
+        
+        self.logger.info(f"Model training completed successfully. Version: {snapshot.version}")
+        self._log_profile(snapshot.training_profile)
+        metrics.observe_training(snapshot.training_profile)
+        return {
+            'model_version': snapshot.version,
+            'training_samples': len(X),
+            'threshold': snapshot.threshold,
+            'hyperparameters': dict(snapshot.hyperparameters),
+            'evaluation': evaluation_report.get('mean'),
+            'profile': snapshot.training_profile,
+        }
+    
+    def start_importance_job(self, snapshot: ModelSnapshot, X: pd.DataFrame, y: pd.Series) -> Dict[str, Any]:
+        """Queue permutation importance of a saved version on (a sample of) its training rows"""
+        if len(X) > settings.PERMUTATION_IMPORTANCE_MAX_ROWS:
+            sample = X.sample(settings.PERMUTATION_IMPORTANCE_MAX_ROWS, random_state=42).index
+            X, y = X.loc[sample], y.loc[sample]
+        
+        job = self.jobs.submit('importance', self.compute_permutation_importance, snapshot, X, y)
+        self._importance_jobs[snapshot.version] = job['job_id']
+        return job
+    
+    async def compute_permutation_importance(self, snapshot: ModelSnapshot, X: pd.DataFrame, y: pd.Series) -> Dict[str, Any]:
+        """
+        Permutation importance of `snapshot` with features scored in
+        parallel under the training thread budget, written next to the
+        registry's versions so every worker serves it without recomputing.
+        """
+        loop = asyncio.get_event_loop()
+        report = await loop.run_in_executor(
+            None, permutation_importance,
+            snapshot.model, X, y, FEATURE_COLUMNS, settings.PERMUTATION_IMPORTANCE_REPEATS, self.governor.training_threads
+        )
+        report['model_version'] = snapshot.version
+        summary = {'model_version': snapshot.version, 'baseline_auc': report['baseline_auc'], 'elapsed_seconds': report['elapsed_seconds']}
+        
+        # A version pruned while the job ran needs no result
+        if not self.registry.exists(snapshot.version):
+            return summary
+        
+        path = self.registry.importance_path(snapshot.version)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f)
+        os.replace(tmp_path, path)
+        
+        self.logger.info(f"Permutation importance for model {snapshot.version} computed in {report['elapsed_seconds']:.2f}s")
+        return summary
+    
+    def get_feature_importance(self, version: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Impurity importance recorded at training time and, once its
+        background job has finished, permutation importance of the served
+        (or a given) version. None if no model is available.
+        """
+        snapshot = self.get_snapshot(version)
+        if snapshot is None:
+            return None
+        
+        permutation = None
+        if snapshot.model_dir is not None:
+            try:
+                with open(self.registry.importance_path(snapshot.version), 'r', encoding='utf-8') as f:
+                    permutation = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                permutation = None
+        
+        job_id = self._importance_jobs.get(snapshot.version)
+        if permutation is not None:
+            status = 'completed'
+        elif job_id is not None and self.jobs.is_active(job_id):
+            status = 'running'
+        else:
+            status = 'not_computed'
+        
+        impurity = sorted(snapshot.feature_importance.items(), key=lambda item: item[1], reverse=True)
+        return {
+            'model_version': snapshot.version,
+            'impurity': [{'feature': name, 'importance': value} for name, value in impurity] or None,
+            'permutation': permutation,
+            'permutation_status': status,
+            'permutation_job_id': job_id if status != 'completed' else None,
+        }
+    
+    def _log_profile(self, profile: Dict[str, Any]):
+        """Log the slowest stages of a training run"""
+        stages = sorted(profile.get('stages', []), key=lambda st: st['seconds'], reverse=True)
+        breakdown = ', '.join(f"{st['stage']} {st['seconds']:.2f}s" for st in stages)
+        self.logger.info(f"Training profile: {breakdown} (peak RSS {profile.get('peak_rss_mb')} MB)")
+    
+    async def run_tuning(self, employees: List[EmployeeData]) -> Dict[str, Any]:
+        """Search forest hyperparameters within budget, then train with the winner"""
+        self.logger.info(f"Starting hyperparameter tuning with {len(employees)} employee records")
+        
+        profiler = StageProfiler()
+        with profiler:
+            X, y = self.prepare_training_data(employees, profiler)
+        return await self.tune_and_fit(X, y, profiler)
+    
+    async def tune_and_fit(
+        self,
+        X: pd.DataFrame,
+        y: pd.Series,
+        profiler: Optional[StageProfiler] = None
+    ) -> Dict[str, Any]:
+        """Run the hyperparameter search on a prepared matrix and fit the winner"""
+        profiler = profiler or StageProfiler()
+        search = SuccessiveHalvingSearch(
+            base_params={'class_weight': 'balanced', 'random_state': 42},
+            halving_factor=settings.TUNING_HALVING_FACTOR,
+            max_candidates=settings.TUNING_MAX_CANDIDATES,
+            min_resources=settings.TUNING_MIN_SAMPLES,
+            time_budget=settings.TUNING_TIME_BUDGET_SECONDS,
+            cpu_budget=settings.TUNING_CPU_BUDGET_SECONDS,
+            latency_weight=settings.TUNING_LATENCY_WEIGHT,
+            tolerance=settings.TUNING_SCORE_TOLERANCE,
+            n_jobs=self.governor.training_threads,
+            inference_jobs=self.governor.inference_threads,
+        )
+        
+        loop = asyncio.get_event_loop()
+        with profiler, profiler.stage('tuning'):
+            search_results = await loop.run_in_executor(
+                None, search.run, X.to_numpy(), y.to_numpy()
+            )
+        self.logger.info(f"Tuning selected {search_results['best_params']}")
+        summary = await self.fit_and_save(X, y, search_results['best_params'], profiler=profiler, tuning=search_results)
+        summary['tuning'] = search_results
+        return summary
+    
+    def start_training_job(
+        self,
+        X: pd.DataFrame,
+        y: pd.Series,
+        tune: bool = False,
+        force: bool = False,
+        profiler: Optional[StageProfiler] = None
+    ) -> Dict[str, Any]:
+        """Queue a training (or tuning) run on a prepared matrix on the background job manager"""
+        if tune:
+            return self.jobs.submit('tuning', self.tune_and_fit, X, y, profiler)
+        return self.jobs.submit('training', self.fit_and_save, X, y, force=force, profiler=profiler)
+    
+    async def run_training_from_file(
+        self,
+        path: str,
+        file_format: str,
+        tune: bool = False,
+        force: bool = False
+    ) -> Dict[str, Any]:
+        """Train (or tune and train) from an uploaded file, deleting it afterwards"""
+        profiler = StageProfiler()
+        try:
+            loop = asyncio.get_event_loop()
+            with profiler:
+                X, y = await loop.run_in_executor(None, self.load_training_file, path, file_format, profiler)
+            self.logger.info(f"Loaded {len(X)} training rows from uploaded {file_format} file")
             
-        except Exception as e:
-            self.logger.error(f"Model training failed: {e}")
-            return False
+            if tune:
+                return await self.tune_and_fit(X, y, profiler)
+            return await self.fit_and_save(X, y, force=force, profiler=profiler)
+        finally:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+    
+    def start_on_demand_training(self, employees: List[EmployeeData]) -> Optional[Dict[str, Any]]:
+        """
+        Single-flight on-demand training: start one background training job
+        from the first request's data, or return the training job already
+        running.
+        
+        A training or tuning job of this worker counts as running; across
+        workers, the job manager's lock file lets only one of them start
+        the on-demand fit.
+        """
+        running = self.jobs.active(kinds=TRAINING_JOB_KINDS)
+        if running is not None:
+            return running
+        
+        if len(employees) < settings.MIN_TRAINING_SAMPLES:
+            return None
+        
+        job = self.jobs.submit_single_flight('on_demand_training', 'training', self.run_training, employees)
+        if job.get('pid') == os.getpid():
+            self.logger.info("No trained model loaded. Started on-demand training from provided data.")
+        return job
+    
+    def start_upload_training_job(
+        self,
+        path: str,
+        file_format: str,
+        tune: bool = False,
+        force: bool = False
+    ) -> Dict[str, Any]:
+        """Queue training from an uploaded file on the background job manager"""
+        kind = 'tuning' if tune else 'training'
+        return self.jobs.submit(kind, self.run_training_from_file, path, file_format, tune, force)
+    
+    def _select_oob_threshold(self, model: RandomForestClassifier, y: pd.Series) -> Tuple[float, Dict[str, Any]]:
+        """Choose the resignation threshold from the fitted model's OOB ROC curve"""
+        
+        oob_decision = model.oob_decision_function_
+        
+        # Samples that were in-bag for every tree get an all-zero OOB row
+        has_oob = oob_decision.sum(axis=1) > 0
+        y_oob = np.asarray(y)[has_oob]
+        
+        stats = {
+            'method': 'oob_roc',
+            'oob_samples': int(has_oob.sum()),
+            'oob_accuracy': float(model.oob_score_),
+        }
+        
+        if len(model.classes_) < 2 or len(set(y_oob)) < 2:
+            # ROC is undefined without both classes in the OOB set
+            stats['method'] = 'default'
+            return 0.5, stats
+        
+        y_prob = oob_decision[has_oob, 1]
+        fpr, tpr, thresholds = roc_curve(y_oob, y_prob)
+        optimal_idx = int(np.argmax(tpr - fpr))
+        
+        stats.update({
+            'auc': float(auc(fpr, tpr)),
+            'tpr': float(tpr[optimal_idx]),
+            'fpr': float(fpr[optimal_idx]),
+            'youden_j': float(tpr[optimal_idx] - fpr[optimal_idx]),
+        })
+        
+        # roc_curve counts scores >= threshold as positive while predictions
+        # use a strict '>', so take the midpoint to the next lower score
+        # (the first threshold is +inf, capped at 1.0)
+        upper = min(thresholds[optimal_idx], 1.0)
+        lower = thresholds[optimal_idx + 1] if optimal_idx + 1 < len(thresholds) else 0.0
+        return float((upper + lower) / 2), stats
     
     def predict_potential(self, df: pd.DataFrame) -> pd.Series:
         """Classify employee potential based on performance scores"""
@@ -315,103 +1289,437 @@ class MLPredictorService:
         
         return df['performance'].apply(classify)
     
-    def predict_resignation(self, df: pd.DataFrame) -> Tuple[pd.Series, pd.Series]:
-        """Predict resignation probability and status"""
+    def _resignation_rows(self, df: pd.DataFrame) -> Optional[pd.Series]:
+        """Rows the resignation model scores: complete data and not in the batch's top performance quartile"""
+        performance_scores = df['performance'].dropna()
+        if len(performance_scores) == 0:
+            return None
+        
+        high_threshold = performance_scores.quantile(0.75)
+        return (df['performance'] < high_threshold) & df[FEATURE_COLUMNS].notna().all(axis=1)
+    
+    def explain_resignation(
+        self,
+        df: pd.DataFrame,
+        snapshot: ModelSnapshot,
+        top_features: int = 5,
+        rows: Optional[np.ndarray] = None
+    ) -> List[Optional[List[Dict[str, Any]]]]:
+        """
+        The `top_features` largest contributions (by magnitude) to each
+        model-scored employee's resignation probability, from a tree-path
+        decomposition of the whole batch (or only the positions in `rows`)
+        in one pass over the forest. Returned in row order; employees the
+        model did not score get None.
+        """
+        explanations: List[Optional[List[Dict[str, Any]]]] = [None] * len(df)
+        mask = self._resignation_rows(df)
+        if mask is not None and rows is not None:
+            selected = np.zeros(len(df), dtype=bool)
+            selected[rows] = True
+            mask = mask & selected
+        if mask is None or not mask.any():
+            return explanations
+        
+        # The compact layout keeps no internal node values; explain from the full arrays
+        forest = snapshot.model
+        if not isinstance(forest, ForestArrays):
+            forest = ForestArrays.load(os.path.join(snapshot.model_dir, FOREST_DIR), mmap_mode='r')
+            forest.n_jobs = self.governor.inference_threads
+        
+        X = df.loc[mask, FEATURE_COLUMNS]
+        _, contributions = forest.explain(X)
+        
+        k = min(top_features, len(FEATURE_COLUMNS))
+        top = np.argpartition(-np.abs(contributions), k - 1, axis=1)[:, :k]
+        top_values = np.take_along_axis(contributions, top, axis=1)
+        order = np.argsort(-np.abs(top_values), axis=1)
+        top, top_values = np.take_along_axis(top, order, axis=1), np.take_along_axis(top_values, order, axis=1)
+        feature_values = np.take_along_axis(X.to_numpy(dtype=np.float64), top, axis=1)
+        
+        for position, columns, values, contribs in zip(np.flatnonzero(mask.to_numpy()), top, feature_values, top_values):
+            explanations[position] = [
+                {'feature': FEATURE_COLUMNS[j], 'value': float(v), 'contribution': float(c)}
+                for j, v, c in zip(columns, values, contribs)
+            ]
+        return explanations
+    
+    def predict_resignation(
+        self,
+        df: pd.DataFrame,
+        snapshot: Optional[ModelSnapshot] = None,
+        shadow: bool = False
+    ) -> Tuple[pd.Series, pd.Series]:
+        """
+        Predict resignation probability and status with one model snapshot.
+        
+        With `shadow`, the scored rows may also be handed to the shadow
+        model; that runs later on the event loop, so this must then be
+        called from it.
+        """
+        snapshot = snapshot or self._snapshot
         
         # Initialize with default values
         resignation_prob = pd.Series(0.0, index=df.index)
         resignation_status = pd.Series("Not at Risk", index=df.index)
         
-        if self.model is None:
+        if snapshot is None:
             return resignation_prob, resignation_status
         
-        performance_scores = df['performance'].dropna()
-        if len(performance_scores) == 0:
-            return resignation_prob, resignation_status
-            
-        high_threshold = performance_scores.quantile(0.75)
-        
-        # Define features for prediction
-        feature_cols = [
-            'attendance', 'dedication', 'performance', 'cooperation',
-            'initiative', 'communication', 'teamwork', 'character',
-            'responsiveness', 'personality', 'appearance', 'work_habits',
-            'overall_score', 'avg_evaluation', 'low_score_count',
-            'age', 'gender_encoded', 'tenure', 'late_count', 'absent_count',
-            'attendance_rate'
-        ]
-        
-        # Identify employees with complete data and not high performers
-        mask = (df['performance'] < high_threshold) & df[feature_cols].notna().all(axis=1)
-        
-        if mask.sum() > 0:
-            X_predict = df.loc[mask, feature_cols]
+        mask = self._resignation_rows(df)
+        if mask is not None and mask.sum() > 0:
+            X_predict = df.loc[mask, FEATURE_COLUMNS]
             
             # Predict probabilities
-            probs = self.model.predict_proba(X_predict)[:, 1]
+            start = time.perf_counter()
+            probs = snapshot.model.predict_proba(X_predict)[:, 1]
+            elapsed = time.perf_counter() - start
+            metrics.observe_stage('predict_proba', elapsed)
+            
+            shadow_scorer = self.shadow
+            if shadow and shadow_scorer is not None and shadow_scorer.version != snapshot.version:
+                shadow_scorer.maybe_score(
+                    X_predict.to_numpy(dtype=np.float32), probs, snapshot.threshold, elapsed,
+                    lambda func, *args: asyncio.get_running_loop().run_in_executor(None, func, *args)
+                )
             
             resignation_prob.loc[mask] = probs
             resignation_status.loc[mask] = np.where(
-                probs > self.threshold,
+                probs > snapshot.threshold,
                 "At Risk of Resigning",
                 "Not at Risk"
             )
         
         return resignation_prob, resignation_status
     
-    async def predict(self, employees: List[EmployeeData]) -> List[PredictionResult]:
-        """Generate predictions for a list of employees"""
+    async def predict(
+        self,
+        employees: List[EmployeeData],
+        snapshot: Optional[ModelSnapshot] = None,
+        explain: bool = False,
+        top_features: int = 5
+    ) -> List[PredictionResult]:
+        """
+        Generate predictions for a list of employees.
+        
+        The whole request is scored with one model snapshot (`snapshot`, or
+        the one served when the call starts), even if a retrain or reload
+        swaps the served model meanwhile. With `explain`, each model-scored
+        employee also gets its `top_features` risk factors.
+        """
         
         if not employees:
             return []
         
+        snapshot = snapshot or self._snapshot
+        
         try:
-            # Process employee data
-            df = self.process_employee_data(employees)
-
-            # If no model is available, attempt on-demand training
-            if self.model is None:
-                self.logger.info("No trained model loaded. Attempting on-demand training from provided data.")
-                trained = await self.train_model(employees)
-
-                if not trained or self.model is None:
-                    self.logger.warning("On-demand training unavailable; returning baseline predictions")
-                    return self._generate_basic_predictions(df)
-
-                self.logger.info("On-demand training succeeded; generating predictions with fresh model")
-            
-            # Generate predictions
-            df['potential'] = self.predict_potential(df)
-            df['resignation_probability'], df['resignation_status'] = self.predict_resignation(df)
-            
-            # Convert to response format
-            results = []
-            for _, row in df.iterrows():
-                result = PredictionResult(
-                    employee_id=int(row['id']),
-                    employee_name=str(row['name']),
-                    performance_score=float(row.get('performance', 0)),
-                    potential=str(row['potential']),
-                    resignation_probability=float(row['resignation_probability']),
-                    resignation_status=str(row['resignation_status']),
-                    attendance_rate=float(row.get('attendance_rate', 100)),
-                    late_count=int(row.get('late_count', 0)),
-                    absent_count=int(row.get('absent_count', 0)),
-                    tenure_months=int(row.get('tenure', 0)),
-                    overall_score=float(row.get('overall_score', 0)),
-                    avg_evaluation=float(row.get('avg_evaluation', 0))
-                )
-                results.append(result)
+            df = self.score_employees(employees, snapshot)
+            if df is None:
+                return self._generate_basic_predictions(self.process_employee_data(employees))
             
-            # Update prediction counter
-            self.total_predictions += len(results)
+            explanations = None
+            if explain:
+                with metrics.stage('explain'):
+                    explanations = self.explain_resignation(df, snapshot, top_features)
             
-            return results
+            with metrics.stage('build_response'):
+                return self._prediction_results(df, explanations)
             
         except Exception as e:
             self.logger.error(f"Prediction error: {e}")
             raise
     
+    def _prediction_results(
+        self,
+        df: pd.DataFrame,
+        explanations: Optional[List[Optional[List[Dict[str, Any]]]]] = None
+    ) -> List[PredictionResult]:
+        """Response rows of a scored frame, with risk factors in row order if given"""
+        results = []
+        for position, (_, row) in enumerate(df.iterrows()):
+            result = PredictionResult(
+                employee_id=int(row['id']),
+                employee_name=str(row['name']),
+                performance_score=float(row.get('performance', 0)),
+                potential=str(row['potential']),
+                resignation_probability=float(row['resignation_probability']),
+                resignation_status=str(row['resignation_status']),
+                attendance_rate=float(row.get('attendance_rate', 100)),
+                late_count=int(row.get('late_count', 0)),
+                absent_count=int(row.get('absent_count', 0)),
+                tenure_months=int(row.get('tenure', 0)),
+                overall_score=float(row.get('overall_score', 0)),
+                avg_evaluation=float(row.get('avg_evaluation', 0)),
+                risk_factors=explanations[position] if explanations is not None else None
+            )
+            results.append(result)
+        
+        return results
+    
+    def score_employees(
+        self,
+        employees: List[EmployeeData],
+        snapshot: Optional[ModelSnapshot] = None
+    ) -> Optional[pd.DataFrame]:
+        """
+        The processed employee frame with potential, resignation_probability
+        and resignation_status columns, scored with one model snapshot and
+        counted in the running statistics. Returns None when no model is
+        available; on-demand training is then started in the background.
+        """
+        snapshot = snapshot or self._snapshot
+        
+        if snapshot is None:
+            if self.start_on_demand_training(employees) is None:
+                self.logger.warning("On-demand training unavailable; returning baseline predictions")
+            return None
+        
+        with metrics.stage('process_employee_data'):
+            df = self.process_employee_data(employees)
+        df['potential'] = self.predict_potential(df)
+        df['resignation_probability'], df['resignation_status'] = self.predict_resignation(df, snapshot, shadow=True)
+        
+        # Update prediction counter and running statistics
+        metrics.observe_batch(len(df))
+        self.total_predictions += len(df)
+        self.prediction_stats.update(df)
+        self.distribution.update(df)
+        if self.history is not None:
+            self.history.append(df, snapshot.version)
+        
+        # Inputs are compared with the served model's training data
+        if snapshot is self._snapshot and snapshot.drift_baseline:
+            monitor = self._drift
+            if monitor is None or monitor.version != snapshot.version:
+                monitor = self._drift = DriftMonitor(snapshot.drift_baseline, snapshot.version)
+            monitor.update(df)
+        return df
+    
+    async def top_risk_predictions(
+        self,
+        employees: List[EmployeeData],
+        k: int,
+        potential: Optional[List[str]] = None,
+        position_ids: Optional[List[int]] = None,
+        snapshot: Optional[ModelSnapshot] = None,
+        explain: bool = False,
+        top_features: int = 5
+    ) -> Optional[Tuple[List[PredictionResult], int]]:
+        """
+        Score the whole batch (potential classes are relative to it) and
+        return the `k` employees most likely to resign among those matching
+        the filters, highest probability first and ties in input order,
+        with the number matched. The top `k` are picked by partial
+        selection, so only they get sorted (and explained). Returns None
+        without a model.
+        """
+        if k < 1:
+            raise ValueError("k must be at least 1")
+        
+        snapshot = snapshot or self._snapshot
+        df = self.score_employees(employees, snapshot)
+        if df is None:
+            return None
+        
+        keep = np.ones(len(df), dtype=bool)
+        if potential:
+            keep &= df['potential'].isin(potential).to_numpy()
+        if position_ids:
+            keep &= df['position_id'].isin(position_ids).to_numpy()
+        candidates = np.flatnonzero(keep)
+        
+        probabilities = df['resignation_probability'].to_numpy()[candidates]
+        top = candidates[select_top_k(probabilities, k)]
+        
+        explanations = self.explain_resignation(df, snapshot, top_features, rows=top) if explain else None
+        results = self._prediction_results(
+            df.iloc[top], [explanations[position] for position in top] if explanations is not None else None
+        )
+        return results, len(candidates)
+    
+    async def simulate(
+        self,
+        employees: List[EmployeeData],
+        perturbations: List[Dict[str, Any]],
+        snapshot: Optional[ModelSnapshot] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        What-if resignation probabilities over a grid of perturbations
+        ({'field', 'values', 'mode'}): every combination of the values is a
+        scenario, applied to each employee. Returns None without a model.
+        
+        Simulated results are not counted in the prediction statistics.
+        """
+        unknown = [p['field'] for p in perturbations if p['field'] not in SIMULATION_FIELDS]
+        if unknown:
+            raise ValueError(f"Unsupported perturbation fields {unknown}; choose from {sorted(SIMULATION_FIELDS)}")
+        
+        # Python ints: an int64 product of many axes can wrap past the limit
+        n_scenarios = math.prod(len(p['values']) for p in perturbations)
+        n_rows = len(employees) * (n_scenarios + 1)
+        if n_rows > settings.SIMULATION_MAX_ROWS:
+            raise ValueError(
+                f"{len(employees)} employees x {n_scenarios} scenarios exceeds the limit of "
+                f"{settings.SIMULATION_MAX_ROWS} simulated rows"
+            )
+        
+        snapshot = snapshot or self._snapshot
+        if snapshot is None:
+            if self.start_on_demand_training(employees) is None:
+                self.logger.warning("On-demand training unavailable; nothing to simulate")
+            return None
+        
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._simulate_grid, employees, perturbations, snapshot)
+    
+    def _simulate_grid(
+        self,
+        employees: List[EmployeeData],
+        perturbations: List[Dict[str, Any]],
+        snapshot: ModelSnapshot
+    ) -> Dict[str, Any]:
+        """
+        Expand each employee into its unchanged row followed by one row per
+        scenario and score the distinct rows with a single predict_proba
+        call. Within an employee only the perturbed inputs vary, so rows
+        repeating them (clipped or unchanged values) are scored once.
+        
+        Every complete row is scored by the model; the batch-relative
+        top-performer exemption of /predict does not apply to what-ifs.
+        """
+        base = self.normalize_raw_frame(pd.DataFrame([emp.model_dump() for emp in employees]))
+        base['age'] = self.calculate_age(base['birthday'])
+        base['tenure'] = self.calculate_tenure(base['joining_date'])
+        
+        # grid[p, s] is the index into perturbation p's values for scenario s
+        grid = np.indices([len(p['values']) for p in perturbations]).reshape(len(perturbations), -1)
+        n_employees, n_scenarios = len(base), grid.shape[1]
+        frame = base.iloc[np.repeat(np.arange(n_employees), n_scenarios + 1)].reset_index(drop=True)
+        keys = np.repeat(np.arange(n_employees), n_scenarios + 1)
+        
+        for perturbation, choices in zip(perturbations, grid):
+            column = SIMULATION_FIELDS[perturbation['field']]
+            values = np.asarray(perturbation['values'], dtype=np.float64)[choices]
+            simulated = frame[column].to_numpy(dtype=np.float64).reshape(n_employees, n_scenarios + 1)
+            if perturbation['mode'] == 'set':
+                simulated[:, 1:] = values
+            else:
+                simulated[:, 1:] += values
+            
+            # Same bounds as normalize_raw_frame and _derive_features apply
+            if column in ATTENDANCE_FIELDS:
+                simulated = np.clip(np.rint(simulated), 0, None)
+                frame[column] = simulated.ravel().astype(int)
+            else:
+                simulated = np.clip(simulated, 1, 5)
+                frame[column] = simulated.ravel()
+            
+            # Fold the column into the row keys, compacting them to stay small
+            _, codes = np.unique(simulated.ravel(), return_inverse=True)
+            _, keys = np.unique(keys * (codes.max() + 1) + codes, return_inverse=True)
+        
+        _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        distinct = self._derive_features(frame.iloc[first].reset_index(drop=True))
+        complete = distinct[FEATURE_COLUMNS].notna().all(axis=1).to_numpy()
+        scores = np.full(len(distinct), np.nan)
+        if complete.any():
+            scores[complete] = snapshot.model.predict_proba(distinct.loc[complete, FEATURE_COLUMNS])[:, 1]
+        probabilities = scores[inverse.ravel()].reshape(n_employees, n_scenarios + 1)
+        
+        results = []
+        for (_, row), employee_probabilities in zip(base.iterrows(), probabilities):
+            if np.isnan(employee_probabilities[0]):
+                results.append({
+                    'employee_id': int(row['id']),
+                    'employee_name': str(row['name']),
+                    'base_status': "Insufficient Data",
+                })
+                continue
+            best = int(np.argmin(employee_probabilities[1:]))
+            results.append({
+                'employee_id': int(row['id']),
+                'employee_name': str(row['name']),
+                'base_probability': float(employee_probabilities[0]),
+                'base_status': "At Risk of Resigning" if employee_probabilities[0] > snapshot.threshold else "Not at Risk",
+                'probabilities': employee_probabilities[1:].tolist(),
+                'best_scenario': best,
+                'best_probability': float(employee_probabilities[1 + best]),
+            })
+        
+        return {
+            'scenarios': [
+                {p['field']: float(p['values'][index]) for p, index in zip(perturbations, scenario)}
+                for scenario in grid.T
+            ],
+            'threshold': snapshot.threshold,
+            'employees': results,
+        }
+    
+    async def aggregate_predictions(
+        self,
+        employees: List[EmployeeData],
+        group_by: List[str],
+        quantiles: List[float],
+        snapshot: Optional[ModelSnapshot] = None
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Score employees and summarize them per group of `group_by` keys:
+        size, at-risk count and share, potential mix, mean scores and
+        resignation probability quantiles. Returns None without a model.
+        """
+        unknown = [key for key in group_by if key not in AGGREGATE_KEYS]
+        if unknown or not group_by:
+            raise ValueError(f"Unsupported group_by keys {unknown}; choose from {sorted(AGGREGATE_KEYS)}")
+        if any(not 0.0 <= q <= 1.0 for q in quantiles):
+            raise ValueError("quantiles must be between 0 and 1")
+        
+        df = self.score_employees(employees, snapshot)
+        if df is None:
+            return None
+        
+        # Value columns are prefixed so they cannot collide with group keys
+        frame = pd.DataFrame({key: AGGREGATE_KEYS[key](df) for key in group_by}).assign(
+            _at_risk=(df['resignation_status'] != 'Not at Risk').astype(np.int64),
+            _performance=df['performance'],
+            _attendance_rate=df['attendance_rate'],
+            _probability=df['resignation_probability'],
+            _potential=df['potential'],
+        )
+        grouped = frame.groupby(group_by, dropna=False, sort=True)
+        
+        summary = grouped.agg(
+            count=('_at_risk', 'size'),
+            at_risk_count=('_at_risk', 'sum'),
+            avg_performance_score=('_performance', 'mean'),
+            avg_attendance_rate=('_attendance_rate', 'mean'),
+            avg_resignation_probability=('_probability', 'mean'),
+        )
+        potential_mix = grouped['_potential'].value_counts().unstack(fill_value=0).reindex(summary.index, fill_value=0)
+        probability_quantiles = grouped['_probability'].quantile(quantiles).unstack().reindex(summary.index)
+        
+        def plain(value):
+            if pd.isna(value):
+                return None
+            return value.item() if hasattr(value, 'item') else value
+        
+        groups = []
+        for position, index in enumerate(summary.index):
+            row = summary.iloc[position]
+            keys = index if isinstance(index, tuple) else (index,)
+            groups.append({
+                'keys': {key: plain(value) for key, value in zip(group_by, keys)},
+                'count': int(row['count']),
+                'at_risk_count': int(row['at_risk_count']),
+                'at_risk_share': float(row['at_risk_count'] / row['count']),
+                'potential_mix': {str(k): int(v) for k, v in potential_mix.iloc[position].items() if v},
+                'avg_performance_score': plain(row['avg_performance_score']),
+                'avg_attendance_rate': plain(row['avg_attendance_rate']),
+                'avg_resignation_probability': float(row['avg_resignation_probability']),
+                'probability_quantiles': {f"{q:g}": float(v) for q, v in probability_quantiles.iloc[position].items()},
+            })
+        return groups
+    
     def _generate_basic_predictions(self, df: pd.DataFrame) -> List[PredictionResult]:
         """Generate basic predictions without ML model"""
         
@@ -437,13 +1745,28 @@ class MLPredictorService:
     
     def get_model_status(self) -> Dict[str, Any]:
         """Get current model status"""
+        snapshot = self._snapshot
+        training = self.jobs.is_active(kinds=TRAINING_JOB_KINDS)
+        
+        if snapshot is not None:
+            status = 'ready'
+        elif training:
+            status = 'training'
+        else:
+            status = 'untrained'
+        
         return {
-            'loaded': self.model is not None,
-            'trained': self.model is not None,
-            'version': self.model_version,
-            'last_training': self.last_training,
+            'status': status,
+            'loaded': snapshot is not None,
+            'trained': snapshot is not None,
+            'training': training,
+            'version': snapshot.version if snapshot else self.model_version,
+            'last_training': snapshot.last_training if snapshot else None,
             'total_predictions': self.total_predictions,
-            'threshold': self.threshold
+            'threshold': snapshot.threshold if snapshot else 0.5,
+            'threshold_selection': snapshot.threshold_stats if snapshot else {},
+            'hyperparameters': self.hyperparameters,
+            'memory': snapshot.memory if snapshot else {}
         }
     
     def get_model_version(self) -> str:
@@ -451,26 +1774,116 @@ class MLPredictorService:
         return self.model_version
     
     def get_model_statistics(self) -> Dict[str, Any]:
-        """Get model statistics (placeholder - implement based on last predictions)"""
+        """
+        Counts and means over every employee scored by a model, across all
+        live workers: this worker's running totals plus the totals the
+        others last published in their heartbeats.
+        """
+        snapshot = self._snapshot
+        others = [
+            worker['prediction_stats'] for worker in self.heartbeats.list()
+            if not worker['current'] and 'prediction_stats' in worker
+        ]
+        stats = PredictionStats.combine([self.prediction_stats.totals()] + others)
+        potential, status, means = stats['potential'], stats['status'], stats['means']
+        
         return {
-            'total_employees': 0,
-            'high_potential_count': 0,
-            'meets_expectation_count': 0,
-            'below_expectation_count': 0,
-            'at_risk_count': 0,
-            'not_at_risk_count': 0,
-            'avg_performance_score': 0.0,
-            'avg_resignation_probability': 0.0,
-            'avg_attendance_rate': 0.0,
-            'model_version': self.model_version,
-            'last_training': self.last_training,
-            'last_updated': datetime.now()
+            'total_employees': stats['total'],
+            'high_potential_count': potential.get('High Potential', 0),
+            'meets_expectation_count': potential.get('Meets Expectation', 0),
+            'below_expectation_count': potential.get('Below Expectation', 0),
+            'at_risk_count': status.get('At Risk of Resigning', 0),
+            'not_at_risk_count': status.get('Not at Risk', 0),
+            'avg_performance_score': means['performance_score'],
+            'avg_resignation_probability': means['resignation_probability'],
+            'avg_attendance_rate': means['attendance_rate'],
+            'model_version': snapshot.version if snapshot else self.model_version,
+            'last_training': snapshot.last_training if snapshot else None,
+            'training_profile': (snapshot.training_profile or None) if snapshot else None,
+            'last_updated': stats['updated_at'] or datetime.now()
         }
     
+    def get_drift_report(self) -> Optional[Dict[str, Any]]:
+        """
+        PSI and KS drift of prediction inputs against the served model's
+        training baseline, over this worker's and the other live workers'
+        counters for the same version. None if the served model has no
+        baseline (no model, or trained before baselines were recorded).
+        """
+        snapshot = self._snapshot
+        if snapshot is None or not snapshot.drift_baseline:
+            return None
+        
+        monitor = self._drift
+        if monitor is None or monitor.version != snapshot.version:
+            monitor = self._drift = DriftMonitor(snapshot.drift_baseline, snapshot.version)
+        
+        others = [
+            worker['drift'] for worker in self.heartbeats.list()
+            if not worker['current'] and worker.get('drift')
+        ]
+        return monitor.report(others)
+    
+    def get_prediction_distribution(
+        self,
+        days: int = 30,
+        quantiles: Optional[List[float]] = None,
+        score_fields: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Daily quantiles of resignation probability and key features (or
+        the given `score_fields`), merged across workers from the sketches
+        on disk; each worker writes its own within one maintenance interval.
+        """
+        if days < 1:
+            raise ValueError("days must be at least 1")
+        return self.distribution.query(days, quantiles, score_fields)
+    
+    def get_prediction_history(
+        self,
+        employee_id: int,
+        days: int = 90,
+        fields: Optional[List[str]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """One employee's stored predictions, oldest first; None when history is disabled"""
+        if self.history is None:
+            return None
+        return self.history.query(employee_id, days, fields)
+    
+    def get_evaluation_report(self) -> Optional[Dict[str, Any]]:
+        """
+        Return the cross-validation report of the current registry version
+        (which may have been published by another worker). Version
+        directories never change, so the report is cached per path.
+        """
+        version = self.registry.current()
+        if version is None:
+            return None
+        
+        path = os.path.join(self.registry.version_dir(version), EVALUATION_FILE)
+        if self._evaluation_cache is None or self._evaluation_cache[0] != path:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self._evaluation_cache = (path, json.load(f))
+            except OSError:
+                return None
+        
+        return self._evaluation_cache[1]
+    
     def clear_cache(self):
-        """Clear model cache (reload from disk)"""
-        self.load_model()
+        """Clear model cache (reload from disk in every worker)"""
+        self.request_reload()
     
     async def reload_model(self) -> bool:
-        """Reload model from disk"""
+        """Reload the current model from disk in this worker and signal the others to follow"""
+        return self.request_reload()
+    
+    def request_reload(self) -> bool:
+        """
+        Re-point CURRENT at the version it already names: the pointer's
+        mtime changes, so every worker's registry poll reloads it.
+        """
+        current = self.registry.current()
+        if current is not None:
+            self.registry.set_current(current)
         return self.load_model()
@@ -0,0 +1,95 @@
+"""
+Model Metadata Sidecar
+======================
+
+A small JSON file saved in each registry version directory next to the
+pickled metadata. It holds what callers need to know about a model
+without loading it: version, threshold, feature schema, fingerprint,
+evaluation metrics, training timings and the forest's shape. Reading it
+costs one small file read, so the registry listing and /health use it,
+and startup checks it against the service before mapping a forest.
+"""
+
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+SIDECAR_FILE = 'model_metadata.json'
+SIDECAR_SCHEMA_VERSION = 1
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    return str(value)
+
+
+def write_sidecar(directory: str, metadata: Dict[str, Any]) -> str:
+    """Write the sidecar into a version directory, renamed into place"""
+    path = os.path.join(directory, SIDECAR_FILE)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'schema_version': SIDECAR_SCHEMA_VERSION, **metadata}, f, default=_json_default)
+    os.replace(tmp_path, path)
+    return path
+
+
+def read_sidecar(directory: str) -> Optional[Dict[str, Any]]:
+    """The sidecar of a version directory, or None if it has none (versions saved before it existed)"""
+    try:
+        with open(os.path.join(directory, SIDECAR_FILE), 'r', encoding='utf-8') as f:
+            metadata = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+    if metadata.get('last_training'):
+        try:
+            metadata['last_training'] = datetime.fromisoformat(metadata['last_training'])
+        except (TypeError, ValueError):
+            metadata['last_training'] = None
+    return metadata
+
+
+def validate_sidecar(
+    metadata: Dict[str, Any],
+    feature_columns: List[str],
+    forest_header: Optional[Dict[str, Any]],
+    encodings: Optional[Dict[str, Dict[str, int]]] = None
+) -> List[str]:
+    """
+    Problems that would stop this service from serving the model: an
+    unknown sidecar schema, a different feature list or (if given)
+    categorical `encodings`, or forest files that are missing or disagree
+    with the sidecar. Empty if servable.
+    """
+    problems = []
+
+    if metadata.get('schema_version') != SIDECAR_SCHEMA_VERSION:
+        problems.append(f"unsupported metadata schema version {metadata.get('schema_version')}")
+
+    columns = metadata.get('feature_schema', {}).get('columns')
+    if columns != feature_columns:
+        problems.append(f"feature columns {columns} do not match the service's {feature_columns}")
+
+    if encodings is not None:
+        recorded = metadata.get('feature_schema', {}).get('encodings') or {}
+        for feature, codes in encodings.items():
+            if recorded.get(feature) != codes:
+                problems.append(f"{feature} encoding {recorded.get(feature)} does not match the service's {codes}; retrain the model")
+
+    if forest_header is None:
+        problems.append("forest files are missing")
+    else:
+        forest = metadata.get('forest', {})
+        for key in ('n_features', 'n_estimators', 'n_nodes', 'layout_version'):
+            if key in forest and forest[key] != forest_header.get(key):
+                problems.append(f"forest {key} is {forest_header.get(key)}, metadata says {forest[key]}")
+
+    return problems
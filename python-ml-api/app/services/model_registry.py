@@ -0,0 +1,190 @@
+"""
+Versioned Model Registry
+========================
+
+Each trained model is one immutable directory under
+``registry/versions/<version>/`` holding the forest arrays, metadata and
+evaluation report. A version is staged in a temporary directory and
+published with a single directory rename, then made current by atomically
+replacing the ``CURRENT`` pointer file, so a reader never sees a model
+paired with another version's metadata or a half-written file. Older
+versions are kept for rollback up to a configurable count.
+
+Publication order comes from a ``PUBLISHED`` record written into the
+staged directory just before the rename, not from filesystem mtimes.
+Results computed after publication (permutation importance) live under
+``registry/importance/<version>.json``, so a version directory is never
+modified once published.
+"""
+
+import os
+import json
+import time
+import shutil
+import uuid
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+CURRENT_FILE = 'CURRENT'
+VERSIONS_DIR = 'versions'
+IMPORTANCE_DIR = 'importance'
+PUBLISHED_FILE = 'PUBLISHED'
+STAGING_PREFIX = '.staging-'
+
+
+class ModelRegistry:
+    """Publishes, lists, selects and prunes model versions on disk"""
+
+    def __init__(self, root: str, keep: int = 5):
+        self.root = root
+        self.keep = max(1, keep)
+        self.versions_dir = os.path.join(root, VERSIONS_DIR)
+        self.importance_dir = os.path.join(root, IMPORTANCE_DIR)
+        self.logger = logging.getLogger(__name__)
+
+        os.makedirs(self.versions_dir, exist_ok=True)
+        os.makedirs(self.importance_dir, exist_ok=True)
+
+    def version_dir(self, version: str) -> str:
+        return os.path.join(self.versions_dir, version)
+
+    def importance_path(self, version: str) -> str:
+        """Permutation importance of `version`, kept outside its immutable directory"""
+        return os.path.join(self.importance_dir, f"{version}.json")
+
+    def exists(self, version: str) -> bool:
+        return self._valid_name(version) and os.path.isdir(self.version_dir(version))
+
+    def stage(self) -> str:
+        """Create an empty staging directory for a new version"""
+        path = os.path.join(self.root, f"{STAGING_PREFIX}{uuid.uuid4().hex}")
+        os.makedirs(path)
+        return path
+
+    def discard(self, staging_dir: str):
+        """Remove a staging directory that will not be published"""
+        shutil.rmtree(staging_dir, ignore_errors=True)
+
+    def publish(self, staging_dir: str, version: str) -> str:
+        """
+        Move a fully written staging directory into place as `version` and
+        make it current. Returns the published directory.
+        """
+        if not self._valid_name(version):
+            raise ValueError(f"Invalid model version name: {version}")
+        if self.exists(version):
+            raise ValueError(f"Model version {version} already exists")
+
+        # Strictly after every version already published, even if the clock stepped back
+        newest = self.versions()
+        published_ns = max(time.time_ns(), self.published_ns(newest[0]) + 1 if newest else 0)
+        with open(os.path.join(staging_dir, PUBLISHED_FILE), 'w', encoding='utf-8') as f:
+            json.dump({'published_ns': published_ns}, f)
+
+        target = self.version_dir(version)
+        os.rename(staging_dir, target)
+        self.set_current(version)
+        self.prune()
+
+        self.logger.info(f"Published model version {version}")
+        return target
+
+    def current(self) -> Optional[str]:
+        """The current version, or None if nothing has been published"""
+        try:
+            with open(os.path.join(self.root, CURRENT_FILE), 'r', encoding='utf-8') as f:
+                version = f.read().strip()
+        except OSError:
+            return None
+
+        return version if self.exists(version) else None
+
+    def pointer(self) -> Optional[Tuple[str, int]]:
+        """
+        The current version together with the CURRENT file's mtime. The
+        pair changes on every publish, rollback or reload request, which
+        is what other workers poll for.
+        """
+        path = os.path.join(self.root, CURRENT_FILE)
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+        version = self.current()
+        return (version, mtime_ns) if version is not None else None
+
+    def set_current(self, version: str):
+        """Atomically point CURRENT at an existing version"""
+        if not self.exists(version):
+            raise ValueError(f"Unknown model version: {version}")
+
+        path = os.path.join(self.root, CURRENT_FILE)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(version)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def published_ns(self, version: str) -> int:
+        """
+        Publication time of `version` in nanoseconds. Versions published
+        before the record existed fall back to the timestamp in their
+        ``1.0.<timestamp>`` name.
+        """
+        try:
+            with open(os.path.join(self.version_dir(version), PUBLISHED_FILE), 'r', encoding='utf-8') as f:
+                return int(json.load(f)['published_ns'])
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+        suffix = version.rsplit('.', 1)[-1]
+        return int(suffix) * 10**9 if suffix.isdigit() else 0
+
+    def versions(self) -> List[str]:
+        """Published versions, newest first"""
+        names = [name for name in os.listdir(self.versions_dir) if self.exists(name)]
+        return sorted(names, key=lambda name: (self.published_ns(name), name), reverse=True)
+
+    def previous(self, version: Optional[str] = None) -> Optional[str]:
+        """The version published just before `version` (default: the current one)"""
+        version = version or self.current()
+        versions = self.versions()
+        if version not in versions:
+            return versions[0] if versions else None
+
+        index = versions.index(version)
+        return versions[index + 1] if index + 1 < len(versions) else None
+
+    def describe(self) -> List[Dict[str, Any]]:
+        """Listing of published versions for the API"""
+        current = self.current()
+        return [
+            {
+                'version': name,
+                'current': name == current,
+                'published_at': self.published_ns(name) / 1e9,
+            }
+            for name in self.versions()
+        ]
+
+    def prune(self):
+        """Delete the oldest versions beyond `keep`, never the current one"""
+        current = self.current()
+        for name in self.versions()[self.keep:]:
+            if name == current:
+                continue
+            # Workers still mapping the files keep them alive until they unmap
+            shutil.rmtree(self.version_dir(name), ignore_errors=True)
+            try:
+                os.remove(self.importance_path(name))
+            except OSError:
+                pass
+            self.logger.info(f"Pruned model version {name}")
+
+    @staticmethod
+    def _valid_name(version: str) -> bool:
+        return bool(version) and not version.startswith('.') and all(
+            ch.isalnum() or ch in '.-_' for ch in version
+        )
@@ -0,0 +1,64 @@
+"""
+Model Snapshot
+==============
+
+Everything a prediction needs from a trained model - the forest, its
+decision threshold and its version - bundled into one immutable object.
+The service replaces its snapshot with a single reference assignment once
+a new model is fully fitted or loaded, and each request reads the
+reference once at its start, so a request never mixes two models' state
+and never sees a model that is still being built.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Optional, Union
+
+from .forest_arrays import ForestArrays
+from .compact_forest import CompactForest
+
+
+@dataclass(frozen=True)
+class ModelSnapshot:
+    """A loaded model version and the metadata served with it"""
+
+    model: Union[ForestArrays, CompactForest]
+    version: str
+    threshold: float = 0.5
+    threshold_stats: Dict[str, Any] = field(default_factory=dict)
+    hyperparameters: Dict[str, Any] = field(default_factory=dict)
+    tuning: Dict[str, Any] = field(default_factory=dict)
+    fingerprint: Optional[str] = None
+    training_profile: Dict[str, Any] = field(default_factory=dict)
+    feature_importance: Dict[str, float] = field(default_factory=dict)
+    drift_baseline: Dict[str, Any] = field(default_factory=dict)
+    last_training: Optional[datetime] = None
+    model_dir: Optional[str] = None
+    memory: Dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def from_metadata(
+        cls,
+        model: Union[ForestArrays, CompactForest],
+        metadata: Dict[str, Any],
+        default_version: str,
+        model_dir: Optional[str] = None,
+        memory: Optional[Dict[str, Any]] = None,
+        drift_baseline: Optional[Dict[str, Any]] = None
+    ) -> 'ModelSnapshot':
+        """Build a snapshot from a registry version's saved metadata"""
+        return cls(
+            model=model,
+            version=metadata.get('version', default_version),
+            threshold=metadata.get('threshold', 0.5),
+            threshold_stats=dict(metadata.get('threshold_selection', {})),
+            hyperparameters=dict(metadata.get('hyperparameters', {})),
+            tuning=dict(metadata.get('tuning', {})),
+            fingerprint=metadata.get('fingerprint'),
+            training_profile=dict(metadata.get('training_profile', {})),
+            feature_importance=dict(metadata.get('feature_importance', {})),
+            last_training=metadata.get('last_training'),
+            model_dir=model_dir,
+            memory=dict(memory or {}),
+            drift_baseline=dict(drift_baseline or {}),
+        )
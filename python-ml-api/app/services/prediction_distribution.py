@@ -0,0 +1,172 @@
+"""
+Prediction Distribution Tracking
+================================
+
+Keeps one KLL quantile sketch per day for resignation probability and a
+few key features of every scored employee. Only the current day's
+sketches are held in memory. Each worker writes its own sketches to
+``<directory>/<YYYY-MM-DD>/<worker>.json``; because sketches merge, a
+query adds up every worker's file for each day. Days beyond the
+retention window are deleted.
+"""
+
+import json
+import os
+import shutil
+import threading
+import uuid
+import logging
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from .quantile_sketch import KLLSketch
+
+# Sketched metric -> scored frame column
+DISTRIBUTION_METRICS = {
+    'resignation_probability': 'resignation_probability',
+    'performance_score': 'performance',
+    'attendance_rate': 'attendance_rate',
+    'overall_score': 'overall_score',
+    'avg_evaluation': 'avg_evaluation',
+    'tenure_months': 'tenure',
+}
+
+
+class PredictionDistribution:
+    """Daily mergeable quantile sketches of prediction outputs and inputs"""
+
+    def __init__(self, directory: str, k: int = 200, retention_days: int = 90):
+        self.directory = directory
+        self.k = k
+        self.retention_days = max(1, retention_days)
+        self.worker_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.logger = logging.getLogger(__name__)
+
+        self._lock = threading.Lock()
+        self._days: Dict[str, Dict[str, KLLSketch]] = {}
+        self._dirty = set()
+
+        os.makedirs(self.directory, exist_ok=True)
+
+    def update(self, df: pd.DataFrame):
+        """Add a scored batch to today's sketches"""
+        day = date.today().isoformat()
+        columns = {
+            metric: pd.to_numeric(df[column], errors='coerce').to_numpy()
+            for metric, column in DISTRIBUTION_METRICS.items() if column in df
+        }
+
+        with self._lock:
+            sketches = self._days.setdefault(
+                day, {metric: KLLSketch(self.k) for metric in DISTRIBUTION_METRICS}
+            )
+            for metric, values in columns.items():
+                sketches[metric].update(values)
+            self._dirty.add(day)
+
+    def flush(self):
+        """Write changed sketches, drop past days from memory and prune old days on disk"""
+        today = date.today().isoformat()
+        with self._lock:
+            pending = {day: {m: s.to_dict() for m, s in self._days[day].items()} for day in self._dirty}
+            self._dirty.clear()
+            for day in [day for day in self._days if day != today]:
+                del self._days[day]
+
+        for day, sketches in pending.items():
+            day_dir = os.path.join(self.directory, day)
+            path = os.path.join(day_dir, f"{self.worker_id}.json")
+            tmp_path = f"{path}.tmp"
+            try:
+                os.makedirs(day_dir, exist_ok=True)
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(sketches, f)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                self.logger.error(f"Error writing distribution sketches for {day}: {e}")
+
+        self._prune()
+
+    def _prune(self):
+        cutoff = (date.today() - timedelta(days=self.retention_days - 1)).isoformat()
+        for day in self._stored_days():
+            if day < cutoff:
+                shutil.rmtree(os.path.join(self.directory, day), ignore_errors=True)
+
+    def _stored_days(self) -> List[str]:
+        days = []
+        for name in os.listdir(self.directory):
+            try:
+                datetime.strptime(name, '%Y-%m-%d')
+            except ValueError:
+                continue
+            days.append(name)
+        return sorted(days)
+
+    def _load_day(self, day: str) -> Dict[str, KLLSketch]:
+        merged = {metric: KLLSketch(self.k) for metric in DISTRIBUTION_METRICS}
+        day_dir = os.path.join(self.directory, day)
+        for name in os.listdir(day_dir):
+            if not name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(day_dir, name), 'r', encoding='utf-8') as f:
+                    sketches = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                continue
+            for metric, data in sketches.items():
+                if metric in merged:
+                    merged[metric].merge(KLLSketch.from_dict(data))
+        return merged
+
+    def query(
+        self,
+        days: int = 30,
+        quantiles: Optional[List[float]] = None,
+        metrics: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Quantiles per day (all workers merged) for the days with data
+        among the last `days` calendar days, today included, oldest first,
+        plus the whole range merged.
+        """
+        quantiles = quantiles or [0.1, 0.25, 0.5, 0.75, 0.9]
+        metrics = metrics or list(DISTRIBUTION_METRICS)
+        unknown = [metric for metric in metrics if metric not in DISTRIBUTION_METRICS]
+        if unknown:
+            raise ValueError(f"Unknown metrics {unknown}; choose from {list(DISTRIBUTION_METRICS)}")
+        if any(not 0.0 <= q <= 1.0 for q in quantiles):
+            raise ValueError("quantiles must be between 0 and 1")
+        if days < 1:
+            raise ValueError("days must be at least 1")
+
+        overall = {metric: KLLSketch(self.k) for metric in metrics}
+        day_summaries = []
+        since = (date.today() - timedelta(days=days - 1)).isoformat()
+        for day in self._stored_days():
+            if day < since:
+                continue
+            sketches = self._load_day(day)
+            for metric in metrics:
+                overall[metric].merge(sketches[metric])
+            day_summaries.append({'date': day, 'metrics': self._summarize(sketches, metrics, quantiles)})
+
+        return {
+            'quantiles': quantiles,
+            'days': day_summaries,
+            'overall': self._summarize(overall, metrics, quantiles),
+        }
+
+    @staticmethod
+    def _summarize(sketches: Dict[str, KLLSketch], metrics: List[str], quantiles: List[float]) -> Dict[str, Any]:
+        return {
+            metric: {
+                'count': sketches[metric].n,
+                'min': sketches[metric].min if sketches[metric].n else None,
+                'max': sketches[metric].max if sketches[metric].n else None,
+                'quantiles': dict(zip((f"{q:g}" for q in quantiles), sketches[metric].quantiles(quantiles))),
+            }
+            for metric in metrics
+        }
@@ -0,0 +1,358 @@
+"""
+Prediction History
+==================
+
+Append-only store of every scored employee: employee_id, timestamp,
+model version and scores. Batches are buffered in memory and written by
+a periodic flush, off the request path, as Parquet files partitioned by
+day and by employee_id bucket,
+
+    <directory>/date=<YYYY-MM-DD>/bucket=<NN>/<worker>-<seq>.parquet
+
+each sorted by employee_id. A lookup for one employee opens only its
+bucket in the days asked for, reads only the requested columns and lets
+row group statistics skip the rest of each file. Days before yesterday
+are compacted into one file per bucket; days beyond the retention window
+are deleted. Rows still buffered by other workers become visible when
+those workers flush.
+
+A worker claims a day for compaction with a marker file whose mtime it
+refreshes after every bucket; a marker left untouched for
+`COMPACTION_STALE_SECONDS` belongs to a worker that died, and the next
+worker takes the day over, first restoring any bucket the dead worker
+left half swapped. Readers find a bucket caught between the two renames
+of a swap in its retired directory, and list the buckets again if files
+vanish before they are opened.
+"""
+
+import os
+import shutil
+import threading
+import time
+import uuid
+import logging
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Stored columns; employee_id and timestamp are always present
+HISTORY_COLUMNS = [
+    'employee_id', 'timestamp', 'model_version', 'resignation_probability',
+    'resignation_status', 'potential', 'performance_score', 'attendance_rate',
+    'overall_score',
+]
+
+# Score columns that can be requested from `query`
+HISTORY_FIELDS = HISTORY_COLUMNS[2:]
+
+# Rows per Parquet row group; the unit that statistics can skip
+ROW_GROUP_ROWS = 4096
+
+COMPACTING_MARKER = '_compacting'
+COMPACTED_MARKER = '_compacted'
+
+# A compaction marker not refreshed for this long was left by a dead worker
+COMPACTION_STALE_SECONDS = 600
+
+# Attempts at reading a bucket whose files are being swapped by compaction
+QUERY_ATTEMPTS = 3
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError("Prediction history requires the pyarrow package")
+    return pa, ds, pq
+
+
+def _schema(pa):
+    return pa.schema([
+        ('employee_id', pa.int64()),
+        ('timestamp', pa.timestamp('us')),
+        ('model_version', pa.string()),
+        ('resignation_probability', pa.float64()),
+        ('resignation_status', pa.string()),
+        ('potential', pa.string()),
+        ('performance_score', pa.float64()),
+        ('attendance_rate', pa.float64()),
+        ('overall_score', pa.float64()),
+    ])
+
+
+class PredictionHistory:
+    """Partitioned Parquet log of scored employees"""
+
+    def __init__(
+        self,
+        directory: str,
+        buckets: int = 16,
+        flush_seconds: float = 60.0,
+        flush_rows: int = 100000,
+        retention_days: int = 365
+    ):
+        self.directory = directory
+        self.buckets = max(1, buckets)
+        self.flush_seconds = flush_seconds
+        self.flush_rows = max(1, flush_rows)
+        self.retention_days = max(1, retention_days)
+        self.worker_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.logger = logging.getLogger(__name__)
+
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._buffer: List[pd.DataFrame] = []
+        self._buffered_rows = 0
+        self._last_flush = time.monotonic()
+        self._sequence = 0
+
+        os.makedirs(self.directory, exist_ok=True)
+
+    def append(self, df: pd.DataFrame, model_version: str, timestamp: Optional[datetime] = None):
+        """
+        Buffer a scored batch. Never writes: once `flush_rows` rows are
+        waiting the next `flush(force=False)` writes them early.
+        """
+        if not len(df):
+            return
+
+        batch = pd.DataFrame({
+            'employee_id': df['id'].to_numpy(dtype=np.int64),
+            'timestamp': np.datetime64(timestamp or datetime.now(), 'us'),
+            'model_version': model_version,
+            'resignation_probability': df['resignation_probability'].to_numpy(dtype=np.float64),
+            'resignation_status': df['resignation_status'].to_numpy(),
+            'potential': df['potential'].to_numpy(),
+            'performance_score': df['performance'].to_numpy(dtype=np.float64),
+            'attendance_rate': df['attendance_rate'].to_numpy(dtype=np.float64),
+            'overall_score': df['overall_score'].to_numpy(dtype=np.float64),
+        })
+        with self._lock:
+            self._buffer.append(batch)
+            self._buffered_rows += len(batch)
+
+    @property
+    def flush_due(self) -> bool:
+        """Whether `flush_rows` rows are buffered"""
+        return self._buffered_rows >= self.flush_rows
+
+    def flush(self, force: bool = True):
+        """
+        Write buffered rows, then compact and prune old days. Without
+        `force`, does nothing until `flush_seconds` passed since the last
+        flush or `flush_rows` rows are buffered. Blocks on disk I/O, so
+        callers on the event loop run it in an executor.
+        """
+        with self._lock:
+            if not force and not self.flush_due and time.monotonic() - self._last_flush < self.flush_seconds:
+                return
+            batches, self._buffer, self._buffered_rows = self._buffer, [], 0
+            self._last_flush = time.monotonic()
+
+        with self._write_lock:
+            if batches:
+                frame = pd.concat(batches, ignore_index=True)
+                try:
+                    self._write(frame)
+                except Exception as e:
+                    self.logger.error(f"Error writing {len(frame)} prediction history rows: {e}")
+            try:
+                self._compact()
+            except Exception as e:
+                self.logger.error(f"Error compacting prediction history: {e}")
+            self._prune()
+
+    def _write(self, frame: pd.DataFrame):
+        pa, _, pq = _pyarrow()
+        schema = _schema(pa)
+        frame = frame.sort_values(['employee_id', 'timestamp'], kind='stable')
+        days = frame['timestamp'].dt.strftime('%Y-%m-%d')
+        buckets = frame['employee_id'] % self.buckets
+
+        self._sequence += 1
+        for (day, bucket), part in frame.groupby([days, buckets], sort=False):
+            partition = self._partition_dir(day, bucket)
+            path = os.path.join(partition, f"{self.worker_id}-{self._sequence:06d}.parquet")
+            os.makedirs(partition, exist_ok=True)
+            table = pa.Table.from_pandas(part[HISTORY_COLUMNS], schema=schema, preserve_index=False)
+            pq.write_table(table, f"{path}.tmp", row_group_size=ROW_GROUP_ROWS)
+            os.replace(f"{path}.tmp", path)
+
+    def _partition_dir(self, day: str, bucket: int) -> str:
+        return os.path.join(self.directory, f"date={day}", f"bucket={bucket:02d}")
+
+    def _stored_days(self) -> List[str]:
+        days = []
+        for name in os.listdir(self.directory):
+            if not name.startswith('date='):
+                continue
+            try:
+                datetime.strptime(name[5:], '%Y-%m-%d')
+            except ValueError:
+                continue
+            days.append(name[5:])
+        return sorted(days)
+
+    @staticmethod
+    def _files(partition: str) -> List[str]:
+        if not os.path.isdir(partition):
+            # Between compaction's two renames (or after a crash there) the
+            # original parts are only in the retired directory
+            partition = f"{partition}.retired"
+            if not os.path.isdir(partition):
+                return []
+        return sorted(
+            os.path.join(partition, name) for name in os.listdir(partition) if name.endswith('.parquet')
+        )
+
+    def _compact(self):
+        """Merge each bucket of the oldest uncompacted day before yesterday into one file"""
+        _, ds, pq = _pyarrow()
+        cutoff = (date.today() - timedelta(days=1)).isoformat()
+
+        for day in self._stored_days():
+            if day >= cutoff:
+                return
+            day_dir = os.path.join(self.directory, f"date={day}")
+            if os.path.exists(os.path.join(day_dir, COMPACTED_MARKER)):
+                continue
+            if not self._claim(day_dir):
+                continue
+            marker = os.path.join(day_dir, COMPACTING_MARKER)
+            self._recover(day_dir)
+
+            for name in sorted(os.listdir(day_dir)):
+                partition = os.path.join(day_dir, name)
+                files = self._files(partition) if name.startswith('bucket=') and '.' not in name else []
+                if len(files) < 2:
+                    continue
+                # Keep the claim fresh so other workers do not take the day over
+                os.utime(marker)
+                table = ds.dataset(files, format='parquet').to_table().sort_by(
+                    [('employee_id', 'ascending'), ('timestamp', 'ascending')]
+                )
+                staging, retired = f"{partition}.compacting", f"{partition}.retired"
+                shutil.rmtree(staging, ignore_errors=True)
+                os.makedirs(staging)
+                pq.write_table(table, os.path.join(staging, 'compacted.parquet'), row_group_size=ROW_GROUP_ROWS)
+                # Swap directories so readers never see both the parts and the merged file
+                os.rename(partition, retired)
+                os.rename(staging, partition)
+                shutil.rmtree(retired, ignore_errors=True)
+
+            os.replace(marker, os.path.join(day_dir, COMPACTED_MARKER))
+            self.logger.info(f"Compacted prediction history for {day}")
+            return
+
+    def _claim(self, day_dir: str) -> bool:
+        """Create the day's compaction marker, taking over a stale one; False if another worker holds it"""
+        marker = os.path.join(day_dir, COMPACTING_MARKER)
+        try:
+            os.close(os.open(marker, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return True
+        except FileExistsError:
+            pass
+
+        try:
+            if time.time() - os.stat(marker).st_mtime < COMPACTION_STALE_SECONDS:
+                return False
+            # Only one worker can rename the stale marker away
+            stale = f"{marker}.{self.worker_id}"
+            os.rename(marker, stale)
+        except OSError:
+            return False
+        os.remove(stale)
+        self.logger.warning(f"Taking over stale prediction history compaction in {day_dir}")
+
+        try:
+            os.close(os.open(marker, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return True
+        except FileExistsError:
+            return False
+
+    def _recover(self, day_dir: str):
+        """Undo the leftovers of a compaction that died between or after its directory swaps"""
+        for name in os.listdir(day_dir):
+            path = os.path.join(day_dir, name)
+            if name.endswith('.compacting'):
+                shutil.rmtree(path, ignore_errors=True)
+            elif name.endswith('.retired'):
+                partition = path[:-len('.retired')]
+                if os.path.exists(partition):
+                    # The merged file is in place; the parts are redundant
+                    shutil.rmtree(path, ignore_errors=True)
+                else:
+                    os.rename(path, partition)
+
+    def _prune(self):
+        cutoff = (date.today() - timedelta(days=self.retention_days - 1)).isoformat()
+        for day in self._stored_days():
+            if day < cutoff:
+                shutil.rmtree(os.path.join(self.directory, f"date={day}"), ignore_errors=True)
+
+    @staticmethod
+    def _read(files: List[str], columns: List[str], employee_id: int) -> pd.DataFrame:
+        _, ds, _ = _pyarrow()
+        table = ds.dataset(files, format='parquet').to_table(
+            columns=columns, filter=ds.field('employee_id') == employee_id
+        )
+        return table.to_pandas()
+
+    def _read_partition(self, partition: str, columns: List[str], employee_id: int) -> pd.DataFrame:
+        for attempt in range(QUERY_ATTEMPTS):
+            files = self._files(partition)
+            if not files:
+                return pd.DataFrame(columns=columns)
+            try:
+                return self._read(files, columns, employee_id)
+            except FileNotFoundError:
+                if attempt + 1 == QUERY_ATTEMPTS:
+                    raise
+
+    def query(self, employee_id: int, days: int = 90, fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        One employee's stored predictions from the last `days` days
+        (including this worker's unflushed rows), oldest first, with only
+        the requested score `fields`.
+        """
+        _pyarrow()
+        fields = fields or HISTORY_FIELDS
+        unknown = [field for field in fields if field not in HISTORY_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown history fields {unknown}; choose from {HISTORY_FIELDS}")
+        if days < 1:
+            raise ValueError("days must be at least 1")
+
+        since = (date.today() - timedelta(days=days - 1)).isoformat()
+        bucket = employee_id % self.buckets
+        columns = ['timestamp'] + list(fields)
+
+        partitions = [self._partition_dir(day, bucket) for day in self._stored_days() if day >= since]
+        files = [path for partition in partitions for path in self._files(partition)]
+
+        frames = []
+        try:
+            if files:
+                frames.append(self._read(files, columns, employee_id))
+        except FileNotFoundError:
+            # Compaction swapped a bucket after it was listed; each bucket is
+            # swapped once, so read them one by one, listing each again
+            frames = [self._read_partition(partition, columns, employee_id) for partition in partitions]
+        with self._lock:
+            frames.extend(batch.loc[batch['employee_id'] == employee_id, columns] for batch in self._buffer)
+
+        frames = [frame for frame in frames if len(frame)]
+        history = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+        history = history[history['timestamp'] >= pd.Timestamp(since)].sort_values('timestamp', kind='stable')
+
+        return {
+            'employee_id': employee_id,
+            'days': days,
+            'partitions_scanned': len(partitions),
+            'files_scanned': len(files),
+            'points': history.astype(object).where(history.notna(), None).to_dict('records'),
+        }
@@ -0,0 +1,102 @@
+"""
+Prediction Statistics
+=====================
+
+Running aggregates over every employee this worker has scored: counts per
+potential class and resignation status, and sums for the running means of
+performance, resignation probability and attendance rate. Each prediction
+batch adds its own totals, so keeping the aggregates costs the same no
+matter how many predictions came before, and reading them is immediate.
+
+Workers publish their totals in their heartbeats; adding those up gives
+the service-wide figures.
+"""
+
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Iterable
+
+import numpy as np
+import pandas as pd
+
+# Frame column behind each running mean
+MEAN_COLUMNS = {
+    'performance_score': 'performance',
+    'resignation_probability': 'resignation_probability',
+    'attendance_rate': 'attendance_rate',
+}
+
+
+class PredictionStats:
+    """Thread-safe running counts and means of served predictions"""
+
+    def __init__(self):
+        self.started_at = datetime.now()
+        self.updated_at = self.started_at
+        self._lock = threading.Lock()
+        self._total = 0
+        self._potential: Counter = Counter()
+        self._status: Counter = Counter()
+        self._sums = {name: 0.0 for name in MEAN_COLUMNS}
+        self._counts = {name: 0 for name in MEAN_COLUMNS}
+
+    def update(self, df: pd.DataFrame):
+        """Add one scored batch (a frame with potential, resignation_status and the MEAN_COLUMNS)"""
+        potential = df['potential'].value_counts()
+        status = df['resignation_status'].value_counts()
+        sums, counts = {}, {}
+        for name, column in MEAN_COLUMNS.items():
+            values = pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=np.float64)
+            valid = ~np.isnan(values)
+            sums[name] = float(values[valid].sum())
+            counts[name] = int(valid.sum())
+
+        with self._lock:
+            self._total += len(df)
+            self._potential.update({str(k): int(v) for k, v in potential.items()})
+            self._status.update({str(k): int(v) for k, v in status.items()})
+            for name in MEAN_COLUMNS:
+                self._sums[name] += sums[name]
+                self._counts[name] += counts[name]
+            self.updated_at = datetime.now()
+
+    def totals(self) -> Dict[str, Any]:
+        """Raw totals, JSON-serializable for heartbeats and mergeable with `combine`"""
+        with self._lock:
+            return {
+                'total': self._total,
+                'potential': dict(self._potential),
+                'status': dict(self._status),
+                'sums': dict(self._sums),
+                'counts': dict(self._counts),
+                'updated_at': self.updated_at.timestamp(),
+            }
+
+    @staticmethod
+    def combine(parts: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        """Add up totals from several workers and derive the means"""
+        total = 0
+        potential: Counter = Counter()
+        status: Counter = Counter()
+        sums = {name: 0.0 for name in MEAN_COLUMNS}
+        counts = {name: 0 for name in MEAN_COLUMNS}
+        updated_at = None
+
+        for part in parts:
+            total += part.get('total', 0)
+            potential.update(part.get('potential', {}))
+            status.update(part.get('status', {}))
+            for name in MEAN_COLUMNS:
+                sums[name] += part.get('sums', {}).get(name, 0.0)
+                counts[name] += part.get('counts', {}).get(name, 0)
+            if part.get('updated_at') is not None:
+                updated_at = max(updated_at or 0.0, part['updated_at'])
+
+        return {
+            'total': total,
+            'potential': dict(potential),
+            'status': dict(status),
+            'means': {name: sums[name] / counts[name] if counts[name] else 0.0 for name in MEAN_COLUMNS},
+            'updated_at': datetime.fromtimestamp(updated_at) if updated_at is not None else None,
+        }
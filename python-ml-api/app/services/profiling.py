@@ -0,0 +1,170 @@
+"""
+Training Profiler
+=================
+
+Named stage timers with peak-memory sampling, used to break a training
+run down into feature processing, fitting, threshold selection,
+evaluation and persistence so a slow retrain can be traced to one stage.
+"""
+
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def current_rss_bytes() -> Optional[int]:
+    """Resident set size of this process, or None if it cannot be read"""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        pass
+
+    if resource is not None:
+        # ru_maxrss is the lifetime peak: kilobytes on Linux, bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+    return None
+
+
+def _mb(value: Optional[int]) -> Optional[float]:
+    return round(value / (1024 * 1024), 2) if value is not None else None
+
+
+class StageProfiler:
+    """
+    Records wall time, CPU time and peak RSS per named stage.
+
+    A background thread samples RSS every `sample_interval` seconds while
+    the profiler is running (``with profiler:``); a run may be sampled in
+    several pieces, e.g. request-time feature processing and a background
+    fit, and the total spans the first start to the last stop. Entering a
+    stage name more than once accumulates into the same entry, e.g.
+    per-batch stages of an upload. A disabled profiler is a no-op.
+    """
+
+    def __init__(self, sample_interval: float = 0.02, enabled: bool = True):
+        self.sample_interval = sample_interval
+        self.enabled = enabled
+        self._stages: Dict[str, Dict[str, Any]] = {}
+        self._peak_rss = 0
+        self._overall_peak_rss = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._depth = 0
+        self._started = 0.0
+        self._finished: Optional[float] = None
+
+    def __enter__(self) -> 'StageProfiler':
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def start(self):
+        """Start (or join) RSS sampling; nested start/stop pairs share one thread"""
+        if not self.enabled:
+            return
+
+        self._depth += 1
+        if self._thread is not None:
+            return
+
+        if not self._started:
+            self._started = time.perf_counter()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample_loop, name='stage-profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop sampling once every start has been matched; stages are kept"""
+        if self._thread is None:
+            return
+
+        self._depth -= 1
+        if self._depth > 0:
+            return
+
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self._finished = time.perf_counter()
+
+    def _sample_loop(self):
+        while not self._stop.wait(self.sample_interval):
+            self._record_rss(current_rss_bytes())
+
+    def _record_rss(self, rss: Optional[int]):
+        if rss is None:
+            return
+        with self._lock:
+            self._peak_rss = max(self._peak_rss, rss)
+            self._overall_peak_rss = max(self._overall_peak_rss, rss)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time a named stage and record the peak RSS seen while it ran"""
+        if not self.enabled:
+            yield
+            return
+
+        rss_start = current_rss_bytes()
+        with self._lock:
+            self._peak_rss = 0
+        self._record_rss(rss_start)
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            rss_end = current_rss_bytes()
+            self._record_rss(rss_end)
+
+            with self._lock:
+                entry = self._stages.setdefault(name, {
+                    'stage': name,
+                    'calls': 0,
+                    'seconds': 0.0,
+                    'cpu_seconds': 0.0,
+                    'rss_start_mb': _mb(rss_start),
+                    'peak_rss_mb': None,
+                })
+                entry['calls'] += 1
+                entry['seconds'] += wall
+                entry['cpu_seconds'] += cpu
+                entry['rss_end_mb'] = _mb(rss_end)
+                peak = _mb(self._peak_rss or None)
+                if peak is not None:
+                    entry['peak_rss_mb'] = max(entry['peak_rss_mb'] or 0.0, peak)
+
+    def summary(self) -> Dict[str, Any]:
+        """Profile as a JSON-friendly dict, stages in the order first entered"""
+        with self._lock:
+            stages: List[Dict[str, Any]] = [
+                {**entry, 'seconds': round(entry['seconds'], 4), 'cpu_seconds': round(entry['cpu_seconds'], 4)}
+                for entry in self._stages.values()
+            ]
+            peak = self._overall_peak_rss
+
+        end = self._finished if self._finished is not None else time.perf_counter()
+        return {
+            'total_seconds': round(end - self._started, 4) if self._started else None,
+            'peak_rss_mb': _mb(peak or None),
+            'stages': stages,
+        }
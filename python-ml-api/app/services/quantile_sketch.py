@@ -0,0 +1,127 @@
+"""
+KLL Quantile Sketch
+===================
+
+A mergeable streaming quantile sketch (Karnin, Lang and Liberty, 2016).
+Values are kept in levels of compactors; level h holds items standing for
+2**h original values each. When a level outgrows its capacity it is
+sorted and every other item (from a random offset) is promoted to the
+next level, so the sketch keeps O(k log(n/k)) items and its rank error
+stays around 1.7/k whatever n is. Two sketches merge by concatenating
+their levels and compacting.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+# Capacity ratio between a level and the one above it
+CAPACITY_DECAY = 2 / 3
+
+
+class KLLSketch:
+    """Approximate quantiles of a stream of floats in bounded memory"""
+
+    def __init__(self, k: int = 200, seed: Optional[int] = None):
+        self.k = max(8, k)
+        self.n = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(2, int(np.ceil(self.k * CAPACITY_DECAY ** depth)))
+
+    def update(self, values: Iterable[float]):
+        """Add a batch of values; NaNs are ignored"""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+
+        self.n += len(values)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def merge(self, other: 'KLLSketch'):
+        """Fold another sketch into this one"""
+        if not other.n:
+            return
+
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+
+        self.n += other.n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+
+    def _compress(self):
+        while True:
+            level = next(
+                (h for h in range(len(self.levels)) if len(self.levels[h]) > self._capacity(h)), None
+            )
+            if level is None:
+                return
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+
+            items = np.sort(self.levels[level])
+            # An odd item stays behind so total weight is preserved exactly
+            keep, items = (items[-1:], items[:-1]) if len(items) % 2 else (items[:0], items)
+            promoted = items[int(self._rng.integers(2))::2]
+
+            self.levels[level] = keep
+            self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+
+    def quantiles(self, qs: Iterable[float]) -> List[Optional[float]]:
+        """Approximate values at each quantile in [0, 1]; None if empty"""
+        qs = list(qs)
+        if not self.n:
+            return [None] * len(qs)
+
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items_), 2 ** h) for h, items_ in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        items, cumulative = items[order], np.cumsum(weights[order])
+
+        results = []
+        for q in qs:
+            if q <= 0:
+                results.append(self.min)
+            elif q >= 1:
+                results.append(self.max)
+            else:
+                index = min(int(np.searchsorted(cumulative, q * cumulative[-1])), len(items) - 1)
+                results.append(float(items[index]))
+        return results
+
+    @property
+    def size(self) -> int:
+        """Items retained"""
+        return sum(len(items) for items in self.levels)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'k': self.k,
+            'n': self.n,
+            'min': self.min if self.n else None,
+            'max': self.max if self.n else None,
+            'levels': [items.tolist() for items in self.levels],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'KLLSketch':
+        sketch = cls(k=data.get('k', 200))
+        sketch.n = data.get('n', 0)
+        if sketch.n:
+            sketch.min = data['min']
+            sketch.max = data['max']
+        sketch.levels = [np.asarray(items, dtype=np.float64) for items in data.get('levels', [[]])] or [np.empty(0)]
+        return sketch
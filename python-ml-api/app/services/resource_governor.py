@@ -0,0 +1,73 @@
+"""
+CPU Resource Governor
+=====================
+
+Splits the CPU cores available to one worker process into separate
+thread budgets for serving predictions and for training, so that several
+API workers on one host do not oversubscribe it. The inference budget is
+applied to the forest's n_jobs and to native (OpenMP/BLAS) thread pools
+for the whole process. The training budget is applied by passing
+`training_threads` as n_jobs to everything that trains: the forest fit,
+cross-validation, permutation importance and the hyperparameter search.
+
+Native thread pool limits are process-wide, so they stay at the inference
+budget for the life of the process. Raising them per training job would
+let overlapping jobs restore them out of order and hand predictions
+served during training the training budget.
+"""
+
+import os
+from typing import Any, Dict, List, Optional
+
+from threadpoolctl import threadpool_info, threadpool_limits
+
+
+def available_cpus() -> int:
+    """Number of CPUs this process may run on (honours affinity/cgroup pinning)"""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+class ResourceGovernor:
+    """Thread budgets for inference and training within one worker"""
+
+    def __init__(self, worker_count: int = 1, inference_threads: int = 0, training_threads: int = 0):
+        self.cpu_count = available_cpus()
+        self.worker_count = max(1, worker_count)
+
+        # Each worker gets an equal share of the host; by default half of it
+        # serves predictions and the rest is left for training
+        self.cores_per_worker = max(1, self.cpu_count // self.worker_count)
+        self.inference_threads = inference_threads or max(1, self.cores_per_worker // 2)
+        self.training_threads = training_threads or max(1, self.cores_per_worker - self.inference_threads)
+
+        self._process_limits = None
+        self._native_threadpools: Optional[List[Dict[str, Any]]] = None
+
+    def apply(self):
+        """Cap this process's native thread pools at the inference budget"""
+        self._process_limits = threadpool_limits(limits=self.inference_threads)
+        # Inspecting the loaded libraries is slow, and the limits do not change after this
+        self._native_threadpools = self._inspect_threadpools()
+
+    @staticmethod
+    def _inspect_threadpools() -> List[Dict[str, Any]]:
+        return [
+            {'api': pool['user_api'], 'library': pool['internal_api'], 'num_threads': pool['num_threads']}
+            for pool in threadpool_info()
+        ]
+
+    def describe(self) -> Dict[str, Any]:
+        """Current allocation, for health reporting"""
+        if self._native_threadpools is None:
+            self._native_threadpools = self._inspect_threadpools()
+        return {
+            'cpu_count': self.cpu_count,
+            'worker_count': self.worker_count,
+            'cores_per_worker': self.cores_per_worker,
+            'inference_threads': self.inference_threads,
+            'training_threads': self.training_threads,
+            # Process-wide values as set by apply()
+            'native_threadpools': self._native_threadpools,
+        }
@@ -0,0 +1,139 @@
+"""
+Shadow Scoring
+==============
+
+Scores a candidate model version on a random sample of live prediction
+traffic, after the response has been computed and off the request path,
+and records how often it agrees with the served model and how fast it is.
+Statistics are kept in memory per worker.
+"""
+
+import asyncio
+import random
+import threading
+import time
+import logging
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, Optional, Set
+
+import numpy as np
+
+# Latency samples kept for the percentile estimates
+LATENCY_WINDOW = 1000
+
+
+def _percentiles(samples: Deque[float]) -> Dict[str, Optional[float]]:
+    if not samples:
+        return {'p50_ms': None, 'p95_ms': None}
+    values = np.asarray(samples) * 1000
+    return {
+        'p50_ms': round(float(np.percentile(values, 50)), 3),
+        'p95_ms': round(float(np.percentile(values, 95)), 3),
+    }
+
+
+class ShadowScorer:
+    """Compares a shadow model snapshot with the served one on sampled batches"""
+
+    def __init__(self, snapshot, sample_rate: float, max_pending: int = 4):
+        self.snapshot = snapshot
+        self.sample_rate = min(max(sample_rate, 0.0), 1.0)
+        self.max_pending = max_pending
+        self.started_at = datetime.now()
+        self.logger = logging.getLogger(__name__)
+
+        self._lock = threading.Lock()
+        self._tasks: Set[asyncio.Task] = set()
+        self._primary_latency: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._shadow_latency: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._counts = {
+            'batches_sampled': 0,
+            'batches_skipped': 0,
+            'rows_scored': 0,
+            'status_agreements': 0,
+            'errors': 0,
+        }
+        self._abs_diff_sum = 0.0
+
+    @property
+    def version(self) -> str:
+        return self.snapshot.version
+
+    def maybe_score(
+        self,
+        X: np.ndarray,
+        primary_probs: np.ndarray,
+        primary_threshold: float,
+        primary_seconds: float,
+        run_in_executor: Callable[..., Any]
+    ):
+        """
+        With probability `sample_rate`, schedule shadow scoring of a batch
+        the served model just scored. Returns immediately; batches are
+        skipped rather than queued when `max_pending` are still running.
+        """
+        if random.random() >= self.sample_rate:
+            return
+
+        if len(self._tasks) >= self.max_pending:
+            with self._lock:
+                self._counts['batches_skipped'] += 1
+            return
+
+        primary_at_risk = primary_probs > primary_threshold
+        task = asyncio.get_running_loop().create_task(
+            self._score(X, primary_probs, primary_at_risk, primary_seconds, run_in_executor)
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _score(
+        self,
+        X: np.ndarray,
+        primary_probs: np.ndarray,
+        primary_at_risk: np.ndarray,
+        primary_seconds: float,
+        run_in_executor: Callable[..., Any]
+    ):
+        try:
+            shadow_probs, shadow_seconds = await run_in_executor(self._predict, X)
+        except Exception as e:
+            self.logger.error(f"Shadow scoring with model {self.version} failed: {e}")
+            with self._lock:
+                self._counts['errors'] += 1
+            return
+
+        shadow_at_risk = shadow_probs > self.snapshot.threshold
+        with self._lock:
+            self._counts['batches_sampled'] += 1
+            self._counts['rows_scored'] += len(X)
+            self._counts['status_agreements'] += int((shadow_at_risk == primary_at_risk).sum())
+            self._abs_diff_sum += float(np.abs(shadow_probs - primary_probs).sum())
+            self._primary_latency.append(primary_seconds)
+            self._shadow_latency.append(shadow_seconds)
+
+    def _predict(self, X: np.ndarray):
+        start = time.perf_counter()
+        probs = self.snapshot.model.predict_proba(X)[:, 1]
+        return probs, time.perf_counter() - start
+
+    async def drain(self):
+        """Wait for scheduled shadow batches to finish"""
+        if self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._counts)
+            rows = counts['rows_scored']
+            return {
+                'shadow_version': self.version,
+                'sample_rate': self.sample_rate,
+                'started_at': self.started_at,
+                **counts,
+                'status_agreement_rate': counts['status_agreements'] / rows if rows else None,
+                'mean_abs_probability_diff': self._abs_diff_sum / rows if rows else None,
+                'primary_latency': _percentiles(self._primary_latency),
+                'shadow_latency': _percentiles(self._shadow_latency),
+            }
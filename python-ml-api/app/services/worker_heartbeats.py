@@ -0,0 +1,83 @@
+"""
+Worker Heartbeats
+=================
+
+Each API worker process periodically records which model version it is
+serving in a small JSON file named after its pid. Any worker can then
+report the state of all of them, e.g. to confirm that a newly published
+model has reached every worker.
+"""
+
+import json
+import os
+import time
+import logging
+from typing import Any, Dict, List
+
+
+class WorkerHeartbeats:
+    """Per-process heartbeat files in a shared directory"""
+
+    def __init__(self, heartbeat_dir: str, ttl: float):
+        self.heartbeat_dir = heartbeat_dir
+        self.ttl = ttl
+        self.pid = os.getpid()
+        self.started_at = time.time()
+        self.logger = logging.getLogger(__name__)
+
+        os.makedirs(self.heartbeat_dir, exist_ok=True)
+
+    def _path(self, pid: int) -> str:
+        return os.path.join(self.heartbeat_dir, f"{pid}.json")
+
+    def beat(self, state: Dict[str, Any]):
+        """Record this worker's current state"""
+        record = {
+            'pid': self.pid,
+            'started_at': self.started_at,
+            'updated_at': time.time(),
+            **state,
+        }
+        path = self._path(self.pid)
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(record, f, default=str)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            self.logger.error(f"Error writing worker heartbeat: {e}")
+
+    def remove(self):
+        """Drop this worker's heartbeat, e.g. on shutdown"""
+        try:
+            os.remove(self._path(self.pid))
+        except OSError:
+            pass
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Heartbeats of live workers; records older than `ttl` are deleted"""
+        now = time.time()
+        workers = []
+
+        for name in os.listdir(self.heartbeat_dir):
+            if not name.endswith('.json'):
+                continue
+
+            path = os.path.join(self.heartbeat_dir, name)
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    record = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                continue
+
+            if now - record.get('updated_at', 0) > self.ttl:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                continue
+
+            record['current'] = record.get('pid') == self.pid
+            workers.append(record)
+
+        return sorted(workers, key=lambda record: record['pid'])
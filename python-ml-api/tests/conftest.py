@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from app.services.forest_arrays import ForestArrays
+
+
+@pytest.fixture(scope='session')
+def forest_data():
+    """A small fitted forest on data with some missing values, plus fresh rows to score"""
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(600, 6)).astype(np.float32)
+    X[rng.random(X.shape) < 0.05] = np.nan
+    y = ((np.nan_to_num(X[:, 0]) + np.nan_to_num(X[:, 1]) * np.nan_to_num(X[:, 2])
+          + rng.normal(scale=0.5, size=len(X))) > 0).astype(int)
+    model = RandomForestClassifier(n_estimators=40, min_samples_leaf=2, random_state=0).fit(X, y)
+
+    rows = rng.normal(size=(300, 6)).astype(np.float32)
+    rows[rng.random(rows.shape) < 0.05] = np.nan
+    return model, rows
+
+
+@pytest.fixture
+def mapped_forest(forest_data, tmp_path):
+    """The fixture forest saved and memory-mapped back"""
+    model, _ = forest_data
+    ForestArrays.from_estimator(model).save(str(tmp_path))
+    return ForestArrays.load(str(tmp_path))
+
+
+@pytest.fixture
+def service_factory(tmp_path, monkeypatch):
+    """Builds service instances sharing one models directory, like workers on a host"""
+    from app.config import settings
+    from app.services.ml_predictor import MLPredictorService
+
+    monkeypatch.setattr(settings, 'MODEL_PATH', str(tmp_path / 'models'))
+    return MLPredictorService
+
+
+@pytest.fixture
+def make_employees():
+    """Builds reproducible EmployeeData batches with varied scores, attendance and dates"""
+    from app.models.schemas import EmployeeData
+    from app.services.ml_predictor import SCORE_FIELDS
+
+    def build(n, seed=0):
+        rng = np.random.default_rng(seed)
+        employees = []
+        for i in range(n):
+            scores = {field: float(rng.integers(1, 6)) for field in SCORE_FIELDS}
+            total = int(rng.integers(18, 23))
+            absent = int(rng.integers(0, 8))
+            employees.append(EmployeeData(
+                employee_id=i + 1,
+                employee_name=f"Employee {i + 1}",
+                position_id=int(rng.integers(1, 4)),
+                joining_date=f"{rng.integers(2012, 2024)}-{rng.integers(1, 13):02d}-15",
+                birthday=f"{rng.integers(1965, 2002)}-{rng.integers(1, 13):02d}-10",
+                gender=['Female', 'Male'][i % 2],
+                total_days=total,
+                late_count=int(rng.integers(0, 6)),
+                absent_count=absent,
+                present_count=total - absent,
+                **scores,
+            ))
+        return employees
+
+    return build
+
+
+@pytest.fixture
+def quick_training(monkeypatch):
+    """Small forests without cross-validation or the importance job, for tests that fit models"""
+    from app.config import settings
+
+    monkeypatch.setattr(settings, 'EVALUATION_FOLDS', 0)
+    monkeypatch.setattr(settings, 'PERMUTATION_IMPORTANCE_REPEATS', 0)
+    return {'n_estimators': 10}
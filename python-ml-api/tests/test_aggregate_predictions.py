@@ -0,0 +1,83 @@
+import asyncio
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.ml_predictor import MLPredictorService
+
+
+def scored_frame():
+    """A scored batch: three position/gender groups plus one row without a gender"""
+    return pd.DataFrame({
+        'position_id': [1, 1, 1, 2, 2, 2],
+        'gender': ['Female', 'Female', 'Male', 'Female', 'Female', np.nan],
+        'potential': ['High Potential', 'Meets Expectation', 'Below Expectation',
+                      'High Potential', 'High Potential', 'Meets Expectation'],
+        'resignation_status': ['Not at Risk', 'High Risk', 'Medium Risk', 'Not at Risk', 'Not at Risk', 'High Risk'],
+        'resignation_probability': [0.2, 0.6, 0.5, 0.1, 0.3, 0.9],
+        'performance': [4.5, 3.0, 2.0, 5.0, 4.0, 3.5],
+        'attendance_rate': [100.0, 80.0, 90.0, 95.0, 85.0, 70.0],
+        'tenure': [30, 40, 12, 60, 7, 24],
+        'age': [31, 45, 28, 52, 39, 33],
+    })
+
+
+def aggregate(group_by, quantiles=(0.5, 0.9)):
+    service = MLPredictorService.__new__(MLPredictorService)
+    service.score_employees = lambda employees, snapshot=None: scored_frame()
+    return asyncio.run(service.aggregate_predictions([], list(group_by), list(quantiles)))
+
+
+def test_groups_by_several_keys():
+    groups = aggregate(['position_id', 'gender'])
+
+    assert [group['keys'] for group in groups] == [
+        {'position_id': 1, 'gender': 'Female'},
+        {'position_id': 1, 'gender': 'Male'},
+        {'position_id': 2, 'gender': 'Female'},
+        {'position_id': 2, 'gender': None},
+    ]
+    assert [group['count'] for group in groups] == [2, 1, 2, 1]
+    assert [group['at_risk_count'] for group in groups] == [1, 1, 0, 1]
+    assert [group['at_risk_share'] for group in groups] == [0.5, 1.0, 0.0, 1.0]
+
+
+def test_potential_mix_omits_classes_absent_from_a_group():
+    groups = aggregate(['position_id', 'gender'])
+
+    assert [group['potential_mix'] for group in groups] == [
+        {'High Potential': 1, 'Meets Expectation': 1},
+        {'Below Expectation': 1},
+        {'High Potential': 2},
+        {'Meets Expectation': 1},
+    ]
+
+
+def test_probability_quantiles_and_means():
+    first, _, third, _ = aggregate(['position_id', 'gender'])
+
+    assert first['probability_quantiles'] == pytest.approx({'0.5': 0.4, '0.9': 0.56})
+    assert third['probability_quantiles'] == pytest.approx({'0.5': 0.2, '0.9': 0.28})
+    assert first['avg_resignation_probability'] == pytest.approx(0.4)
+    assert first['avg_performance_score'] == pytest.approx(3.75)
+    assert third['avg_attendance_rate'] == pytest.approx(90.0)
+
+
+def test_derived_keys():
+    groups = aggregate(['tenure_years'], quantiles=[0.5])
+
+    assert [(group['keys']['tenure_years'], group['count']) for group in groups] == [(0, 1), (1, 1), (2, 2), (3, 1), (5, 1)]
+
+
+def test_unknown_keys_are_rejected():
+    with pytest.raises(ValueError, match="Unsupported group_by keys \\['salary'\\]"):
+        aggregate(['position_id', 'salary'])
+
+    with pytest.raises(ValueError, match='Unsupported group_by keys'):
+        aggregate([])
+
+
+def test_quantiles_outside_the_unit_interval_are_rejected():
+    with pytest.raises(ValueError, match='quantiles must be between 0 and 1'):
+        aggregate(['gender'], quantiles=[0.5, 1.5])
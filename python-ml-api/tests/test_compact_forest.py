@@ -0,0 +1,21 @@
+import numpy as np
+import pytest
+
+from app.services.compact_forest import CompactForest, float32_floor
+
+
+@pytest.mark.parametrize('n_rows', [10, 300])
+def test_compact_forest_matches_up_to_float32_leaves(forest_data, mapped_forest, n_rows):
+    model, rows = forest_data
+    compact = CompactForest.from_forest(mapped_forest)
+
+    np.testing.assert_allclose(compact.predict_proba(rows[:n_rows]), model.predict_proba(rows[:n_rows]), atol=1e-6)
+
+
+def test_float32_floor_never_rounds_up():
+    values = np.random.default_rng(0).normal(size=1000)
+    floored = float32_floor(values)
+
+    assert floored.dtype == np.float32
+    assert np.all(floored.astype(np.float64) <= values)
+    assert np.all(np.nextafter(floored, np.float32(np.inf)).astype(np.float64) > values)
@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.drift_monitor import (
+    PSI_EPSILON,
+    DriftMonitor,
+    build_baseline,
+    histogram_counts,
+    search_keys,
+)
+
+FEATURES = ['a', 'b']
+
+
+def reference_scores(expected, observed):
+    """PSI and binned KS written out directly"""
+    e = np.maximum(expected / expected.sum(), PSI_EPSILON)
+    o = np.maximum(observed / observed.sum(), PSI_EPSILON)
+    psi = np.sum((o - e) * np.log(o / e))
+    ks = np.max(np.abs(np.cumsum(observed) / observed.sum() - np.cumsum(expected) / expected.sum()))
+    return psi, ks
+
+
+def frame(rng, n, shift=0.0):
+    return pd.DataFrame({'a': rng.normal(loc=shift, size=n), 'b': rng.integers(0, 5, size=n).astype(float)})
+
+
+def test_histogram_counts_match_numpy():
+    rng = np.random.default_rng(0)
+    edges = [np.array([-1.0, 0.0, 1.0]), np.array([2.5])]
+    columns = rng.normal(size=(2, 500)) * 2
+    columns[0, :7] = np.nan
+
+    counts, missing = histogram_counts(columns, search_keys(edges))
+
+    for row, feature_edges in enumerate(edges):
+        values = columns[row][~np.isnan(columns[row])]
+        expected, _ = np.histogram(values, bins=np.concatenate([[-np.inf], feature_edges, [np.inf]]))
+        np.testing.assert_array_equal(counts[row, :len(feature_edges) + 1], expected)
+        assert not counts[row, len(feature_edges) + 1:].any()
+    np.testing.assert_array_equal(missing, [7, 0])
+
+
+def test_psi_and_ks_against_reference():
+    rng = np.random.default_rng(1)
+    baseline = build_baseline(frame(rng, 5000), FEATURES)
+    monitor = DriftMonitor(baseline, 'v1')
+    batch = frame(rng, 2000, shift=1.0)
+    monitor.update(batch)
+
+    report = monitor.report()
+    by_feature = {f['feature']: f for f in report['features']}
+
+    feature = baseline['features'][0]
+    bins = np.concatenate([[-np.inf], feature['edges'], [np.inf]])
+    observed, _ = np.histogram(batch['a'], bins=bins)
+    psi, ks = reference_scores(np.asarray(feature['counts'], dtype=float), observed.astype(float))
+
+    assert by_feature['a']['psi'] == pytest.approx(psi)
+    assert by_feature['a']['ks'] == pytest.approx(ks)
+    assert by_feature['a']['status'] == 'significant'
+    assert by_feature['b']['status'] == 'stable'
+    assert report['max_psi'] == by_feature['a']['psi']
+
+
+def test_same_distribution_is_stable():
+    rng = np.random.default_rng(2)
+    monitor = DriftMonitor(build_baseline(frame(rng, 5000), FEATURES), 'v1')
+    monitor.update(frame(rng, 5000))
+
+    report = monitor.report()
+
+    assert report['status'] == 'stable'
+    assert all(f['psi'] < 0.02 and f['ks'] < 0.05 for f in report['features'])
+
+
+def test_other_workers_totals_merge():
+    rng = np.random.default_rng(3)
+    baseline = build_baseline(frame(rng, 3000), FEATURES)
+    first, second, combined = (DriftMonitor(baseline, 'v1') for _ in range(3))
+    batches = [frame(rng, 400, shift=0.3), frame(rng, 600, shift=0.3)]
+    first.update(batches[0])
+    second.update(batches[1])
+    combined.update(pd.concat(batches))
+    stale = DriftMonitor(baseline, 'v0')
+    stale.update(frame(rng, 100))
+
+    merged = first.report([second.totals(), stale.totals()])
+    reference = combined.report()
+
+    assert merged['observed_rows'] == 1000
+    assert [f['psi'] for f in merged['features']] == pytest.approx([f['psi'] for f in reference['features']])
+
+
+def test_no_observations_reports_no_data():
+    monitor = DriftMonitor(build_baseline(frame(np.random.default_rng(4), 100), FEATURES), 'v1')
+
+    report = monitor.report()
+
+    assert report['status'] == 'no_data'
+    assert all(f['psi'] is None for f in report['features'])
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from app.services.forest_arrays import TREE_APPLY_MIN_ROWS
+
+
+@pytest.mark.parametrize('n_rows', [1, TREE_APPLY_MIN_ROWS - 1, TREE_APPLY_MIN_ROWS, 300])
+def test_predict_proba_matches_sklearn(forest_data, mapped_forest, n_rows):
+    model, rows = forest_data
+    X = rows[:n_rows]
+
+    assert mapped_forest.is_mapped
+    np.testing.assert_allclose(mapped_forest.predict_proba(X), model.predict_proba(X), atol=1e-12)
+
+
+def test_predict_proba_matches_sklearn_on_threads(forest_data, mapped_forest):
+    model, rows = forest_data
+    mapped_forest.n_jobs = 3
+
+    np.testing.assert_allclose(mapped_forest.predict_proba(rows), model.predict_proba(rows), atol=1e-12)
+    np.testing.assert_allclose(mapped_forest.predict_proba(rows[:50]), model.predict_proba(rows[:50]), atol=1e-12)
+
+
+def test_apply_reaches_sklearn_leaves(forest_data, mapped_forest):
+    model, rows = forest_data
+    leaves = mapped_forest.apply(rows[:50])
+    offsets = np.asarray(mapped_forest.roots)
+
+    np.testing.assert_array_equal(leaves - offsets, model.apply(rows[:50]))
+
+
+
+@pytest.mark.parametrize('n_rows', [1, 300])
+def test_explain_contributions_add_up_to_the_prediction(forest_data, mapped_forest, n_rows):
+    model, rows = forest_data
+    X = rows[:n_rows]
+
+    bias, contributions = mapped_forest.explain(X)
+
+    assert contributions.shape == (n_rows, X.shape[1])
+    np.testing.assert_allclose(bias + contributions.sum(axis=1), model.predict_proba(X)[:, 1], atol=1e-9)
+
+
+def test_explain_bias_is_the_mean_root_value(forest_data, mapped_forest):
+    model, rows = forest_data
+    roots = [tree.tree_.value[0, 0] for tree in model.estimators_]
+    expected = np.mean([value[1] / value.sum() for value in roots])
+
+    bias, _ = mapped_forest.explain(rows[:5])
+
+    assert bias == pytest.approx(expected)
@@ -0,0 +1,98 @@
+import asyncio
+import json
+import os
+
+import joblib
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from app.services.ml_predictor import FEATURE_COLUMNS, GENDER_CODES
+from app.services.model_metadata import SIDECAR_FILE, validate_sidecar
+
+
+@pytest.fixture
+def service(service_factory, quick_training):
+    return service_factory()
+
+
+def train(service, employees, hyperparameters):
+    X, y = service.prepare_training_data(employees)
+    return asyncio.run(service.fit_and_save(X, y, hyperparameters))['model_version']
+
+
+def test_codes_do_not_depend_on_the_batch(service, make_employees):
+    employees = make_employees(6)
+    mixed = service.process_employee_data(employees)
+    men_only = service.process_employee_data([e for e in employees if e.gender == 'Male'])
+    other = service.process_employee_data([employees[0].model_copy(update={'gender': 'Diverse'})])
+
+    assert mixed['gender_encoded'].tolist() == [0, 1, 0, 1, 0, 1]
+    assert men_only['gender_encoded'].tolist() == [1, 1, 1]
+    assert other['gender_encoded'].tolist() == [len(GENDER_CODES)]
+
+
+def test_new_models_record_their_encoding(service, make_employees, quick_training):
+    version = train(service, make_employees(60), quick_training)
+
+    with open(os.path.join(service.registry.version_dir(version), SIDECAR_FILE)) as f:
+        sidecar = json.load(f)
+    assert sidecar['feature_schema']['encodings'] == {'gender': GENDER_CODES}
+    assert service.load_model(version)
+
+
+def test_model_without_the_encoding_record_is_refused(service, make_employees, quick_training):
+    old = train(service, make_employees(60, seed=1), quick_training)
+    # Rewrite the sidecar as a model trained with per-batch gender codes would have it
+    path = os.path.join(service.registry.version_dir(old), SIDECAR_FILE)
+    with open(path) as f:
+        sidecar = json.load(f)
+    del sidecar['feature_schema']['encodings']
+    with open(path, 'w') as f:
+        json.dump(sidecar, f)
+    current = train(service, make_employees(60, seed=2), quick_training)
+
+    with pytest.raises(ValueError, match='gender encoding None does not match'):
+        service._read_snapshot(old)
+    with pytest.raises(RuntimeError, match='could not be loaded'):
+        service.rollback(old)
+    assert service.snapshot.version == current
+    assert service.registry.current() == current
+
+
+def test_validate_sidecar_compares_encodings():
+    sidecar = {
+        'schema_version': 1,
+        'feature_schema': {'columns': FEATURE_COLUMNS, 'encodings': {'gender': {'Female': 1, 'Male': 0}}},
+    }
+    header = {'n_features': len(FEATURE_COLUMNS)}
+
+    assert validate_sidecar(sidecar, FEATURE_COLUMNS, header) == []
+    assert validate_sidecar(sidecar, FEATURE_COLUMNS, header, {'gender': GENDER_CODES}) == [
+        "gender encoding {'Female': 1, 'Male': 0} does not match the service's {'Female': 0, 'Male': 1}; retrain the model"
+    ]
+
+
+def test_legacy_model_is_retrained_on_demand(service, make_employees, monkeypatch):
+    # A pickled model and metadata from before the registry and the fixed codes
+    X, y = service.prepare_training_data(make_employees(60))
+    joblib.dump(RandomForestClassifier(n_estimators=5, random_state=0).fit(X, y), service.model_path)
+    joblib.dump({'version': '1.0.0', 'threshold': 0.5}, service.metadata_path)
+
+    assert not service.load_model()
+    assert service.registry.versions() == ['1.0.0']
+    assert service.snapshot is None
+
+    calls = []
+    async def run_training(employees, hyperparameters=None):
+        calls.append(len(employees))
+    monkeypatch.setattr(service, 'run_training', run_training)
+
+    async def scenario():
+        results = await service.predict(make_employees(20))
+        await asyncio.sleep(0)
+        return results
+
+    results = asyncio.run(scenario())
+
+    assert calls == [20]
+    assert {result.resignation_status for result in results} == {'Insufficient Data'}
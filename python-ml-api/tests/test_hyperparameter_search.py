@@ -0,0 +1,119 @@
+import numpy as np
+import pytest
+
+from app.services.hyperparameter_search import SuccessiveHalvingSearch
+
+
+def data(n=900):
+    y = np.arange(n) % 2
+    return np.zeros((n, 2)), y
+
+
+def scripted_search(aucs, latencies=None, evaluations_before_budget=None, **kwargs):
+    """A search whose candidates ('c': 0..n-1) get fixed AUCs and latencies instead of being fitted"""
+    kwargs.setdefault('min_resources', 100)
+    search = SuccessiveHalvingSearch(
+        search_space={'c': list(range(len(aucs)))}, max_candidates=len(aucs),
+        latency_weight=0.0, tolerance=0.0, **kwargs
+    )
+    evaluated = []
+
+    def evaluate(params, X, y, probe):
+        evaluated.append((params['c'], len(y)))
+        return {
+            'params': params,
+            'oob_auc': aucs[params['c']],
+            'latency_ms_per_1k': latencies[params['c']] if latencies else 1.0,
+            'fit_seconds': 0.0,
+        }
+    search._evaluate = evaluate
+    if evaluations_before_budget is not None:
+        search._budget_exhausted = lambda: len(evaluated) >= evaluations_before_budget
+    return search, evaluated
+
+
+def test_candidates_shrink_by_the_halving_factor():
+    aucs = [0.60, 0.91, 0.70, 0.85, 0.65, 0.95, 0.80, 0.75, 0.90]
+    search, evaluated = scripted_search(aucs, halving_factor=3)
+
+    result = search.run(*data())
+
+    assert [len(rung['results']) for rung in result['rungs']] == [9, 3, 1]
+    assert [rung['n_samples'] for rung in result['rungs']] == [100, 300, 900]
+    # The best third moves on, best first
+    assert [c for c, n in evaluated if n == 300] == [5, 1, 8]
+    assert result['best_params'] == {'c': 5}
+    assert result['candidates_evaluated'] == 13
+    assert not result['budget_exhausted']
+
+
+def test_halving_factor_two():
+    aucs = [0.1 * i for i in range(8)]
+    search, _ = scripted_search(aucs, halving_factor=2)
+
+    result = search.run(*data(800))
+
+    assert [len(rung['results']) for rung in result['rungs']] == [8, 4, 2, 1]
+    assert result['best_params'] == {'c': 7}
+
+
+def test_budget_cut_off_returns_the_best_candidate_so_far():
+    aucs = [0.60, 0.91, 0.70, 0.85, 0.65, 0.95, 0.80, 0.75, 0.90]
+    search, evaluated = scripted_search(aucs, evaluations_before_budget=4)
+
+    result = search.run(*data())
+
+    assert result['budget_exhausted']
+    assert [c for c, _ in evaluated] == [0, 1, 2, 3]
+    assert len(result['rungs']) == 1
+    assert result['best_params'] == {'c': 1}
+
+
+def test_budget_cut_off_in_a_later_rung_keeps_the_leader():
+    aucs = [0.60, 0.91, 0.70, 0.85, 0.65, 0.95, 0.80, 0.75, 0.90]
+    search, evaluated = scripted_search(aucs, evaluations_before_budget=10)
+
+    result = search.run(*data())
+
+    assert result['budget_exhausted']
+    assert evaluated[-1] == (5, 300)
+    assert result['best_params'] == {'c': 5}
+
+
+def test_first_candidate_is_evaluated_even_without_budget():
+    search, evaluated = scripted_search([0.7, 0.9], evaluations_before_budget=0)
+
+    result = search.run(*data())
+
+    # Two candidates need two rungs, so the first one sees a third of the rows
+    assert evaluated == [(0, 300)]
+    assert result['best_params'] == {'c': 0}
+    assert result['budget_exhausted']
+
+
+def test_latency_penalty_picks_the_fastest_candidate_within_tolerance():
+    search = SuccessiveHalvingSearch(latency_weight=0.01, tolerance=0.01)
+    results = [
+        {'params': {'c': 'accurate'}, 'oob_auc': 0.90, 'latency_ms_per_1k': 20.0},
+        {'params': {'c': 'balanced'}, 'oob_auc': 0.888, 'latency_ms_per_1k': 10.0},
+        {'params': {'c': 'fastest'}, 'oob_auc': 0.80, 'latency_ms_per_1k': 5.0},
+        {'params': {'c': 'slowest'}, 'oob_auc': 0.905, 'latency_ms_per_1k': 80.0},
+    ]
+
+    search._score(results)
+
+    # One doubling over the fastest costs latency_weight
+    assert [r['objective'] for r in results] == pytest.approx([0.88, 0.878, 0.80, 0.865])
+    assert search._select(results)['params'] == {'c': 'balanced'}
+
+
+def test_without_tolerance_the_best_objective_wins():
+    search = SuccessiveHalvingSearch(latency_weight=0.01, tolerance=0.0)
+    results = [
+        {'params': {'c': 'accurate'}, 'oob_auc': 0.90, 'latency_ms_per_1k': 20.0},
+        {'params': {'c': 'balanced'}, 'oob_auc': 0.888, 'latency_ms_per_1k': 10.0},
+    ]
+
+    search._score(results)
+
+    assert search._select(results)['params'] == {'c': 'accurate'}
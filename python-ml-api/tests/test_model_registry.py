@@ -0,0 +1,133 @@
+import os
+
+import pytest
+
+from app.services import model_registry
+from app.services.model_registry import ModelRegistry
+
+
+def publish(registry, version):
+    """Publish an empty version"""
+    staging = registry.stage()
+    with open(os.path.join(staging, 'model_metadata.json'), 'w') as f:
+        f.write('{}')
+    return registry.publish(staging, version)
+
+
+@pytest.fixture
+def registry(tmp_path):
+    return ModelRegistry(str(tmp_path), keep=3)
+
+
+def test_publish_makes_newest_current(registry):
+    for version in ['v1', 'v2', 'v3']:
+        publish(registry, version)
+
+    assert registry.versions() == ['v3', 'v2', 'v1']
+    assert registry.current() == 'v3'
+    assert registry.previous() == 'v2'
+    assert registry.previous('v1') is None
+
+
+def test_publish_rejects_existing_and_invalid_names(registry):
+    publish(registry, 'v1')
+
+    with pytest.raises(ValueError):
+        publish(registry, 'v1')
+    with pytest.raises(ValueError):
+        publish(registry, '../escape')
+
+
+def test_rollback_target_follows_publication_order(registry):
+    for version in ['v1', 'v2', 'v3']:
+        publish(registry, version)
+
+    registry.set_current(registry.previous())
+    assert registry.current() == 'v2'
+    assert registry.previous() == 'v1'
+    # Rolling back does not reorder versions
+    assert registry.versions() == ['v3', 'v2', 'v1']
+
+
+def test_prune_keeps_the_newest_versions(registry):
+    for version in ['v1', 'v2', 'v3', 'v4', 'v5']:
+        publish(registry, version)
+
+    assert registry.versions() == ['v5', 'v4', 'v3']
+    assert not os.path.exists(registry.version_dir('v1'))
+
+
+def test_prune_never_deletes_the_current_version(registry):
+    for version in ['v1', 'v2', 'v3']:
+        publish(registry, version)
+    registry.set_current('v1')
+
+    registry.keep = 1
+    registry.prune()
+
+    assert registry.versions() == ['v3', 'v1']
+    assert registry.current() == 'v1'
+
+
+def test_importance_results_do_not_reorder_versions(registry):
+    publish(registry, 'v1')
+    publish(registry, 'v2')
+
+    # A late importance job for the older version must not make it look newest
+    assert not registry.importance_path('v1').startswith(registry.versions_dir)
+    with open(registry.importance_path('v1'), 'w') as f:
+        f.write('{}')
+
+    assert registry.versions() == ['v2', 'v1']
+    assert registry.previous() == 'v1'
+
+
+def test_prune_deletes_importance_results(registry):
+    for version in ['v1', 'v2', 'v3']:
+        publish(registry, version)
+        with open(registry.importance_path(version), 'w') as f:
+            f.write('{}')
+
+    publish(registry, 'v4')
+
+    assert not os.path.exists(registry.importance_path('v1'))
+    assert os.path.exists(registry.importance_path('v2'))
+
+
+def test_order_ignores_directory_mtimes(registry):
+    for version in ['v1', 'v2', 'v3']:
+        publish(registry, version)
+
+    # Copying, restoring or touching a version directory changes its mtime
+    os.utime(registry.version_dir('v1'), ns=(9 * 10**18, 9 * 10**18))
+
+    assert registry.versions() == ['v3', 'v2', 'v1']
+    assert registry.previous() == 'v2'
+
+
+def test_order_survives_the_clock_stepping_back(registry, monkeypatch):
+    monkeypatch.setattr(model_registry.time, 'time_ns', lambda: 5 * 10**18)
+    publish(registry, 'v1')
+    monkeypatch.setattr(model_registry.time, 'time_ns', lambda: 10**18)
+    publish(registry, 'v2')
+
+    assert registry.versions() == ['v2', 'v1']
+    assert registry.published_ns('v2') == 5 * 10**18 + 1
+
+
+def test_published_at_comes_from_the_publish_record(registry, monkeypatch):
+    monkeypatch.setattr(model_registry.time, 'time_ns', lambda: 1_700_000_000 * 10**9)
+    publish(registry, 'v1')
+    os.utime(registry.version_dir('v1'), ns=(10**9, 10**9))
+
+    assert registry.describe() == [{'version': 'v1', 'current': True, 'published_at': 1_700_000_000.0}]
+
+
+def test_versions_without_a_record_use_their_name_timestamp(registry):
+    publish(registry, '1.0.1700000500')
+    for version in ['1.0.1700000000', '1.0.1700000900']:
+        # Published before the record existed
+        os.makedirs(registry.version_dir(version))
+
+    assert registry.versions()[1:] == ['1.0.1700000900', '1.0.1700000000']
+    assert registry.published_ns('1.0.1700000000') == 1_700_000_000 * 10**9
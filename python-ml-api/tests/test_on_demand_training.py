@@ -0,0 +1,94 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+
+from app.models.schemas import EmployeeData
+
+
+def employees(n):
+    return [EmployeeData(employee_id=i, employee_name=f"Employee {i}", overall_score=3.0) for i in range(n)]
+
+
+def slow_training(calls):
+    async def run_training(employees, hyperparameters=None):
+        calls.append(len(employees))
+        await asyncio.sleep(0.2)
+        return {'training_samples': len(employees)}
+    return run_training
+
+
+def test_concurrent_callers_start_one_training_job(service_factory):
+    # Two service instances share the models directory, standing in for two workers
+    workers = [service_factory(), service_factory()]
+    calls = []
+    for service in workers:
+        service.run_training = slow_training(calls)
+
+    async def scenario():
+        batch = employees(20)
+        results = await asyncio.gather(*(workers[i % 2].predict(batch) for i in range(8)))
+        jobs = workers[0].jobs.list()
+        await asyncio.sleep(0.3)
+        return results, jobs
+
+    results, jobs = asyncio.run(scenario())
+
+    assert calls == [20]
+    assert [job['kind'] for job in jobs] == ['training']
+    for batch in results:
+        assert len(batch) == 20
+        assert all(0.0 <= result.resignation_probability <= 1.0 for result in batch)
+        assert all(result.resignation_status for result in batch)
+
+
+def test_lock_is_released_when_the_job_ends(service_factory):
+    service = service_factory()
+    calls = []
+    service.run_training = slow_training(calls)
+
+    async def scenario():
+        first = service.start_on_demand_training(employees(20))
+        await asyncio.sleep(0.3)
+        second = service.start_on_demand_training(employees(20))
+        await asyncio.sleep(0.3)
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert calls == [20, 20]
+    assert first['job_id'] != second['job_id']
+    assert not os.path.exists(os.path.join(service.jobs.jobs_dir, 'on_demand_training.lock'))
+
+
+def test_lock_of_a_dead_worker_is_taken_over(service_factory):
+    service = service_factory()
+    calls = []
+    service.run_training = slow_training(calls)
+
+    exited = subprocess.run([sys.executable, '-c', 'import os; print(os.getpid())'], capture_output=True, text=True)
+    with open(os.path.join(service.jobs.jobs_dir, 'on_demand_training.lock'), 'w', encoding='utf-8') as f:
+        json.dump({'pid': int(exited.stdout), 'job_id': 'abandoned'}, f)
+
+    async def scenario():
+        job = service.start_on_demand_training(employees(20))
+        await asyncio.sleep(0.3)
+        return job
+
+    job = asyncio.run(scenario())
+
+    assert calls == [20]
+    assert job['pid'] == os.getpid()
+
+
+def test_too_few_rows_start_nothing(service_factory):
+    service = service_factory()
+    calls = []
+    service.run_training = slow_training(calls)
+
+    async def scenario():
+        return service.start_on_demand_training(employees(3))
+
+    assert asyncio.run(scenario()) is None
+    assert calls == []
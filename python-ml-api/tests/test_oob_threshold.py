@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+
+from app.services.ml_predictor import MLPredictorService
+
+
+def select(X, y):
+    model = RandomForestClassifier(n_estimators=50, oob_score=True, random_state=0).fit(X, y)
+    service = MLPredictorService.__new__(MLPredictorService)
+    return model, *service._select_oob_threshold(model, pd.Series(y))
+
+
+def test_separable_threshold_flags_every_positive():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(300, 3))
+    y = (X[:, 0] > 0).astype(int)
+
+    model, threshold, stats = select(X, y)
+
+    assert 0.0 < threshold < 1.0
+    assert stats['method'] == 'oob_roc'
+    oob = model.oob_decision_function_[:, 1]
+    # Predictions use a strict '>', which must reproduce the chosen ROC point
+    predicted = oob > threshold
+    assert predicted[y == 1].mean() == stats['tpr']
+    assert predicted[y == 0].mean() == stats['fpr']
+
+
+def test_threshold_matches_roc_point_on_noisy_data():
+    rng = np.random.default_rng(1)
+    X = rng.normal(size=(400, 4))
+    y = (X[:, 0] + rng.normal(scale=1.0, size=400) > 0).astype(int)
+
+    model, threshold, stats = select(X, y)
+
+    oob = model.oob_decision_function_
+    has_oob = oob.sum(axis=1) > 0
+    predicted = oob[has_oob, 1] > threshold
+    y_oob = y[has_oob]
+    assert stats['oob_samples'] == has_oob.sum()
+    assert predicted[y_oob == 1].mean() == stats['tpr']
+    assert predicted[y_oob == 0].mean() == stats['fpr']
+    assert stats['youden_j'] > 0.3
+
+
+def test_single_class_falls_back_to_default():
+    X = np.random.default_rng(2).normal(size=(50, 2))
+    y = np.zeros(50, dtype=int)
+
+    _, threshold, stats = select(X, y)
+
+    assert threshold == 0.5
+    assert stats['method'] == 'default'
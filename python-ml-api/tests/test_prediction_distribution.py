@@ -0,0 +1,55 @@
+import json
+import os
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from app.services.prediction_distribution import PredictionDistribution
+from app.services.quantile_sketch import KLLSketch
+
+
+def write_day(directory, days_ago, values):
+    day_dir = os.path.join(directory, (date.today() - timedelta(days=days_ago)).isoformat())
+    os.makedirs(day_dir)
+    sketch = KLLSketch(k=50)
+    sketch.update(values)
+    with open(os.path.join(day_dir, 'other-worker.json'), 'w') as f:
+        json.dump({'resignation_probability': sketch.to_dict()}, f)
+
+
+def test_query_merges_workers_and_flushed_batches(tmp_path):
+    distribution = PredictionDistribution(str(tmp_path), k=50)
+    write_day(str(tmp_path), 0, [0.1] * 10)
+    distribution.update(pd.DataFrame({'resignation_probability': np.linspace(0, 1, 30)}))
+    distribution.flush()
+
+    result = distribution.query(days=1, metrics=['resignation_probability'])
+
+    assert [day['date'] for day in result['days']] == [date.today().isoformat()]
+    assert result['overall']['resignation_probability']['count'] == 40
+
+
+def test_query_only_reads_from_disk(tmp_path):
+    distribution = PredictionDistribution(str(tmp_path), k=50)
+    write_day(str(tmp_path), 0, [0.1] * 10)
+    distribution.update(pd.DataFrame({'resignation_probability': np.linspace(0, 1, 30)}))
+    day_dir = os.path.join(str(tmp_path), date.today().isoformat())
+
+    result = distribution.query(days=1, metrics=['resignation_probability'])
+
+    # Buffered batches wait for the periodic flush
+    assert result['overall']['resignation_probability']['count'] == 10
+    assert os.listdir(day_dir) == ['other-worker.json']
+
+
+def test_days_are_calendar_days(tmp_path):
+    distribution = PredictionDistribution(str(tmp_path), k=50)
+    for days_ago in (1, 6, 20):
+        write_day(str(tmp_path), days_ago, [0.5] * 5)
+
+    result = distribution.query(days=7, metrics=['resignation_probability'])
+
+    # A quiet stretch must not pull older days into the window
+    assert len(result['days']) == 2
+    assert result['overall']['resignation_probability']['count'] == 10
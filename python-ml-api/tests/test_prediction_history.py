@@ -0,0 +1,162 @@
+import os
+import time
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services import prediction_history
+from app.services.prediction_history import (
+    COMPACTED_MARKER,
+    COMPACTING_MARKER,
+    COMPACTION_STALE_SECONDS,
+    PredictionHistory,
+)
+
+pytest.importorskip('pyarrow')
+
+DAY = date(2026, 3, 10)
+
+
+class Clock(date):
+    """`date` whose today() the test moves forward"""
+    current = DAY
+
+    @classmethod
+    def today(cls):
+        return cls.current
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    Clock.current = DAY
+    monkeypatch.setattr(prediction_history, 'date', Clock)
+    return Clock
+
+
+def scored(ids, seed):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'id': ids,
+        'resignation_probability': rng.random(len(ids)),
+        'resignation_status': 'Low Risk',
+        'potential': 'High Potential',
+        'performance': 3.5,
+        'attendance_rate': 95.0,
+        'overall_score': 3.2,
+    })
+
+
+def write_parts(history, parts=4):
+    """Several flushed batches for DAY, each a separate file per bucket"""
+    for part in range(parts):
+        timestamp = datetime.combine(DAY, datetime.min.time()) + timedelta(hours=part)
+        history.append(scored(np.arange(40), seed=part), 'v1', timestamp)
+        history.flush()
+
+
+def bucket_files(history, bucket):
+    return sorted(os.listdir(history._partition_dir(DAY.isoformat(), bucket)))
+
+
+def test_compaction_round_trip(tmp_path, clock):
+    history = PredictionHistory(str(tmp_path), buckets=4)
+    write_parts(history)
+    clock.current = DAY + timedelta(days=3)
+    before = history.query(5, days=7)
+
+    assert len(bucket_files(history, 1)) == 4
+    history.flush()
+
+    after = history.query(5, days=7)
+    assert bucket_files(history, 1) == ['compacted.parquet']
+    assert os.path.exists(os.path.join(tmp_path, f"date={DAY.isoformat()}", COMPACTED_MARKER))
+    assert len(after['points']) == 4
+    assert after['points'] == before['points']
+    assert after['files_scanned'] == 1
+
+
+def test_query_includes_unflushed_rows_and_selected_fields(tmp_path, clock):
+    history = PredictionHistory(str(tmp_path), buckets=2)
+    history.append(scored([7], seed=0), 'v2', datetime.combine(DAY, datetime.min.time()))
+
+    result = history.query(7, days=1, fields=['model_version'])
+
+    assert result['files_scanned'] == 0
+    assert [set(point) for point in result['points']] == [{'timestamp', 'model_version'}]
+    with pytest.raises(ValueError):
+        history.query(7, fields=['salary'])
+
+
+def test_crashed_compaction_is_recovered(tmp_path, clock):
+    history = PredictionHistory(str(tmp_path), buckets=2)
+    write_parts(history, parts=3)
+    clock.current = DAY + timedelta(days=3)
+    expected = history.query(3, days=7)['points']
+
+    # A worker died between the two renames of bucket 01, holding the claim
+    day_dir = os.path.join(tmp_path, f"date={DAY.isoformat()}")
+    partition = history._partition_dir(DAY.isoformat(), 1)
+    os.rename(partition, f"{partition}.retired")
+    os.makedirs(f"{partition}.compacting")
+    marker = os.path.join(day_dir, COMPACTING_MARKER)
+    open(marker, 'w').close()
+
+    # Readers still see the parts, and a fresh claim blocks other workers
+    assert history.query(3, days=7)['points'] == expected
+    history.flush()
+    assert os.path.exists(marker)
+
+    stale = time.time() - COMPACTION_STALE_SECONDS - 1
+    os.utime(marker, (stale, stale))
+    history.flush()
+
+    assert sorted(os.listdir(day_dir)) == [COMPACTED_MARKER, 'bucket=00', 'bucket=01']
+    assert bucket_files(history, 1) == ['compacted.parquet']
+    assert history.query(3, days=7)['points'] == expected
+
+
+def test_query_survives_files_vanishing(tmp_path, clock, monkeypatch):
+    history = PredictionHistory(str(tmp_path), buckets=2)
+    write_parts(history, parts=2)
+    expected = history.query(4, days=1)['points']
+
+    # Compaction swaps the bucket after the query listed it
+    listed = PredictionHistory._files
+
+    def list_then_compact(partition):
+        files = listed(partition)
+        if files and clock.current == DAY:
+            clock.current = DAY + timedelta(days=3)
+            history._compact()
+            clock.current = DAY
+        return files
+
+    monkeypatch.setattr(PredictionHistory, '_files', staticmethod(list_then_compact))
+
+    assert history.query(4, days=1)['points'] == expected
+
+
+def test_old_days_are_pruned(tmp_path, clock):
+    history = PredictionHistory(str(tmp_path), buckets=2, retention_days=30)
+    write_parts(history, parts=1)
+    clock.current = DAY + timedelta(days=30)
+    history.flush()
+
+    assert not os.path.exists(os.path.join(tmp_path, f"date={DAY.isoformat()}"))
+
+
+def test_append_only_buffers(tmp_path, clock):
+    history = PredictionHistory(str(tmp_path), buckets=2, flush_rows=10)
+    timestamp = datetime.combine(DAY, datetime.min.time())
+
+    history.append(scored(np.arange(40), seed=0), 'v1', timestamp)
+
+    # Over flush_rows, but the request path must not touch the disk
+    assert history.flush_due
+    assert not any(name.startswith('date=') for name in os.listdir(tmp_path))
+
+    history.flush(force=False)
+    assert not history.flush_due
+    assert history.query(3, days=1)['files_scanned'] == 1
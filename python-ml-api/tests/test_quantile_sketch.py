@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from app.services.quantile_sketch import KLLSketch
+
+QUANTILES = [0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99]
+
+
+def rank_errors(sketch, values):
+    """|true rank - q| of each estimated quantile"""
+    ordered = np.sort(values)
+    estimates = sketch.quantiles(QUANTILES)
+    ranks = np.searchsorted(ordered, estimates, side='right') / len(ordered)
+    return np.abs(ranks - np.asarray(QUANTILES))
+
+
+def test_small_streams_are_exact():
+    values = np.arange(100, dtype=float)
+    sketch = KLLSketch(k=200, seed=0)
+    sketch.update(values)
+
+    assert sketch.quantiles([0.0, 0.5, 1.0]) == [0.0, 49.0, 99.0]
+
+
+@pytest.mark.parametrize('distribution', ['uniform', 'lognormal', 'sorted'])
+def test_rank_error_stays_within_bound(distribution):
+    rng = np.random.default_rng(0)
+    values = {
+        'uniform': rng.random(200_000),
+        'lognormal': rng.lognormal(size=200_000),
+        'sorted': np.sort(rng.normal(size=200_000)),
+    }[distribution]
+
+    sketch = KLLSketch(k=200, seed=1)
+    for batch in np.array_split(values, 97):
+        sketch.update(batch)
+
+    assert sketch.n == len(values)
+    # About 1.7/k expected; allow a few times that for a single run
+    assert rank_errors(sketch, values).max() < 0.03
+    assert sketch.size < 2000
+
+
+def test_merged_sketches_keep_the_bound():
+    rng = np.random.default_rng(2)
+    parts = [rng.normal(loc=i, size=50_000) for i in range(4)]
+    merged = KLLSketch(k=200, seed=3)
+    for i, part in enumerate(parts):
+        sketch = KLLSketch(k=200, seed=10 + i)
+        sketch.update(part)
+        merged.merge(sketch)
+
+    values = np.concatenate(parts)
+    assert merged.n == len(values)
+    assert merged.min == values.min() and merged.max == values.max()
+    assert rank_errors(merged, values).max() < 0.03
+
+
+def test_round_trip_and_edge_cases():
+    sketch = KLLSketch(k=50, seed=0)
+    assert sketch.quantiles([0.5]) == [None]
+
+    sketch.update([3.0, np.nan, 1.0, 2.0] * 1000)
+    restored = KLLSketch.from_dict(sketch.to_dict())
+
+    assert sketch.n == 3000
+    assert restored.n == sketch.n
+    assert restored.quantiles(QUANTILES) == sketch.quantiles(QUANTILES)
+    assert restored.quantiles([0.0, 1.0]) == [1.0, 3.0]
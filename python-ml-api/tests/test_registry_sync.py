@@ -0,0 +1,87 @@
+import asyncio
+import os
+
+import pytest
+
+from app.config import settings
+from app.services.model_registry import CURRENT_FILE
+
+
+@pytest.fixture
+def workers(service_factory, quick_training):
+    """Two services sharing one models directory, as two API workers would"""
+    return service_factory(), service_factory()
+
+
+def train(service, employees, hyperparameters):
+    X, y = service.prepare_training_data(employees)
+    return asyncio.run(service.fit_and_save(X, y, hyperparameters))['model_version']
+
+
+def current_mtime_ns(service):
+    return os.stat(os.path.join(service.registry.root, CURRENT_FILE)).st_mtime_ns
+
+
+def test_request_reload_touches_the_current_pointer(workers, make_employees, quick_training):
+    service, _ = workers
+    version = train(service, make_employees(60), quick_training)
+
+    path = os.path.join(service.registry.root, CURRENT_FILE)
+    os.utime(path, ns=(10**18, 10**18))
+    before = service.registry.pointer()
+
+    assert service.request_reload()
+
+    after = service.registry.pointer()
+    assert after[0] == before[0] == version
+    assert after[1] != before[1]
+    assert current_mtime_ns(service) != 10**18
+
+
+def test_second_worker_follows_publish_rollback_and_reload(workers, make_employees, quick_training):
+    worker_a, worker_b = workers
+    first = train(worker_a, make_employees(60, seed=1), quick_training)
+    assert worker_b.load_model()
+    assert worker_b.snapshot.version == first
+    assert not worker_b.sync_with_registry()
+
+    second = train(worker_a, make_employees(60, seed=2), quick_training)
+    assert worker_b.sync_with_registry()
+    assert worker_b.snapshot.version == second
+
+    worker_a.rollback(first)
+    assert worker_b.sync_with_registry()
+    assert worker_b.snapshot.version == first
+
+    # A reload keeps the version but still makes every worker load it again
+    os.utime(os.path.join(worker_a.registry.root, CURRENT_FILE), ns=(10**18, 10**18))
+    worker_b.sync_with_registry()
+    served = worker_b.snapshot
+    worker_a.request_reload()
+    assert worker_b.sync_with_registry()
+    assert worker_b.snapshot is not served
+    assert worker_b.snapshot.version == first
+
+
+def test_watch_loop_picks_up_a_new_version(workers, make_employees, quick_training, monkeypatch):
+    worker_a, worker_b = workers
+    train(worker_a, make_employees(60, seed=1), quick_training)
+    assert worker_b.load_model()
+    monkeypatch.setattr(settings, 'MODEL_SYNC_INTERVAL_SECONDS', 0.05)
+
+    async def scenario():
+        watcher = asyncio.get_running_loop().create_task(worker_b._watch_registry())
+        try:
+            X, y = worker_a.prepare_training_data(make_employees(60, seed=2))
+            published = (await worker_a.fit_and_save(X, y, quick_training))['model_version']
+            for _ in range(40):
+                if worker_b.snapshot.version == published:
+                    break
+                await asyncio.sleep(0.05)
+            return published
+        finally:
+            watcher.cancel()
+
+    published = asyncio.run(scenario())
+
+    assert worker_b.snapshot.version == published
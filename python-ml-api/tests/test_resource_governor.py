@@ -0,0 +1,42 @@
+from threadpoolctl import threadpool_info
+
+from app.services import resource_governor
+from app.services.resource_governor import ResourceGovernor
+
+
+def native_threads():
+    return sorted({pool['num_threads'] for pool in threadpool_info()})
+
+
+def test_budgets_split_the_worker_share():
+    governor = ResourceGovernor(worker_count=2)
+
+    assert governor.cores_per_worker == max(1, governor.cpu_count // 2)
+    assert governor.inference_threads + governor.training_threads >= governor.cores_per_worker
+    assert ResourceGovernor(inference_threads=1, training_threads=3).training_threads == 3
+
+
+def test_describe_reuses_the_threadpools_read_at_startup(monkeypatch):
+    governor = ResourceGovernor(worker_count=1, inference_threads=1, training_threads=3)
+    governor.apply()
+    expected = governor.describe()['native_threadpools']
+
+    def threadpool_info():
+        raise AssertionError('threadpool_info called on a health probe')
+    monkeypatch.setattr(resource_governor, 'threadpool_info', threadpool_info)
+
+    assert governor.describe()['native_threadpools'] == expected
+    assert {pool['num_threads'] for pool in expected} <= {1}
+
+
+def test_training_budget_is_passed_as_n_jobs(service_factory):
+    service = service_factory()
+    service.governor = ResourceGovernor(worker_count=1, inference_threads=1, training_threads=3)
+    service.governor.apply()
+    before = native_threads()
+
+    model = service.build_model({'n_estimators': 5})
+
+    assert model.n_jobs == 3
+    # Training never raises the process-wide native limits that serving runs under
+    assert native_threads() == before
@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+from pydantic import ValidationError
+
+from app.config import settings
+from app.models.schemas import EmployeeData, SimulationRequest
+from app.services.ml_predictor import SIMULATION_FIELDS, MLPredictorService
+
+
+def simulate(employees, perturbations):
+    # The guard runs before any model is touched, so no service state is needed
+    service = MLPredictorService.__new__(MLPredictorService)
+    return asyncio.run(service.simulate(employees, perturbations))
+
+
+def employees(n):
+    return [EmployeeData(employee_id=i, employee_name=f"Employee {i}") for i in range(n)]
+
+
+def axis(field, n_values):
+    return {'field': field, 'values': [float(v) for v in range(n_values)], 'mode': 'add'}
+
+
+def test_grid_over_the_row_limit_is_rejected():
+    n_values = 100
+    n_employees = settings.SIMULATION_MAX_ROWS // (n_values * n_values) + 1
+    fields = list(SIMULATION_FIELDS)
+
+    with pytest.raises(ValueError, match='exceeds the limit'):
+        simulate(employees(n_employees), [axis(fields[0], n_values), axis(fields[1], n_values)])
+
+
+def test_scenario_count_does_not_wrap_around():
+    # 16 axes of 16 values is 2**64 scenarios, which int64 arithmetic wraps to 0
+    perturbations = [axis(field, 16) for field in list(SIMULATION_FIELDS)[:16]]
+
+    with pytest.raises(ValueError, match='18446744073709551616 scenarios'):
+        simulate(employees(1), perturbations)
+
+
+def test_unknown_fields_are_rejected():
+    with pytest.raises(ValueError, match='Unsupported perturbation fields'):
+        simulate(employees(1), [axis('salary', 2)])
+
+
+def test_schema_caps_axes_and_values():
+    records = [{'employee_id': 1, 'employee_name': 'Employee 1'}]
+
+    with pytest.raises(ValidationError):
+        SimulationRequest(employees=records, perturbations=[axis('teamwork', 101)])
+    with pytest.raises(ValidationError):
+        SimulationRequest(employees=records, perturbations=[axis(f"field_{i}", 1) for i in range(21)])
+    with pytest.raises(ValidationError):
+        SimulationRequest(employees=records, perturbations=[axis('teamwork', 2), axis('teamwork', 3)])
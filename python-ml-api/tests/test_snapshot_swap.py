@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+
+@pytest.fixture
+def service(service_factory, quick_training):
+    return service_factory()
+
+
+def train(service, employees, hyperparameters):
+    X, y = service.prepare_training_data(employees)
+    return asyncio.run(service.fit_and_save(X, y, hyperparameters))['model_version']
+
+
+def test_in_flight_request_keeps_its_snapshot_across_a_swap(service, make_employees, quick_training, monkeypatch):
+    train(service, make_employees(80, seed=1), quick_training)
+    first = service.snapshot
+    train(service, make_employees(80, seed=2), {**quick_training, 'max_depth': 2})
+    second = service.snapshot
+    assert first.version != second.version
+
+    batch = make_employees(40, seed=3)
+    expected = asyncio.run(service.predict(batch, snapshot=first))
+    service._snapshot = first
+
+    # Swap the served model between scoring and explaining, as a concurrent load would
+    score_employees = service.score_employees
+    def score_then_swap(employees, snapshot=None):
+        df = score_employees(employees, snapshot)
+        service._snapshot = second
+        return df
+    explained_with = []
+    explain_resignation = service.explain_resignation
+    def record_explain(df, snapshot, top_features):
+        explained_with.append(snapshot.version)
+        return explain_resignation(df, snapshot, top_features)
+    monkeypatch.setattr(service, 'score_employees', score_then_swap)
+    monkeypatch.setattr(service, 'explain_resignation', record_explain)
+
+    results = asyncio.run(service.predict(batch, explain=True))
+
+    assert service.snapshot is second
+    assert explained_with == [first.version]
+    assert [r.resignation_probability for r in results] == [r.resignation_probability for r in expected]
+    assert [r.resignation_status for r in results] == [r.resignation_status for r in expected]
+
+
+def test_loading_a_version_does_not_touch_the_old_snapshot(service, make_employees, quick_training):
+    first_version = train(service, make_employees(80, seed=1), quick_training)
+    first = service.snapshot
+    train(service, make_employees(80, seed=2), quick_training)
+
+    batch = make_employees(40, seed=3)
+    before = asyncio.run(service.predict(batch, snapshot=first))
+    assert service.load_model(first_version)
+    after_reload = asyncio.run(service.predict(batch, snapshot=first))
+
+    assert service.snapshot is not first
+    assert service.snapshot.version == first.version
+    assert [r.resignation_probability for r in after_reload] == [r.resignation_probability for r in before]
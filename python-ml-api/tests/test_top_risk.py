@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+
+from app.services.ml_predictor import select_top_k
+
+
+def reference(values, k):
+    """Full stable sort: largest first, ties in input order"""
+    return np.argsort(-values, kind='stable')[:k]
+
+
+def test_ties_at_the_kth_place_keep_input_order():
+    values = np.array([0.2, 0.9, 0.5, 0.5, 0.1, 0.5, 0.9, 0.5])
+
+    np.testing.assert_array_equal(select_top_k(values, 3), [1, 6, 2])
+    np.testing.assert_array_equal(select_top_k(values, 4), [1, 6, 2, 3])
+
+
+@pytest.mark.parametrize('k', [1, 5, 17, 99, 100, 250])
+def test_matches_a_full_stable_sort(k):
+    # Coarse values so many ties straddle the k-th place
+    values = np.random.default_rng(k).integers(0, 8, size=100) / 8
+
+    np.testing.assert_array_equal(select_top_k(values, k), reference(values, k))
+
+
+def test_all_equal_values_take_the_first_rows():
+    np.testing.assert_array_equal(select_top_k(np.full(1000, 0.3), 5), np.arange(5))
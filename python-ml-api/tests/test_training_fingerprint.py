@@ -0,0 +1,76 @@
+import asyncio
+
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def service(service_factory, quick_training):
+    return service_factory()
+
+
+def fit(service, X, y, hyperparameters, force=False):
+    return asyncio.run(service.fit_and_save(X, y, hyperparameters, force=force))
+
+
+def refuse_to_fit(service, monkeypatch):
+    def build_model(hyperparameters=None):
+        raise AssertionError('the model was refitted')
+    monkeypatch.setattr(service, 'build_model', build_model)
+
+
+def test_identical_data_and_settings_skip_the_fit(service, make_employees, quick_training, monkeypatch):
+    X, y = service.prepare_training_data(make_employees(60))
+    first = fit(service, X, y, quick_training)
+
+    refuse_to_fit(service, monkeypatch)
+    # Same employees in another order
+    order = X.index[::-1]
+    again = fit(service, X.loc[order], y.loc[order], dict(quick_training))
+
+    assert again['skipped'] is True
+    assert again['model_version'] == first['model_version']
+    assert service.registry.versions() == [first['model_version']]
+
+
+def test_force_refits_identical_data(service, make_employees, quick_training):
+    X, y = service.prepare_training_data(make_employees(60))
+    first = fit(service, X, y, quick_training)
+    forced = fit(service, X, y, quick_training, force=True)
+
+    assert 'skipped' not in forced
+    assert forced['model_version'] != first['model_version']
+    assert service.snapshot.version == forced['model_version']
+
+
+def test_changed_data_refits(service, make_employees, quick_training):
+    X, y = service.prepare_training_data(make_employees(60))
+    first = fit(service, X, y, quick_training)
+
+    X_changed = X.copy()
+    X_changed.iloc[0, 0] += 1.0
+    changed = fit(service, X_changed, y, quick_training)
+
+    assert 'skipped' not in changed
+    assert changed['model_version'] != first['model_version']
+
+
+def test_changed_hyperparameters_refit(service, make_employees, quick_training):
+    X, y = service.prepare_training_data(make_employees(60))
+    first = fit(service, X, y, quick_training)
+    changed = fit(service, X, y, {**quick_training, 'max_depth': 3})
+
+    assert 'skipped' not in changed
+    assert changed['model_version'] != first['model_version']
+
+
+def test_upload_and_json_training_share_a_fingerprint(service, make_employees, tmp_path):
+    employees = make_employees(60)
+    X, y = service.prepare_training_data(employees)
+
+    path = tmp_path / 'employees.csv'
+    pd.DataFrame([employee.model_dump() for employee in employees]).to_csv(path, index=False)
+    X_upload, y_upload = service.load_training_file(str(path), 'csv')
+
+    assert X.dtypes.unique().tolist() != X_upload.dtypes.unique().tolist()
+    assert service.training_fingerprint(X_upload, y_upload) == service.training_fingerprint(X, y)
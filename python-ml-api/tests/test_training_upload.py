@@ -0,0 +1,109 @@
+import asyncio
+import importlib
+import io
+import os
+
+import pandas as pd
+import pytest
+from fastapi import UploadFile
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.services.data_ingest import iter_training_batches, save_upload
+from app.services.ml_predictor import UPLOAD_COLUMNS
+
+
+@pytest.fixture
+def service(service_factory):
+    return service_factory()
+
+
+@pytest.fixture
+def records(make_employees):
+    return pd.DataFrame([employee.model_dump() for employee in make_employees(50)])
+
+
+@pytest.fixture
+def api(service, monkeypatch):
+    """The app with its service replaced by one under the test's models directory, startup not run"""
+    main = importlib.import_module('app.main')
+    monkeypatch.setattr(main, 'ml_service', service)
+    return TestClient(main.app)
+
+
+def write(records, tmp_path, file_format):
+    path = str(tmp_path / f"employees.{file_format}")
+    if file_format == 'csv':
+        records.to_csv(path, index=False)
+    else:
+        records.to_parquet(path, index=False)
+    return path
+
+
+def test_csv_and_parquet_batches_build_the_same_matrix(service, records, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, 'UPLOAD_BATCH_ROWS', 7)
+    csv_path, parquet_path = write(records, tmp_path, 'csv'), write(records, tmp_path, 'parquet')
+
+    batches = list(iter_training_batches(csv_path, 'csv', UPLOAD_COLUMNS, 7))
+    assert [len(batch) for batch in batches] == [7] * 7 + [1]
+
+    X_csv, y_csv = service.load_training_file(csv_path, 'csv')
+    X_parquet, y_parquet = service.load_training_file(parquet_path, 'parquet')
+    monkeypatch.setattr(settings, 'UPLOAD_BATCH_ROWS', 1000)
+    X_whole, y_whole = service.load_training_file(csv_path, 'csv')
+
+    pd.testing.assert_frame_equal(X_csv, X_parquet)
+    pd.testing.assert_series_equal(y_csv, y_parquet)
+    pd.testing.assert_frame_equal(X_csv, X_whole)
+    pd.testing.assert_series_equal(y_csv, y_whole)
+
+
+def test_missing_optional_columns_take_the_json_defaults(service, records, tmp_path, make_employees):
+    dropped = ['attendance_score', 'teamwork', 'gender', 'birthday', 'joining_date']
+    path = write(records.drop(columns=dropped), tmp_path, 'csv')
+
+    X_file, y_file = service.load_training_file(path, 'csv')
+    stripped = [employee.model_copy(update={field: None for field in dropped}) for employee in make_employees(50)]
+    X_json, y_json = service.prepare_training_data(stripped)
+
+    assert service.training_fingerprint(X_file, y_file) == service.training_fingerprint(X_json, y_json)
+
+
+def test_file_without_employee_columns_is_rejected(service, tmp_path):
+    path = write(pd.DataFrame({'salary': [1, 2], 'team': ['a', 'b']}), tmp_path, 'csv')
+
+    with pytest.raises(ValueError, match='none of the expected employee columns'):
+        service.load_training_file(path, 'csv')
+
+
+def test_file_with_too_few_rows_is_rejected(service, records, tmp_path):
+    path = write(records.head(settings.MIN_TRAINING_SAMPLES - 1), tmp_path, 'parquet')
+
+    with pytest.raises(ValueError, match=f'Not enough complete records for training. Got {settings.MIN_TRAINING_SAMPLES - 1}'):
+        service.load_training_file(path, 'parquet')
+
+
+def test_upload_over_the_limit_is_rejected_and_removed(tmp_path):
+    upload = UploadFile(io.BytesIO(b'x' * (2 * 1024 * 1024 + 1)), filename='employees.csv')
+
+    with pytest.raises(ValueError, match='exceeds the 2 MB upload limit'):
+        asyncio.run(save_upload(upload, str(tmp_path), 2 * 1024 * 1024))
+    assert os.listdir(tmp_path) == []
+
+
+def test_upload_endpoint_rejects_oversized_files(api, service, monkeypatch):
+    monkeypatch.setattr(settings, 'UPLOAD_MAX_MB', 1)
+
+    response = api.post('/train/upload', files={'file': ('employees.csv', b'x' * (1024 * 1024 + 1), 'text/csv')})
+
+    assert response.status_code == 400
+    assert 'exceeds the 1 MB upload limit' in response.json()['detail']
+    assert os.listdir(service.uploads_dir) == []
+    assert service.jobs.list() == []
+
+
+def test_upload_endpoint_rejects_unknown_formats(api):
+    response = api.post('/train/upload', files={'file': ('employees.xlsx', b'data', 'application/octet-stream')})
+
+    assert response.status_code == 400
+    assert 'Unsupported training file type' in response.json()['detail']